@@ -0,0 +1,306 @@
+"""Time the hot paths of factories, blocks, transformations and inventories.
+
+Run from the repository root:
+    poetry run python benchmarks/suite.py run -o before.json
+    poetry run python benchmarks/suite.py run -o after.json
+    poetry run python benchmarks/suite.py compare before.json after.json
+
+run accepts -k to only time benchmarks whose name contains a string. compare exits with
+status 1 if any benchmark got slower by more than --threshold (default 10%).
+
+Each benchmark is timed on the bundled vanilla data, or on synthetic traits built here so
+results don't move when the data files change. The result file is json:
+    {"format": 1, "python": ..., "platform": ..., "commit": ...,
+     "results": {name: {"best": seconds per call, "median": ..., "loops": ...}}}
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import timeit
+from collections.abc import Callable
+
+from minecraft_object_utils import (
+    VANILLA_JAVA_LATEST,
+    Axis,
+    BlockFactory,
+    BlockProperty,
+    BlockTraits,
+    Inventory,
+    ItemStack,
+    ItemTraits,
+    MinecraftObjectFactory,
+)
+
+RESULT_FORMAT = 1
+REPEAT = 5
+INVENTORY_CAPACITY = 10_000
+
+# name: returns the function to time, after doing any setup that shouldn't be timed. It
+# can instead return (prepare, function) to call prepare, untimed, before every call.
+BENCHMARKS: "dict[str, Callable[[], Callable[[], None] | tuple]]" = {}
+
+
+def benchmark(name: str) -> Callable:
+    def register(setup: "Callable[[], Callable[[], None]]") -> Callable:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def synthetic_block_factory() -> BlockFactory:
+    """A factory with a few made up blocks that have many properties."""
+    factory = BlockFactory([])
+    bools = ["true", "false"]
+    directions = ["north", "east", "south", "west", "up", "down"]
+    factory.register(BlockTraits("synthetic:plain"))
+    factory.register(
+        BlockTraits(
+            "synthetic:wide",
+            props=[
+                BlockProperty("facing", "north", directions),
+                BlockProperty("axis", "y", ["x", "y", "z"]),
+                BlockProperty("rotation", "0", [str(i) for i in range(16)]),
+                BlockProperty("face", "wall", ["floor", "wall", "ceiling"]),
+            ]
+            + [BlockProperty(d, "false", bools) for d in directions]
+            + [BlockProperty("waterlogged", "false", bools)],
+        )
+    )
+    return factory
+
+
+SYNTHETIC = synthetic_block_factory()
+VANILLA = MinecraftObjectFactory([VANILLA_JAVA_LATEST])
+
+
+@benchmark("factory.construct")
+def bench_factory_construct() -> Callable:
+    return lambda: MinecraftObjectFactory([VANILLA_JAVA_LATEST])
+
+
+@benchmark("block.create")
+def bench_create() -> Callable:
+    return lambda: VANILLA.block.create("oak_stairs")
+
+
+@benchmark("block.create_kwargs")
+def bench_create_kwargs() -> Callable:
+    return lambda: VANILLA.block.create(
+        "oak_stairs", facing="east", half="top", shape="outer_left"
+    )
+
+
+@benchmark("block.create_synthetic_kwargs")
+def bench_create_synthetic_kwargs() -> Callable:
+    return lambda: SYNTHETIC.create(
+        "synthetic:wide", facing="up", rotation="7", north="true", waterlogged="true"
+    )
+
+
+@benchmark("block.set_state")
+def bench_set_state() -> Callable:
+    block = VANILLA.block.create("oak_stairs")
+    return lambda: block.set_state("facing", "west")
+
+
+@benchmark("block.copy")
+def bench_copy() -> Callable:
+    block = SYNTHETIC.create("synthetic:wide")
+    return block.copy
+
+
+def _transform_benchmarks() -> None:
+    blocks = {
+        "vanilla": lambda: VANILLA.block.create("oak_stairs", facing="east"),
+        "synthetic": lambda: SYNTHETIC.create("synthetic:wide", facing="up"),
+    }
+    for source, create in blocks.items():
+        for axis in Axis:
+
+            def reflect_setup(create=create, axis=axis) -> Callable:
+                block = create()
+                return lambda: block.reflect(axis)
+
+            benchmark(f"block.reflect.{axis}.{source}")(reflect_setup)
+            for angle in [90, 180, 270]:
+
+                def rotate_setup(create=create, axis=axis, angle=angle) -> Callable:
+                    block = create()
+                    return lambda: block.rotate(axis, angle)
+
+                benchmark(f"block.rotate.{axis}.{angle}.{source}")(rotate_setup)
+
+
+_transform_benchmarks()
+
+
+def _full_inventory() -> Inventory:
+    traits = ItemTraits("synthetic:item", max_stack_size=64)
+    return Inventory.create_from_list(
+        [ItemStack(traits, count=i % 64 + 1) for i in range(INVENTORY_CAPACITY)]
+    )
+
+
+@benchmark("inventory.fill")
+def bench_inventory_fill() -> Callable:
+    stack = ItemStack(ItemTraits("synthetic:item"))
+
+    def fill() -> None:
+        inventory = Inventory(INVENTORY_CAPACITY)
+        for slot in range(INVENTORY_CAPACITY):
+            inventory[slot] = stack
+
+    return fill
+
+
+@benchmark("inventory.copy")
+def bench_inventory_copy() -> Callable:
+    return _full_inventory().copy
+
+
+@benchmark("inventory.count")
+def bench_inventory_count() -> Callable:
+    inventory = _full_inventory()
+    stack = inventory[-1]
+    return lambda: inventory.count(stack)
+
+
+@benchmark("inventory.sort")
+def bench_inventory_sort() -> "tuple[Callable, Callable]":
+    stacks = list(_full_inventory())
+    rng = random.Random(0)
+    inventory = None
+
+    def shuffle() -> None:
+        nonlocal inventory
+        rng.shuffle(stacks)
+        inventory = Inventory.create_from_list(stacks)
+
+    def sort() -> None:
+        inventory.sort(key=lambda stack: -stack.count if stack else 0)
+
+    return shuffle, sort
+
+
+@benchmark("inventory.delta")
+def bench_inventory_delta() -> Callable:
+    inventory = _full_inventory()
+    stack = ItemStack(ItemTraits("synthetic:other"))
+
+    def delta() -> None:
+        inventory.checkpoint()
+        for slot in range(0, INVENTORY_CAPACITY, 10):
+            inventory[slot] = stack
+        inventory.get_delta()
+
+    return delta
+
+
+class PreparedTimer(timeit.Timer):
+    """A timer that calls prepare before every call of the timed function, untimed."""
+
+    def __init__(self, prepare: Callable, func: Callable) -> None:
+        super().__init__(func)
+        self.prepare = prepare
+        self.func = func
+
+    def timeit(self, number: int = timeit.default_number) -> float:
+        total = 0.0
+        for _ in range(number):
+            self.prepare()
+            start = timeit.default_timer()
+            self.func()
+            total += timeit.default_timer() - start
+        return total
+
+
+def time_benchmark(setup: "Callable[[], Callable[[], None] | tuple]") -> dict:
+    """Time one benchmark. Loops are chosen so each repeat takes at least 0.2 seconds."""
+    timed = setup()
+    timer = PreparedTimer(*timed) if isinstance(timed, tuple) else timeit.Timer(timed)
+    loops, _ = timer.autorange()
+    times = [t / loops for t in timer.repeat(repeat=REPEAT, number=loops)]
+    return {"best": min(times), "median": statistics.median(times), "loops": loops}
+
+
+def git_commit() -> "str | None":
+    try:
+        # A fixed command, looked up on PATH like a shell would.
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],  # noqa: S603, S607
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(output: str, name_filter: str = "") -> None:
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if name_filter not in name:
+            continue
+        results[name] = time_benchmark(setup)
+        print(f"{name:<40}{results[name]['best'] * 1e6:>14.2f}us")  # noqa: T201
+    report = {
+        "format": RESULT_FORMAT,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "commit": git_commit(),
+        "results": results,
+    }
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+def compare(old_path: str, new_path: str, threshold: float) -> bool:
+    """Print the change in best time for every benchmark in both files.
+
+    Returns:
+        bool: True if no benchmark got slower by more than threshold.
+    """
+    with open(old_path, encoding="utf-8") as file:
+        old = json.load(file)["results"]
+    with open(new_path, encoding="utf-8") as file:
+        new = json.load(file)["results"]
+    passed = True
+    for name in [n for n in new if n in old]:
+        ratio = new[name]["best"] / old[name]["best"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  SLOWER"
+            passed = False
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:<40}{ratio:>8.2f}x{flag}")  # noqa: T201
+    for name in sorted(old.keys() ^ new.keys()):
+        print(f"{name:<40}  only in {'old' if name in old else 'new'}")  # noqa: T201
+    return passed
+
+
+def main(argv: "list[str]") -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="time benchmarks")
+    run_parser.add_argument("-o", "--output", help="json file to write results to")
+    run_parser.add_argument("-k", dest="name_filter", default="")
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run(args.output, args.name_filter)
+        return 0
+    return 0 if compare(args.old, args.new, args.threshold) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
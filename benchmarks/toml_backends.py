@@ -0,0 +1,53 @@
+"""Compare toml backends on the bundled vanilla data.
+
+Run from the repository root: poetry run python benchmarks/toml_backends.py
+"""
+import time
+
+from minecraft_object_utils import VANILLA_JAVA_LATEST, BlockFactory
+from minecraft_object_utils.toml_backend import (
+    available_toml_backends,
+    iter_toml_objects,
+    load_toml,
+)
+
+REPEAT = 5
+KINDS = ["block", "enchantment", "entity", "item"]
+
+
+def best_time(func: callable) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    paths = [VANILLA_JAVA_LATEST.get_toml_path(kind) for kind in KINDS]
+    # Load the toml file into an empty factory, since importing a mod would prefer the
+    # compiled file and not use the backend.
+    block_path = VANILLA_JAVA_LATEST.get_toml_path("block")
+    print(  # noqa: T201
+        f"{'backend':<10}{'full parse':>14}{'streamed':>14}{'BlockFactory':>16}"
+    )
+    for backend in available_toml_backends():
+        full = best_time(lambda b=backend: [load_toml(p, b) for p in paths])
+        streamed = best_time(
+            lambda b=backend: [list(iter_toml_objects(p, b)) for p in paths]
+        )
+
+        class TimedBlockFactory(BlockFactory):
+            toml_backend = backend
+
+        factory = best_time(
+            lambda f=TimedBlockFactory: f(mods=[]).load_from_file(block_path)
+        )
+        print(  # noqa: T201
+            f"{backend:<10}{full * 1000:>12.1f}ms{streamed * 1000:>12.1f}ms{factory * 1000:>14.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
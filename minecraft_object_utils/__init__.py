@@ -1,15 +1,140 @@
-from .minecraft_object_factory import (  # noqa: F401
-    BlockFactory,
-    EnchantmentFactory,
-    EntityFactory,
-    ItemFactory,
-    MinecraftObjectFactory,
-)
-from .mod_info import VANILLA_JAVA_LATEST, ModInfo  # noqa: F401
-from .objects.block import Block, BlockProperty, BlockTraits  # noqa: F401
-from .objects.block_state.constants import Axis, Direction, Face  # noqa: F401
-from .objects.block_state.transformations import Reflect, Rotate  # noqa: F401
-from .objects.enchantment import Enchantment, EnchantmentTraits  # noqa: F401
-from .objects.entity import Entity, EntityTraits  # noqa: F401
-from .objects.inventory import Inventory  # noqa: F401
-from .objects.item import ItemStack, ItemTraits  # noqa: F401
+"""Public names are imported from their submodule the first time they are used.
+
+`from minecraft_object_utils import Axis` only loads the block state constants. The toml and
+compiled data readers load when a factory first imports data. The array based names are only
+exported when numpy is installed.
+"""
+from importlib import import_module
+from importlib.util import find_spec
+
+TYPE_CHECKING = False  # typing.TYPE_CHECKING, without importing typing
+
+# public name: submodule that defines it
+_LAZY_NAMES = {
+    "BlockTransform": ".block_volume",
+    "BlockVolume": ".block_volume",
+    "EditJournal": ".edit_journal",
+    "JournalEntry": ".edit_journal",
+    "EntityIndex": ".entity_index",
+    "BlockFactory": ".minecraft_object_factory",
+    "EnchantmentFactory": ".minecraft_object_factory",
+    "EntityFactory": ".minecraft_object_factory",
+    "ItemFactory": ".minecraft_object_factory",
+    "MinecraftObjectFactory": ".minecraft_object_factory",
+    "VANILLA_JAVA_LATEST": ".mod_info",
+    "ModInfo": ".mod_info",
+    "MultiVersionRegistry": ".multi_version",
+    "RegistryDiff": ".multi_version",
+    "BlockBatch": ".compact_pickle",
+    "Block": ".objects.block",
+    "BlockProperty": ".objects.block",
+    "BlockTraits": ".objects.block",
+    "Axis": ".objects.block_state.constants",
+    "Direction": ".objects.block_state.constants",
+    "Face": ".objects.block_state.constants",
+    "Reflect": ".objects.block_state.transformations",
+    "Rotate": ".objects.block_state.transformations",
+    "Enchantment": ".objects.enchantment",
+    "EnchantmentTraits": ".objects.enchantment",
+    "Entity": ".objects.entity",
+    "EntityTraits": ".objects.entity",
+    "Inventory": ".objects.inventory",
+    "ItemStack": ".objects.item",
+    "ItemTraits": ".objects.item",
+    "ChunkTiming": ".parallel_transform",
+    "TransformResult": ".parallel_transform",
+    "Chunk": ".pipeline",
+    "RegistrySearch": ".registry_search",
+    "SectionHashTree": ".section_hash",
+    "SharedRegistry": ".shared_registry",
+    "StateTranslator": ".state_translation",
+    "BlockId": ".trait_index",
+    "Field": ".trait_index",
+    "FieldRange": ".trait_index",
+    "HasProp": ".trait_index",
+    "PropValue": ".trait_index",
+    "StateValue": ".trait_index",
+    "TraitIndex": ".trait_index",
+    "TraitQuery": ".trait_index",
+    "TraitPool": ".trait_pool",
+    "VolumeFile": ".volume_file",
+}
+_LAZY_MODULES = ["compact_pickle", "connections", "instrumentation", "pipeline"]
+# submodules that import numpy
+_NUMPY_MODULES = {
+    ".block_volume",
+    ".connections",
+    ".edit_journal",
+    ".parallel_transform",
+    ".pipeline",
+    ".section_hash",
+    ".volume_file",
+}
+
+
+def _needs_numpy(name: str) -> bool:
+    return _LAZY_NAMES.get(name, f".{name}") in _NUMPY_MODULES
+
+
+if find_spec("numpy") is None:
+    __all__ = sorted(
+        name for name in [*_LAZY_NAMES, *_LAZY_MODULES] if not _needs_numpy(name)
+    )
+else:
+    __all__ = sorted([*_LAZY_NAMES, *_LAZY_MODULES])
+
+
+def __getattr__(name: str) -> object:
+    if name in _LAZY_MODULES:
+        return import_module(f".{name}", __name__)
+    if name not in _LAZY_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_NAMES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> "list[str]":
+    return sorted([*globals(), *__all__])
+
+
+if TYPE_CHECKING:
+    from . import compact_pickle, connections, instrumentation, pipeline  # noqa: F401
+    from .block_volume import BlockTransform, BlockVolume  # noqa: F401
+    from .compact_pickle import BlockBatch  # noqa: F401
+    from .edit_journal import EditJournal, JournalEntry  # noqa: F401
+    from .entity_index import EntityIndex  # noqa: F401
+    from .minecraft_object_factory import (  # noqa: F401
+        BlockFactory,
+        EnchantmentFactory,
+        EntityFactory,
+        ItemFactory,
+        MinecraftObjectFactory,
+    )
+    from .mod_info import VANILLA_JAVA_LATEST, ModInfo  # noqa: F401
+    from .multi_version import MultiVersionRegistry, RegistryDiff  # noqa: F401
+    from .objects.block import Block, BlockProperty, BlockTraits  # noqa: F401
+    from .objects.block_state.constants import Axis, Direction, Face  # noqa: F401
+    from .objects.block_state.transformations import Reflect, Rotate  # noqa: F401
+    from .objects.enchantment import Enchantment, EnchantmentTraits  # noqa: F401
+    from .objects.entity import Entity, EntityTraits  # noqa: F401
+    from .objects.inventory import Inventory  # noqa: F401
+    from .objects.item import ItemStack, ItemTraits  # noqa: F401
+    from .parallel_transform import ChunkTiming, TransformResult  # noqa: F401
+    from .pipeline import Chunk  # noqa: F401
+    from .registry_search import RegistrySearch  # noqa: F401
+    from .section_hash import SectionHashTree  # noqa: F401
+    from .shared_registry import SharedRegistry  # noqa: F401
+    from .state_translation import StateTranslator  # noqa: F401
+    from .trait_index import (  # noqa: F401
+        BlockId,
+        Field,
+        FieldRange,
+        HasProp,
+        PropValue,
+        StateValue,
+        TraitIndex,
+        TraitQuery,
+    )
+    from .trait_pool import TraitPool  # noqa: F401
+    from .volume_file import VolumeFile  # noqa: F401
@@ -1,15 +1,16 @@
-import logging
 import os.path
 from abc import ABC
+from collections.abc import Iterator
 from typing import Generic, TypeVar, get_args
 
-import toml
-
 from .mod_info import VANILLA_JAVA_LATEST, ModInfo
 from .objects.base_object import BaseObjectTraits
 from .objects.block import Block, BlockTraits
 from .objects.entity import Entity, EntityTraits
 from .objects.item import ItemStack, ItemTraits
+from .registry_search import RegistrySearch
+from .trait_index import TraitIndex, TraitQuery
+from .trait_pool import TraitPool
 
 BObjT = TypeVar("BObjT", BlockTraits, EntityTraits, ItemTraits)
 BObj = TypeVar("BObj", Block, Entity, ItemStack)
@@ -21,12 +22,25 @@ class BaseObjectFactory(ABC, Generic[BObj, BObjT]):
     imported: "list[str]"
     mods: "list[ModInfo]"
     registry: "dict[str,BObjT]"
+    search: RegistrySearch
+    trait_pool: "TraitPool | None"  # shares identical imported traits with other factories
+    _index: "TraitIndex | None"
     file_name_part: str  # block, item, or entity
+    toml_backend: "str | None" = (
+        None  # toml parser to import with, None for fastest available
+    )
     BaseObjType: BObj
     BaseObjTraitType: BObjT
 
-    def __init__(self, mods: "list[ModInfo]" = [VANILLA_JAVA_LATEST]) -> None:
+    def __init__(
+        self,
+        mods: "list[ModInfo]" = [VANILLA_JAVA_LATEST],
+        trait_pool: TraitPool = None,
+    ) -> None:
         self.registry = {}
+        self.trait_pool = trait_pool
+        self.search = RegistrySearch()
+        self._index = None
         self.mods = []
         self.imported = []
 
@@ -37,10 +51,17 @@ class BaseObjectFactory(ABC, Generic[BObj, BObjT]):
         for mod in mods:
             self.import_mod(mod)
 
+    @property
+    def index(self) -> TraitIndex:
+        """Gets inverted indexes of the registry's traits. Built on first use."""
+        if self._index is None:
+            self._index = TraitIndex(self.registry.values())
+        return self._index
+
     def import_mod(self, mod: ModInfo) -> None:
         """Register a collection of object traits to factory from file."""
         file_path = mod.get_file_path(self.file_name_part)
-        if self.load_from_toml(file_path):
+        if self.load_from_file(file_path):
             self.mods.append(mod)
 
     def load_from_toml(self, file_path: str) -> bool:
@@ -52,22 +73,83 @@ class BaseObjectFactory(ABC, Generic[BObj, BObjT]):
         Returns:
             bool: true if the file imported, otherwise false.
         """
+        return self.load_from_file(file_path)
+
+    def load_from_file(self, file_path: str) -> bool:
+        """Reads object traits from a toml or compiled file and stores to self.
+
+        Args:
+            file_path (str): location of file to read.
+
+        Returns:
+            bool: true if the file imported, otherwise false.
+        """
+        if not self._can_import(file_path):
+            return False
+        for object_traits in self.iter_file_traits(file_path):
+            self.register(object_traits)
+        self.imported.append(file_path)
+        return True
+
+    def read_file(self, file_path: str) -> "list[BObjT] | None":
+        """Reads object traits from a toml or compiled file without registering them.
+
+        Does not change the factory, so it can run in another thread while the factory is used.
+        Pass the result to register_file to store it.
+
+        Args:
+            file_path (str): location of file to read.
+
+        Returns:
+            list[BaseObjectTraits]: the file's traits, or None if the file can't be imported.
+        """
+        if not self._can_import(file_path):
+            return None
+        return list(self.iter_file_traits(file_path))
+
+    def register_file(self, file_path: str, traits: "list[BObjT]") -> None:
+        """Saves all traits read from a file. Registers none if any id is already taken."""
+        new_ids = set()
+        for object_traits in traits:
+            if object_traits.id in self.registry or object_traits.id in new_ids:
+                raise ValueError(
+                    f"Already registered {self.file_name_part} {object_traits.id}"
+                )
+            new_ids.add(object_traits.id)
+        for object_traits in traits:
+            self.register(object_traits)
+        self.imported.append(file_path)
+
+    def iter_file_traits(self, file_path: str) -> "Iterator[BObjT]":
+        """Reads object traits from a toml or compiled file one at a time."""
+        # Imported here so only programs that load data pay for the readers.
+        from .compiled_data import is_compiled, iter_compiled_objects
+        from .toml_backend import iter_toml_objects
+
+        objects = (
+            iter_compiled_objects(file_path)
+            if is_compiled(file_path)
+            else iter_toml_objects(file_path, self.toml_backend)
+        )
+        for namespace, object_id, object_data in objects:
+            if ":" not in object_id:
+                object_id = f"{namespace}:{object_id}"
+            object_traits = self.BaseObjTraitType.create_from_toml(
+                object_id, **object_data
+            )
+            if self.trait_pool is not None:
+                object_traits = self.trait_pool.intern(object_traits)
+            yield object_traits
+
+    def _can_import(self, file_path: str) -> bool:
+        import logging
+
         if not os.path.isfile(file_path):
             logging.warning(f"Skipping import. File not found: {file_path}")
             return False
         if file_path in self.imported:
             logging.warning(f"Skipping import. Already loaded file: {file_path}")
             return False
-        all_object_data: "dict[str,dict]" = toml.load(file_path)
-        for namespace, namespace_traits in all_object_data.items():
-            for object_id, object_data in namespace_traits.items():
-                if ":" not in object_id:
-                    object_id = f"{namespace}:{object_id}"
-                object_traits = self.BaseObjTraitType.create_from_toml(
-                    object_id, **object_data
-                )
-                self.register(object_traits)
-        self.imported.append(file_path)
         return True
 
     def register(self, object_traits: BaseObjectTraits) -> None:
@@ -76,7 +158,17 @@ class BaseObjectFactory(ABC, Generic[BObj, BObjT]):
             raise ValueError(
                 f"Already registered {self.file_name_part} {object_traits.id}"
             )
+        self.search.add(object_traits.id)
         self.registry[object_traits.id] = object_traits
+        if self._index is not None:
+            self._index.add(object_traits)
+
+    def query(self, trait_query: TraitQuery) -> "set[str]":
+        """Find ids of registered traits that match a query.
+
+        Example: factory.query(HasProp("facing") & Field("piston_behavior", "DESTROY"))
+        """
+        return trait_query.evaluate(self.index)
 
     def create(self, object_id: str, **kwargs) -> BObj:
         """Create a BaseObject derived object. Optionally specify initial state.
@@ -93,4 +185,8 @@ class BaseObjectFactory(ABC, Generic[BObj, BObjT]):
         if object_id in self.registry:
             return self.BaseObjType(self.registry[object_id], **kwargs)
         else:
-            raise ValueError(f"{self.__class__.__name__} has no {object_id}.")
+            message = f"{self.__class__.__name__} has no {object_id}."
+            suggestions = self.search.suggest(object_id)
+            if suggestions:
+                message += f" Did you mean: {', '.join(suggestions)}?"
+            raise ValueError(message)
@@ -0,0 +1,352 @@
+import itertools
+import weakref
+from collections.abc import Iterator
+
+import numpy
+
+from .minecraft_object_factory import BlockFactory
+from .objects.block import Block
+from .objects.block_state.constants import Axis
+from .state_translation import UNMAPPABLE, StateTranslator
+from .trait_index import TraitQuery
+
+STATE_ID_DTYPE = numpy.int32
+
+# Axes numpy.rot90 turns from and to for a right handed rotation about each axis.
+_ROTATION_PLANES = {Axis.X: (1, 2), Axis.Y: (2, 0), Axis.Z: (0, 1)}
+_AXIS_INDEX = {Axis.X: 0, Axis.Y: 1, Axis.Z: 2}
+
+# factory: {(transform name, state count): table}, for rotations and reflections
+_state_change_tables: "weakref.WeakKeyDictionary[BlockFactory, dict[tuple, numpy.ndarray]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# factory: {(query, state count): bool table of state id: matches}
+_state_masks: "weakref.WeakKeyDictionary[BlockFactory, dict[tuple, numpy.ndarray]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class BlockTransform:
+    """A change applied to every block of a volume: a rotation, reflection, replace or remap.
+
+    Each transform has a table from every state id of the source factory to a state id of
+    the target factory. Rotation and reflection tables are built once per factory by
+    transforming one block of every state, then reused for any number of blocks.
+    """
+
+    kind: str  # "rotate", "reflect", "replace" or "remap"
+    axis: "Axis | None"
+    angle: "int | None"
+    replacements: "dict[str, Block | str] | None"
+    translator: "StateTranslator | None"
+    fallback: "int | None"
+
+    def __init__(
+        self,
+        kind: str,
+        axis: Axis = None,
+        angle: int = None,
+        replacements: "dict[str, Block | str]" = None,
+        translator: StateTranslator = None,
+        fallback: int = None,
+    ) -> None:
+        self.kind = kind
+        self.axis = axis
+        self.angle = angle
+        self.replacements = replacements
+        self.translator = translator
+        self.fallback = fallback
+
+    def __repr__(self) -> str:
+        return f"BlockTransform({self.name})"
+
+    @property
+    def name(self) -> str:
+        return " ".join(str(x) for x in (self.kind, self.axis, self.angle) if x)
+
+    @staticmethod
+    def rotate(axis: Axis, angle: int) -> "BlockTransform":
+        """Rotate blocks and their positions about axis. See Block.rotate."""
+        angle = angle % 360
+        if angle not in [90, 180, 270]:
+            raise ValueError("Rotation angle must correspond to 90, 180, or 270")
+        return BlockTransform("rotate", axis=Axis(str(axis).lower()), angle=angle)
+
+    @staticmethod
+    def reflect(axis: Axis) -> "BlockTransform":
+        """Reflect blocks and their positions along axis. See Block.reflect."""
+        return BlockTransform("reflect", axis=Axis(str(axis).lower()))
+
+    @staticmethod
+    def replace(replacements: "dict[str, Block | str]") -> "BlockTransform":
+        """Replace every state of some blocks with another block, keeping what state fits.
+
+        Properties the replacement block has, with a value it allows, are copied from the
+        replaced state. Other properties take their value from the replacement: its
+        default state for a block id, or its current state for a Block.
+
+        Example:
+            BlockTransform.replace({"oak_stairs": "spruce_stairs", "oak_planks": "spruce_planks"})
+
+        Args:
+            replacements (dict[str, Block | str]): block id to replace: block or block id to
+                replace it with.
+        """
+        return BlockTransform("replace", replacements=dict(replacements))
+
+    @staticmethod
+    def remap(translator: StateTranslator, fallback: int = None) -> "BlockTransform":
+        """Translate state ids to another factory. Positions don't move.
+
+        Args:
+            translator (StateTranslator): translates from the volume's factory.
+            fallback (int): Optional. Target state id for states the translator can't map.
+        """
+        return BlockTransform("remap", translator=translator, fallback=fallback)
+
+    def target_factory(self, block_factory: BlockFactory) -> BlockFactory:
+        """Get the factory the transformed state ids belong to."""
+        if self.translator is not None:
+            return self.translator.target
+        return block_factory
+
+    def table(self, block_factory: BlockFactory) -> numpy.ndarray:
+        """Get the table from each state id of block_factory to its transformed state id."""
+        if self.translator is not None:
+            if self.translator.source is not block_factory:
+                raise ValueError("The translator does not translate from this factory")
+            table = numpy.array(self.translator.table, dtype=STATE_ID_DTYPE)
+            if self.fallback is not None:
+                table[table == UNMAPPABLE] = self.fallback
+            return table
+        if self.kind == "replace":
+            return _replace_table(block_factory, self.replacements)
+        tables = _state_change_tables.setdefault(block_factory, {})
+        key = (self.name, block_factory.state_count)
+        if key not in tables:
+            tables[key] = self._build_table(block_factory)
+        return tables[key]
+
+    def _build_table(self, block_factory: BlockFactory) -> numpy.ndarray:
+        table = numpy.empty(block_factory.state_count, dtype=STATE_ID_DTYPE)
+        for state_id, block_id, state in block_factory.iter_states():
+            block = Block(block_factory.registry[block_id])
+            block._state.update(state)
+            if self.kind == "rotate":
+                block.rotate(self.axis, self.angle)
+            else:
+                block.reflect(self.axis)
+            table[state_id] = block_factory.state_id(block)
+        return table
+
+    def move_positions(self, state_ids: numpy.ndarray) -> numpy.ndarray:
+        """Get a view of a volume's state ids with positions rotated or reflected."""
+        if self.kind == "rotate":
+            return numpy.rot90(
+                state_ids, self.angle // 90, axes=_ROTATION_PLANES[self.axis]
+            )
+        if self.kind == "reflect":
+            return numpy.flip(state_ids, axis=_AXIS_INDEX[self.axis])
+        return state_ids
+
+    def move_region(
+        self, region: "tuple[slice, slice, slice]", shape: "tuple[int, int, int]"
+    ) -> "tuple[tuple[slice, slice, slice], tuple[int, int, int]]":
+        """Get where a box of a volume ends up after move_positions, and the moved shape.
+
+        Args:
+            region (tuple[slice, slice, slice]): a box with bounds, as from BlockVolume.region.
+            shape (tuple[int, int, int]): the shape of the whole volume.
+        """
+        bounds = [(r.start, r.stop) for r in region]
+        shape = list(shape)
+        if self.kind == "rotate":
+            a, b = _ROTATION_PLANES[self.axis]
+            for _ in range(self.angle // 90):
+                # numpy.rot90 flips axis b, then swaps axes a and b.
+                (lo_a, hi_a), (lo_b, hi_b) = bounds[a], bounds[b]
+                bounds[a], bounds[b] = (shape[b] - hi_b, shape[b] - lo_b), (lo_a, hi_a)
+                shape[a], shape[b] = shape[b], shape[a]
+        elif self.kind == "reflect":
+            c = _AXIS_INDEX[self.axis]
+            lo, hi = bounds[c]
+            bounds[c] = (shape[c] - hi, shape[c] - lo)
+        return tuple(slice(lo, hi) for lo, hi in bounds), tuple(shape)
+
+
+class BlockVolume:
+    """A box of blocks stored as global state ids in a numpy array indexed [x, y, z].
+
+    Storing ids instead of Block objects takes 4 bytes per block and lets whole volumes be
+    transformed with table lookups. Block objects are created on access. Blocks in a volume
+    don't keep inventories.
+
+    Example:
+        volume = BlockVolume.filled(factory.block, (16, 16, 16), "air")
+        volume[0, 0, 0] = factory.block.create("oak_stairs", facing="east")
+        rotated = volume.rotate(Axis.Y, 90)
+    """
+
+    factory: BlockFactory
+    state_ids: numpy.ndarray
+
+    @property
+    def shape(self) -> "tuple[int, int, int]":
+        return self.state_ids.shape
+
+    def __init__(self, factory: BlockFactory, state_ids: numpy.ndarray) -> None:
+        state_ids = numpy.asarray(state_ids)
+        if state_ids.ndim != 3:
+            raise ValueError(
+                f"State ids must be 3 dimensional. Shape: {state_ids.shape}"
+            )
+        self.factory = factory
+        self.state_ids = state_ids.astype(STATE_ID_DTYPE, copy=False)
+
+    @staticmethod
+    def filled(
+        factory: BlockFactory, shape: "tuple[int, int, int]", block: "Block | str"
+    ) -> "BlockVolume":
+        """Create a volume where every position holds the same block."""
+        if isinstance(block, str):
+            block = factory.create(block)
+        return BlockVolume(
+            factory, numpy.full(shape, factory.state_id(block), dtype=STATE_ID_DTYPE)
+        )
+
+    def __getitem__(self, position: "tuple[int, int, int]") -> Block:
+        return self.factory.create_from_state_id(int(self.state_ids[position]))
+
+    def __setitem__(self, position: "tuple[int, int, int]", block: Block) -> None:
+        self.state_ids[position] = self.factory.state_id(block)
+
+    def __eq__(self, other: "BlockVolume") -> bool:
+        try:
+            return self.factory is other.factory and numpy.array_equal(
+                self.state_ids, other.state_ids
+            )
+        except AttributeError:
+            return False
+
+    def copy(self) -> "BlockVolume":
+        return BlockVolume(self.factory, self.state_ids.copy())
+
+    def region(
+        self, index: "tuple[int | slice, int | slice, int | slice]"
+    ) -> "tuple[slice, slice, slice]":
+        """Get the box covered by a position or slices as slices with bounds within the volume.
+
+        Args:
+            index (tuple[int | slice, ...]): such as (x, y, z) or (slice(0, 32), 64, slice(None)).
+                Slices can't have steps.
+        """
+        return region_of(index, self.shape)
+
+    def mask(self, trait_query: TraitQuery) -> numpy.ndarray:
+        """Get a boolean array of the positions whose block state matches a query.
+
+        The query is evaluated once per state and cached, then looked up for every position.
+
+        Example: volume.mask(StateValue("facing", "north") & ~BlockId("chest"))
+        """
+        return state_mask(self.factory, trait_query)[self.state_ids]
+
+    def positions(self, trait_query: TraitQuery) -> numpy.ndarray:
+        """Get the (x, y, z) of every position whose block state matches a query.
+
+        Returns:
+            numpy.ndarray: shaped (matches, 3), in C order.
+        """
+        return numpy.argwhere(self.mask(trait_query))
+
+    def transform(self, *transforms: BlockTransform) -> "BlockVolume":
+        """Apply transforms in order and return the result as a new volume."""
+        from .parallel_transform import transform_volume
+
+        return transform_volume(self, transforms, max_workers=1).volume
+
+    def replace(self, replacements: "dict[str, Block | str]") -> "BlockVolume":
+        """Replace blocks throughout the volume. See BlockTransform.replace."""
+        return self.transform(BlockTransform.replace(replacements))
+
+    def rotate(self, axis: Axis, angle: int) -> "BlockVolume":
+        """Rotate the whole volume about axis, moving positions and rotating states."""
+        return self.transform(BlockTransform.rotate(axis, angle))
+
+    def reflect(self, axis: Axis) -> "BlockVolume":
+        """Reflect the whole volume along axis, moving positions and reflecting states."""
+        return self.transform(BlockTransform.reflect(axis))
+
+
+def _replace_table(
+    block_factory: BlockFactory, replacements: "dict[str, Block | str]"
+) -> numpy.ndarray:
+    """Build a state id table that sends every state of each replaced block to its replacement."""
+    table = numpy.arange(block_factory.state_count, dtype=STATE_ID_DTYPE)
+    for source_id, target in replacements.items():
+        if isinstance(target, str):
+            target = block_factory.create(target)
+        conversion = block_factory.conversion_table(source_id, target)
+        first = block_factory.first_state_id(source_id)
+        table[first : first + len(conversion)] = block_factory.first_state_id(
+            target.id
+        ) + numpy.asarray(conversion)
+    return table
+
+
+def state_mask(block_factory: BlockFactory, trait_query: TraitQuery) -> numpy.ndarray:
+    """Get a table of whether each state id of block_factory matches a query.
+
+    Tables are cached by factory and query. See BlockFactory.state_bits.
+    """
+    masks = _state_masks.setdefault(block_factory, {})
+    key = (trait_query, block_factory.state_count)
+    try:
+        return masks[key]
+    except KeyError:
+        pass
+    except TypeError:  # arguments that can't be hashed
+        key = None
+    state_count = block_factory.state_count
+    bits = block_factory.state_bits(trait_query)
+    mask = numpy.unpackbits(
+        numpy.frombuffer(bits.to_bytes(-(-state_count // 8), "little"), numpy.uint8),
+        count=state_count,
+        bitorder="little",
+    ).astype(bool)
+    if key is not None:
+        masks[key] = mask
+    return mask
+
+
+def region_of(
+    index: "tuple[int | slice, int | slice, int | slice]", shape: "tuple[int, int, int]"
+) -> "tuple[slice, slice, slice]":
+    """Get the box of a volume of shape covered by a position or slices. See BlockVolume.region."""
+    if len(index) != 3:
+        raise ValueError(f"A region needs an index for x, y and z: {index}")
+    region = []
+    for i, n in zip(index, shape):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(n)
+            if step != 1:
+                raise ValueError(f"Region slices can't have steps: {index}")
+            region.append(slice(start, max(start, stop)))
+        else:
+            start = i + n if i < 0 else i
+            if not 0 <= start < n:
+                raise IndexError(f"Position {index} is outside volume {shape}")
+            region.append(slice(start, start + 1))
+    return tuple(region)
+
+
+def iter_tiles(
+    shape: "tuple[int, int, int]", tile_shape: "tuple[int, int, int]"
+) -> "Iterator[tuple[slice, slice, slice]]":
+    """Generate boxes of at most tile_shape that cover a volume of shape, in C order."""
+    starts = [range(0, n, t) for n, t in zip(shape, tile_shape)]
+    for start in itertools.product(*starts):
+        yield tuple(
+            slice(a, min(a + t, n)) for a, t, n in zip(start, tile_shape, shape)
+        )
@@ -0,0 +1,252 @@
+"""Pickle blocks, item stacks and inventories as references into a registered factory.
+
+By default pickling a Block or ItemStack copies its whole traits, with every block property
+and allowed value list. After register_pickle_factory(factory), objects whose traits come
+from that factory pickle as their id and state instead:
+    Block           (block id, state index, inventory if it holds items)
+    ItemStack       (item id, count, damage, [(enchantment id, level), ...])
+    Inventory       columns: occupied slots, item id palette, and per slot palette
+                    index, count and damage arrays
+    BlockBatch      palette of (block id, state index) and an array of palette indexes
+
+The receiving process must register a factory with the same ids before unpickling, for
+example in a process pool's initializer. Objects with traits the registered factory doesn't
+hold pickle in full as before.
+
+Example:
+    register_pickle_factory(factory)
+    with ProcessPoolExecutor(initializer=register_pickle_factory, initargs=(factory,)) as pool:
+        ...
+"""
+import copyreg
+from array import array
+
+from .minecraft_object_factory import MinecraftObjectFactory
+from .objects.block import Block
+from .objects.enchantment import Enchantment
+from .objects.inventory import Inventory
+from .objects.item import ItemStack
+
+_factory: "MinecraftObjectFactory | None" = None
+
+
+class BlockBatch(list):
+    """A list of blocks that pickles as a palette and an index array.
+
+    Blocks that hold items are pickled on their own.
+    """
+
+
+def register_pickle_factory(factory: "MinecraftObjectFactory | None") -> None:
+    """Pickle objects from factory by reference, and resolve references against it.
+
+    Args:
+        factory (MinecraftObjectFactory): the factory to use, or None to pickle in full again.
+    """
+    global _factory
+    _factory = factory
+    for cls, reduce in _REDUCERS.items():
+        if factory is None:
+            copyreg.dispatch_table.pop(cls, None)
+        else:
+            copyreg.pickle(cls, reduce)
+
+
+def get_pickle_factory() -> "MinecraftObjectFactory | None":
+    return _factory
+
+
+def _registered(factory_name: str, object_id: str, traits: object) -> bool:
+    return (
+        _factory is not None
+        and getattr(_factory, factory_name).registry.get(object_id) is traits
+    )
+
+
+def _require_factory() -> MinecraftObjectFactory:
+    if _factory is None:
+        raise RuntimeError(
+            "Objects were pickled by registry reference. Call register_pickle_factory first."
+        )
+    return _factory
+
+
+def _full(obj: object) -> tuple:
+    """Pickle obj the default way."""
+    return object.__reduce_ex__(obj, 4)
+
+
+def _has_items(block: Block) -> bool:
+    inventory = getattr(block, "inventory", None)
+    return inventory is not None and any(i is not None for i in inventory)
+
+
+def _reduce_block(block: Block) -> tuple:
+    if not _registered("block", block.id, block.traits):
+        return _full(block)
+    inventory = block.inventory if _has_items(block) else None
+    return _rebuild_block, (block.id, block.state_index, inventory)
+
+
+def _rebuild_block(block_id: str, state_index: int, inventory: Inventory) -> Block:
+    traits = _require_factory().block.registry[block_id]
+    block = Block(traits)
+    block._state.update(traits.state_from_index(state_index))
+    if inventory is not None:
+        block.inventory = inventory
+    return block
+
+
+def _enchantment_refs(item_stack: ItemStack) -> "list[tuple[str, int]] | None":
+    """Get enchantments as (id, level), or None if one isn't registered."""
+    refs = []
+    for enchantment in item_stack.enchantments:
+        if not (
+            type(enchantment) is Enchantment
+            and _registered("enchantment", enchantment.id, enchantment.traits)
+        ):
+            return None
+        refs.append((enchantment.id, enchantment.level))
+    return refs
+
+
+def _rebuild_enchantments(refs: "list[tuple[str, int]]") -> "list[Enchantment]":
+    registry = _require_factory().enchantment.registry
+    return [Enchantment(registry[i], level=level) for i, level in refs]
+
+
+def _reduce_item_stack(item_stack: ItemStack) -> tuple:
+    refs = _enchantment_refs(item_stack)
+    if refs is None or not _registered("item", item_stack.id, item_stack.traits):
+        return _full(item_stack)
+    return _rebuild_item_stack, (
+        item_stack.id,
+        item_stack.count,
+        item_stack.damage,
+        refs,
+    )
+
+
+def _rebuild_item_stack(
+    item_id: str, count: int, damage: int, refs: "list[tuple[str, int]]"
+) -> ItemStack:
+    traits = _require_factory().item.registry[item_id]
+    return ItemStack(
+        traits, count=count, damage=damage, enchantments=_rebuild_enchantments(refs)
+    )
+
+
+def _reduce_inventory(inventory: Inventory) -> tuple:
+    if type(inventory) is not Inventory:
+        return _full(inventory)
+    slots = array("i")
+    palette = {}
+    item_refs = []
+    counts = array("i")
+    damages = array("i")
+    enchantments = {}
+    for slot, item_stack in enumerate(inventory):
+        if item_stack is None:
+            continue
+        refs = _enchantment_refs(item_stack)
+        if refs is None or not _registered("item", item_stack.id, item_stack.traits):
+            return _full(inventory)
+        if refs:
+            enchantments[len(slots)] = refs
+        slots.append(slot)
+        item_refs.append(palette.setdefault(item_stack.id, len(palette)))
+        counts.append(item_stack.count)
+        damages.append(item_stack.damage)
+    return _rebuild_inventory, (
+        len(inventory),
+        slots,
+        list(palette),
+        array(_index_typecode(len(palette)), item_refs),
+        counts,
+        damages,
+        enchantments,
+        sorted(inventory._dirty),
+    )
+
+
+def _rebuild_inventory(
+    capacity: int,
+    slots: "array[int]",
+    palette: "list[str]",
+    item_refs: "array[int]",
+    counts: "array[int]",
+    damages: "array[int]",
+    enchantments: "dict[int, list[tuple[str, int]]]",
+    dirty: "list[int]",
+) -> Inventory:
+    registry = _require_factory().item.registry
+    traits = [registry[item_id] for item_id in palette]
+    inventory = Inventory(capacity)
+    for i, slot in enumerate(slots):
+        inventory._inventory[slot] = ItemStack(
+            traits[item_refs[i]],
+            count=counts[i],
+            damage=damages[i],
+            enchantments=_rebuild_enchantments(enchantments.get(i, [])),
+        )
+    inventory._dirty = set(dirty)
+    return inventory
+
+
+def _reduce_block_batch(batch: BlockBatch) -> tuple:
+    palette = {}
+    refs = []
+    separate = {}  # position: block pickled on its own
+    for position, block in enumerate(batch):
+        if type(block) is not Block or not _registered("block", block.id, block.traits):
+            return _full(batch)
+        if _has_items(block):
+            separate[position] = block
+            refs.append(0)
+        else:
+            key = (block.id, block.state_index)
+            refs.append(palette.setdefault(key, len(palette)))
+    return _rebuild_block_batch, (
+        list(palette),
+        array(_index_typecode(len(palette)), refs),
+        separate,
+    )
+
+
+def _rebuild_block_batch(
+    palette: "list[tuple[str, int]]",
+    refs: "array[int]",
+    separate: "dict[int, Block]",
+) -> BlockBatch:
+    registry = _require_factory().block.registry
+    states = [
+        (registry[block_id], registry[block_id].state_from_index(index))
+        for block_id, index in palette
+    ]
+    batch = BlockBatch()
+    for position, ref in enumerate(refs):
+        if position in separate:
+            batch.append(separate[position])
+            continue
+        traits, state = states[ref]
+        block = Block(traits)
+        block._state.update(state)
+        batch.append(block)
+    return batch
+
+
+def _index_typecode(palette_size: int) -> str:
+    """Get the smallest array typecode that holds indexes into a palette."""
+    if palette_size <= 0x100:
+        return "B"
+    if palette_size <= 0x10000:
+        return "H"
+    return "L"
+
+
+_REDUCERS = {
+    Block: _reduce_block,
+    ItemStack: _reduce_item_stack,
+    Inventory: _reduce_inventory,
+    BlockBatch: _reduce_block_batch,
+}
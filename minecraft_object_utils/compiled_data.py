@@ -0,0 +1,178 @@
+"""Compile object traits toml files into a compact format that loads much faster.
+
+A compiled file sits next to its source, with COMPILED_SUFFIX in place of ".toml". The first
+line is a json header with the format version and a hash of the source toml. The second line
+is a json body with every name stored once in a string table, allowed value lists shared
+between block properties, and one row per object that refers to both by index:
+    [namespace, object id, [[property, default, allowed values], ...], [field, value, ...]]
+
+Compile the bundled data, or any mod directories, from the command line:
+    python -m minecraft_object_utils.compiled_data [directory ...]
+"""
+import glob
+import hashlib
+import json
+import os.path
+import sys
+from collections.abc import Iterator
+
+from .toml_backend import iter_toml_objects
+
+COMPILED_FORMAT = 1
+COMPILED_SUFFIX = ".compiled.json"
+FILE_KINDS = ["block", "enchantment", "entity", "item"]
+
+
+def compiled_path_for(toml_path: str) -> str:
+    """Get where the compiled version of a toml file goes."""
+    return os.path.splitext(toml_path)[0] + COMPILED_SUFFIX
+
+
+def is_compiled(file_path: str) -> bool:
+    return file_path.endswith(COMPILED_SUFFIX)
+
+
+def source_hash(toml_path: str) -> str:
+    """Hash a toml file so a compiled file can tell if it is out of date."""
+    with open(toml_path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def read_header(compiled_path: str) -> dict:
+    """Read only the header line of a compiled file."""
+    with open(compiled_path, encoding="utf-8") as file:
+        return json.loads(file.readline())
+
+
+def is_up_to_date(compiled_path: str, toml_path: str) -> bool:
+    """Check if a compiled file exists and was made from the current toml file.
+
+    A compiled file with no toml file next to it is always used.
+    """
+    if not os.path.isfile(compiled_path):
+        return False
+    try:
+        header = read_header(compiled_path)
+    except (OSError, ValueError):
+        return False
+    if header.get("format") != COMPILED_FORMAT:
+        return False
+    return not os.path.isfile(toml_path) or header.get("source_sha256") == source_hash(
+        toml_path
+    )
+
+
+def compile_toml(toml_path: str, compiled_path: str = None) -> str:
+    """Write the compiled version of a toml file.
+
+    Args:
+        toml_path (str): location of the toml file.
+        compiled_path (str): Optional. Where to write. Defaults to next to the toml file.
+
+    Returns:
+        str: location of the compiled file.
+    """
+    if compiled_path is None:
+        compiled_path = compiled_path_for(toml_path)
+    strings = []
+    string_index = {}
+    value_lists = []
+    value_list_index = {}
+
+    def intern(value: str) -> int:
+        if value not in string_index:
+            string_index[value] = len(strings)
+            strings.append(value)
+        return string_index[value]
+
+    def intern_list(values: "list[str]") -> int:
+        key = tuple(intern(str(v)) for v in values)
+        if key not in value_list_index:
+            value_list_index[key] = len(value_lists)
+            value_lists.append(list(key))
+        return value_list_index[key]
+
+    objects = []
+    for namespace, object_id, object_data in iter_toml_objects(toml_path):
+        fields = dict(object_data)
+        props = [
+            [intern(name), intern(str(state["default"])), intern_list(state["allowed"])]
+            for name, state in fields.pop("properties", {}).items()
+        ]
+        row = [intern(namespace), intern(object_id), props]
+        if fields:
+            row.append(
+                [x for key, value in fields.items() for x in (intern(key), value)]
+            )
+        objects.append(row)
+
+    header = {
+        "format": COMPILED_FORMAT,
+        "source": os.path.basename(toml_path),
+        "source_sha256": source_hash(toml_path),
+    }
+    body = {"strings": strings, "value_lists": value_lists, "objects": objects}
+    with open(compiled_path, "w", encoding="utf-8") as file:
+        file.write(json.dumps(header) + "\n")
+        file.write(json.dumps(body, separators=(",", ":")) + "\n")
+    return compiled_path
+
+
+def compile_directory(directory: str) -> "list[str]":
+    """Compile every <namespace>-<version>-<kind>.toml file in a directory.
+
+    Returns:
+        list[str]: locations of the compiled files.
+    """
+    compiled = []
+    for kind in FILE_KINDS:
+        for toml_path in sorted(glob.glob(os.path.join(directory, f"*-{kind}.toml"))):
+            compiled.append(compile_toml(toml_path))
+    return compiled
+
+
+def iter_compiled_objects(compiled_path: str) -> "Iterator[tuple[str, str, dict]]":
+    """Read a compiled file.
+
+    Yields:
+        tuple[str, str, dict]: namespace, object id, and the object's data in toml layout.
+    """
+    with open(compiled_path, encoding="utf-8") as file:
+        header = json.loads(file.readline())
+        if header.get("format") != COMPILED_FORMAT:
+            raise ValueError(
+                f"Unsupported compiled format {header.get('format')} in {compiled_path}"
+            )
+        body = json.loads(file.readline())
+    strings = body["strings"]
+    value_lists = [
+        [strings[i] for i in value_list] for value_list in body["value_lists"]
+    ]
+    for row in body["objects"]:
+        object_data = {}
+        if len(row) > 3:
+            fields = row[3]
+            for i in range(0, len(fields), 2):
+                object_data[strings[fields[i]]] = fields[i + 1]
+        if row[2]:
+            object_data["properties"] = {
+                strings[name]: {
+                    "default": strings[default],
+                    "allowed": value_lists[allowed],
+                }
+                for name, default, allowed in row[2]
+            }
+        yield strings[row[0]], strings[row[1]], object_data
+
+
+def main(directories: "list[str]") -> None:
+    """Compile the toml files in each directory. Defaults to the bundled vanilla data."""
+    from .mod_info import VANILLA_DATA_DIRECTORY
+
+    for directory in directories or [VANILLA_DATA_DIRECTORY]:
+        for compiled_path in compile_directory(directory):
+            print(f"Compiled {compiled_path}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,445 @@
+"""Recompute the connection states of fences, panes, walls and redstone wire from neighbours.
+
+After a paste or transform, the north, south, east, west and up properties of connecting
+blocks no longer match their neighbours. Instead of checking blocks one at a time, tables
+built once per factory say what each state is and connects to, and every position is
+compared with its neighbours at once by shifting the whole array of state ids.
+
+The block data has no collision shapes, so whether a neighbour has a solid face is a
+query. solid_query guesses it from piston behavior and properties; pass another query to
+decide it differently.
+
+Example:
+    pasted = volume.rotate(Axis.Y, 90)
+    update_connections(pasted)
+"""
+import weakref
+
+import numpy
+
+from .block_volume import STATE_ID_DTYPE, BlockVolume, iter_tiles, region_of, state_mask
+from .minecraft_object_factory import BlockFactory
+from .objects.block import BlockTraits
+from .trait_index import BlockId, Field, HasProp, TraitQuery
+from .volume_file import DEFAULT_TILE_SHAPE, VolumeFile
+
+NONE, FENCE, PANE, WALL, WIRE = range(5)
+
+# side property, x offset, z offset
+SIDES = [("north", 0, -1), ("south", 0, 1), ("west", -1, 0), ("east", 1, 0)]
+
+# kind: property value for not connected, connected, and raised
+_VALUES = {
+    FENCE: ("false", "true", "true"),
+    PANE: ("false", "true", "true"),
+    WALL: ("none", "low", "tall"),
+    WIRE: ("none", "side", "up"),
+}
+
+# Blocks that pass the default solid query but don't have full faces, or that fences
+# don't connect to, matched by the end of their id.
+_NOT_SOLID_SUFFIXES = (
+    "air",
+    "_carpet",
+    "banner",
+    "barrier",
+    "beacon",
+    "brewing_stand",
+    "cauldron",
+    "daylight_detector",
+    "end_gateway",
+    "end_rod",
+    "_fence_gate",
+    "hopper",
+    "jack_o_lantern",
+    "_leaves",
+    "melon",
+    "moving_piston",
+    "piston_head",
+    "portal",
+    "pumpkin",
+    "shulker_box",
+)
+
+# Blocks that redstone wire connects to from any side, besides buttons and pressure plates
+_REDSTONE_COMPONENTS = {
+    "calibrated_sculk_sensor",
+    "comparator",
+    "daylight_detector",
+    "detector_rail",
+    "lectern",
+    "lever",
+    "lightning_rod",
+    "redstone_block",
+    "redstone_torch",
+    "redstone_wall_torch",
+    "sculk_sensor",
+    "target",
+    "trapped_chest",
+    "tripwire_hook",
+}
+
+# Blocks above a wall that raise its post
+_POST_SUFFIXES = ("torch", "lantern", "_sign", "banner", "_pressure_plate")
+
+# factory: {(solid query, state count): ConnectionTables}
+_connection_tables: "weakref.WeakKeyDictionary[BlockFactory, dict[tuple, ConnectionTables]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class ConnectionTables:
+    """What each state id of a factory is and connects to, for connection updates.
+
+    Every table has one entry per state id, plus a last entry for positions outside the
+    volume, which nothing connects to.
+
+    Attributes:
+        kind (numpy.ndarray): NONE, FENCE, PANE, WALL or WIRE.
+        base (numpy.ndarray): the state id with its connection properties at index 0.
+        side_offsets (numpy.ndarray): shaped (4, states, 3). What to add to base for each
+            side of SIDES not connected, connected or raised.
+        up_offsets (numpy.ndarray): shaped (states, 2). What to add to base for a wall
+            without and with a post.
+    """
+
+    kind: numpy.ndarray
+    solid: numpy.ndarray
+    fence_family: numpy.ndarray  # fences connect to fences of the same family
+    gate_axis: numpy.ndarray  # 0 for fence gates facing along x, 2 along z, else -1
+    redstone: numpy.ndarray  # connects to redstone wire from any side
+    repeater_axis: numpy.ndarray  # 0 for repeaters facing along x, 2 along z, else -1
+    observer_side: numpy.ndarray  # index into SIDES of an observer's facing, else -1
+    raises_post: numpy.ndarray
+    was_dot: numpy.ndarray  # redstone wire not connected on any side
+    base: numpy.ndarray
+    side_offsets: numpy.ndarray
+    up_offsets: numpy.ndarray
+
+    @property
+    def outside(self) -> int:
+        """The state id that stands for positions outside the volume."""
+        return len(self.kind) - 1
+
+    def __init__(self, block_factory: BlockFactory, solid: TraitQuery) -> None:
+        size = block_factory.state_count + 1
+        self.kind = numpy.zeros(size, dtype=numpy.int8)
+        self.solid = numpy.append(state_mask(block_factory, solid), False)
+        self.fence_family = numpy.full(size, -1, dtype=numpy.int32)
+        self.gate_axis = numpy.full(size, -1, dtype=numpy.int8)
+        self.redstone = numpy.zeros(size, dtype=bool)
+        self.repeater_axis = numpy.full(size, -1, dtype=numpy.int8)
+        self.observer_side = numpy.full(size, -1, dtype=numpy.int8)
+        self.raises_post = numpy.zeros(size, dtype=bool)
+        self.was_dot = numpy.zeros(size, dtype=bool)
+        self.base = numpy.arange(size, dtype=STATE_ID_DTYPE)
+        self.side_offsets = numpy.zeros((len(SIDES), size, 3), dtype=STATE_ID_DTYPE)
+        self.up_offsets = numpy.zeros((size, 2), dtype=STATE_ID_DTYPE)
+        families = {}
+        for traits in block_factory.registry.values():
+            self._add_block(block_factory, traits, families)
+
+    def _add_block(
+        self,
+        block_factory: BlockFactory,
+        traits: BlockTraits,
+        families: "dict[str, int]",
+    ) -> None:
+        """Fill in the entries of one block's states."""
+        namespace, _, name = traits.id.rpartition(":")
+        first = block_factory.first_state_id(traits.id)
+        ids = slice(first, first + traits.state_count)
+        index = numpy.arange(traits.state_count)
+        layout = {
+            prop.id: (prop, stride) for prop, stride in traits._get_state_layout()
+        }
+        if name in _REDSTONE_COMPONENTS or name.endswith(
+            ("_button", "_pressure_plate")
+        ):
+            self.redstone[ids] = True
+        if name.endswith(_POST_SUFFIXES):
+            self.raises_post[ids] = True
+        if "facing" in layout:
+            self._add_facing(name, ids, _prop_values(layout, index, "facing"))
+        kind = _connection_kind(name, layout)
+        if kind == NONE:
+            return
+        self.kind[ids] = kind
+        for side, (prop_name, _, _) in enumerate(SIDES):
+            prop, stride = layout[prop_name]
+            self.base[ids] -= (index // stride % len(prop.allowed)) * stride
+            self.side_offsets[side, ids] = [
+                prop.value_index[value] * stride for value in _VALUES[kind]
+            ]
+        if kind == WALL and "up" in layout:
+            prop, stride = layout["up"]
+            self.base[ids] -= (index // stride % len(prop.allowed)) * stride
+            self.up_offsets[ids] = [
+                prop.value_index[value] * stride for value in ("false", "true")
+            ]
+        if kind == WIRE:
+            self.was_dot[ids] = numpy.all(
+                [_prop_values(layout, index, side[0]) == "none" for side in SIDES],
+                axis=0,
+            )
+        if kind == FENCE:
+            # Wooden fences connect to each other, other fences only to their own kind.
+            planks = f"{namespace}:{name[: -len('_fence')]}_planks"
+            family = "wooden" if planks in block_factory.registry else traits.id
+            self.fence_family[ids] = families.setdefault(family, len(families))
+
+    def _add_facing(self, name: str, ids: slice, facing: numpy.ndarray) -> None:
+        """Fill in the axis or side of blocks whose facing decides what connects."""
+        along_x = numpy.where(numpy.isin(facing, ["east", "west"]), 0, 2)
+        if name.endswith("_fence_gate"):
+            self.gate_axis[ids] = along_x
+        elif name == "repeater":
+            self.repeater_axis[ids] = along_x
+        elif name == "observer":
+            self.observer_side[ids] = [
+                next((i for i, s in enumerate(SIDES) if s[0] == f), -1) for f in facing
+            ]
+
+
+def solid_query(block_factory: BlockFactory) -> TraitQuery:
+    """Guess which blocks have solid faces that fences, panes and walls connect to.
+
+    Blocks that pistons destroy or that can be waterlogged are mostly not full cubes, and
+    a list of other shapes is left out by id.
+    """
+    not_solid = [
+        block_id
+        for block_id in block_factory.registry
+        if block_id.endswith(_NOT_SOLID_SUFFIXES)
+    ]
+    return (
+        ~Field("piston_behavior", "DESTROY")
+        & ~HasProp("waterlogged")
+        & ~BlockId(*not_solid)
+    )
+
+
+def connection_tables(
+    block_factory: BlockFactory, solid: TraitQuery = None
+) -> ConnectionTables:
+    """Get the tables for a factory, built on first use and cached.
+
+    Args:
+        solid (TraitQuery): Optional. Blocks with solid faces. Defaults to solid_query.
+    """
+    if solid is None:
+        solid = solid_query(block_factory)
+    by_query = _connection_tables.setdefault(block_factory, {})
+    key = (solid, block_factory.state_count)
+    if key not in by_query:
+        by_query[key] = ConnectionTables(block_factory, solid)
+    return by_query[key]
+
+
+def recompute_connections(
+    block_factory: BlockFactory, state_ids: numpy.ndarray, solid: TraitQuery = None
+) -> numpy.ndarray:
+    """Get state ids with the connections of every connecting block matching its neighbours.
+
+    Positions outside the array count as empty. Other properties, such as waterlogged and
+    redstone power, are kept.
+
+    Args:
+        state_ids (numpy.ndarray): state ids of block_factory, indexed [x, y, z].
+        solid (TraitQuery): Optional. Blocks with solid faces. Defaults to solid_query.
+
+    Returns:
+        numpy.ndarray: a new array of state ids.
+    """
+    tables = connection_tables(block_factory, solid)
+    state_ids = numpy.asarray(state_ids, dtype=STATE_ID_DTYPE)
+    kind = tables.kind[state_ids]
+    if not kind.any():
+        return state_ids.copy()
+    padded = numpy.pad(state_ids, 1, constant_values=tables.outside)
+    shape = state_ids.shape
+
+    def near(table: numpy.ndarray, dx: int, dy: int, dz: int) -> numpy.ndarray:
+        """Look up table for the neighbour of every position at an offset."""
+        return table[
+            padded[
+                1 + dx : 1 + dx + shape[0],
+                1 + dy : 1 + dy + shape[1],
+                1 + dz : 1 + dz + shape[2],
+            ]
+        ]
+
+    solid_above = near(tables.solid, 0, 1, 0)
+    is_wire = tables.kind == WIRE
+    levels = []  # per side: 0 not connected, 1 connected, 2 raised
+    for side, (_, dx, dz) in enumerate(SIDES):
+        axis = 0 if dx else 2
+        neighbour = near(tables.kind, dx, 0, dz)
+        solid = near(tables.solid, dx, 0, dz)
+        gate = near(tables.gate_axis, dx, 0, dz)
+        gate = (gate >= 0) & (gate != axis)
+        fence = (neighbour == FENCE) & (
+            near(tables.fence_family, dx, 0, dz) == tables.fence_family[state_ids]
+        )
+        pane = (neighbour == PANE) | (neighbour == WALL)
+        wire_side = (
+            (neighbour == WIRE)
+            | near(tables.redstone, dx, 0, dz)
+            | (near(tables.repeater_axis, dx, 0, dz) == axis)
+            | (near(tables.observer_side, dx, 0, dz) == side)
+            | (near(is_wire, dx, -1, dz) & ~solid)
+        )
+        wire_up = near(is_wire, dx, 1, dz) & solid & ~solid_above
+        level = numpy.select(
+            [
+                kind == FENCE,
+                kind == PANE,
+                kind == WALL,
+                wire_up,
+                wire_side,
+            ],
+            [fence | gate | solid, pane | solid, pane | gate | solid, 2, 1],
+            0,
+        ).astype(numpy.int8)
+        levels.append(level)
+
+    walls = kind == WALL
+    if walls.any():
+        _wall_heights(walls, levels, solid_above)
+        north, south, west, east = levels
+        straight = ((north > 0) & (north == south) & (west == 0) & (east == 0)) | (
+            (west > 0) & (west == east) & (north == 0) & (south == 0)
+        )
+        post = ~straight | near(tables.raises_post, 0, 1, 0)
+    wires = kind == WIRE
+    if wires.any():
+        _wire_lines(tables.was_dot[state_ids], wires, levels)
+
+    result = tables.base[state_ids]
+    for side, level in enumerate(levels):
+        result += tables.side_offsets[side, state_ids, level]
+    if walls.any():
+        result += tables.up_offsets[state_ids, post.astype(numpy.int8)]
+    return result
+
+
+def update_connections(
+    target: "BlockVolume | VolumeFile",
+    region: "tuple[int | slice, int | slice, int | slice]" = (slice(None),) * 3,
+    solid: TraitQuery = None,
+    tile_shape: "tuple[int, int, int]" = DEFAULT_TILE_SHAPE,
+) -> int:
+    """Recompute the connections of blocks in region of a volume or volume file, in place.
+
+    Blocks just outside region are read as neighbours but not changed. A volume file is
+    updated one tile at a time.
+
+    Returns:
+        int: number of positions changed.
+    """
+    region = region_of(region, target.shape)
+    changed = 0
+    tiles = [region]
+    if isinstance(target, VolumeFile):
+        tiles = [
+            tuple(
+                slice(r.start + t.start, r.start + t.stop) for r, t in zip(region, tile)
+            )
+            for tile in iter_tiles(tuple(r.stop - r.start for r in region), tile_shape)
+        ]
+    for tile in tiles:
+        before, after = recompute_region(target, tile, solid)
+        count = numpy.count_nonzero(before != after)
+        if not count:
+            continue
+        changed += count
+        if isinstance(target, VolumeFile):
+            target.write(tile, after)
+        else:
+            target.state_ids[tile] = after
+    return changed
+
+
+def recompute_region(
+    source: "BlockVolume | VolumeFile",
+    region: "tuple[slice, slice, slice]",
+    solid: TraitQuery = None,
+) -> "tuple[numpy.ndarray, numpy.ndarray]":
+    """Recompute the connections of a box, reading one more position around it as neighbours.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: the state ids of region before and after.
+    """
+    halo = tuple(
+        slice(max(r.start - 1, 0), min(r.stop + 1, n))
+        for r, n in zip(region, source.shape)
+    )
+    state_ids = (
+        source.read(halo).state_ids
+        if isinstance(source, VolumeFile)
+        else source.state_ids[halo]
+    )
+    inner = tuple(
+        slice(r.start - h.start, r.stop - h.start) for r, h in zip(region, halo)
+    )
+    after = recompute_connections(source.factory, state_ids, solid)
+    return state_ids[inner], after[inner]
+
+
+def _prop_values(layout: dict, index: numpy.ndarray, prop_name: str) -> numpy.ndarray:
+    """Get the value of a property for each of a block's state indexes."""
+    prop, stride = layout[prop_name]
+    return numpy.array(prop.allowed)[index // stride % len(prop.allowed)]
+
+
+def _connection_kind(name: str, layout: dict) -> int:
+    if not all(prop_name in layout for prop_name, _, _ in SIDES):
+        return NONE
+    allowed = set(layout["north"][0].allowed)
+    if allowed == {"none", "low", "tall"}:
+        return WALL
+    if allowed == {"none", "side", "up"}:
+        return WIRE
+    if allowed == {"true", "false"}:
+        if name.endswith("_fence"):
+            return FENCE
+        if name.endswith("_pane") or name == "iron_bars":
+            return PANE
+    return NONE
+
+
+def _wall_heights(
+    walls: numpy.ndarray,
+    levels: "list[numpy.ndarray]",
+    solid_above: numpy.ndarray,
+) -> None:
+    """Raise wall sides that have a solid block above, or a wall connected the same way."""
+    wall_above = numpy.zeros_like(walls)
+    wall_above[:, :-1] = walls[:, 1:]
+    for level in levels:
+        connected_above = numpy.zeros_like(level)
+        connected_above[:, :-1] = level[:, 1:]
+        tall = (
+            walls & (level > 0) & (solid_above | (wall_above & (connected_above > 0)))
+        )
+        level[tall] = 2
+
+
+def _wire_lines(
+    was_dot: numpy.ndarray, wires: numpy.ndarray, levels: "list[numpy.ndarray]"
+) -> None:
+    """Extend redstone wire across itself where it connects on one axis only.
+
+    A wire with no connections becomes a cross, unless it was a dot and stays one.
+    """
+    north, south, west, east = levels
+    no_north_south = (north == 0) & (south == 0)
+    no_west_east = (west == 0) & (east == 0)
+    dot = wires & was_dot & no_north_south & no_west_east
+    for level, empty in [
+        (north, no_west_east),
+        (south, no_west_east),
+        (west, no_north_south),
+        (east, no_north_south),
+    ]:
+        level[wires & ~dot & empty & (level == 0)] = 1
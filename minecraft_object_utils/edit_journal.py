@@ -0,0 +1,338 @@
+"""Record edits to a block volume as state id deltas, to undo and redo them.
+
+Each edit stores only the positions it changed, with the state id before and after. An
+entry in the history is one edit, or every edit made inside a transaction. Transactions
+nest. An error inside a transaction reverts the edits made in it.
+
+Example:
+    journal = EditJournal(volume, history_limit=100)
+    with journal.transaction("door"):
+        journal[4, 1, 4] = factory.block.create("oak_door", facing="east")
+        journal.set_state((4, 1, 4), open="true")
+    journal.undo()
+    journal.redo()
+"""
+import contextlib
+from collections import deque
+from collections.abc import Iterator
+
+import numpy
+
+from .block_volume import STATE_ID_DTYPE, BlockTransform, BlockVolume
+from .connections import recompute_region
+from .objects.block import Block
+from .parallel_transform import compose_tables
+from .trait_index import TraitQuery
+
+
+class EditDelta:
+    """State ids before and after an edit, at the flat indexes of the positions it changed."""
+
+    indexes: numpy.ndarray  # flat indexes into volume.state_ids, in C order
+    before: numpy.ndarray
+    after: numpy.ndarray
+
+    def __init__(
+        self, indexes: numpy.ndarray, before: numpy.ndarray, after: numpy.ndarray
+    ) -> None:
+        self.indexes = indexes
+        self.before = before
+        self.after = after
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    @property
+    def nbytes(self) -> int:
+        return self.indexes.nbytes + self.before.nbytes + self.after.nbytes
+
+    @staticmethod
+    def merge(deltas: "list[EditDelta]") -> "EditDelta":
+        """Combine deltas applied in order into one.
+
+        A position edited more than once keeps its first before and last after. Positions
+        that end where they started are dropped.
+        """
+        if len(deltas) == 1:
+            return deltas[0]
+        indexes = numpy.concatenate([d.indexes for d in deltas])
+        before = numpy.concatenate([d.before for d in deltas])
+        after = numpy.concatenate([d.after for d in deltas])
+        unique, first = numpy.unique(indexes, return_index=True)
+        _, last_reversed = numpy.unique(indexes[::-1], return_index=True)
+        last = len(indexes) - 1 - last_reversed
+        before, after = before[first], after[last]
+        changed = before != after
+        return EditDelta(unique[changed], before[changed], after[changed])
+
+
+class JournalEntry:
+    """One step of undo history."""
+
+    label: str
+    delta: EditDelta
+
+    def __init__(self, label: str, delta: EditDelta) -> None:
+        self.label = label
+        self.delta = delta
+
+    def __repr__(self) -> str:
+        return f"JournalEntry({self.label!r}, {len(self.delta)} blocks)"
+
+
+class EditJournal:
+    """Edit a BlockVolume with undo and redo.
+
+    Edits must be made through the journal to be recorded. Use edit() to change state ids
+    directly.
+
+    Attributes:
+        history_limit (int): Optional. Most entries kept for undo. Oldest entries are dropped.
+        memory_limit (int): Optional. Most bytes of deltas kept for undo. The newest entry is
+            always kept.
+    """
+
+    volume: BlockVolume
+    history_limit: "int | None"
+    memory_limit: "int | None"
+    undo_stack: "deque[JournalEntry]"
+    redo_stack: "list[JournalEntry]"
+    _transactions: "list[tuple[str, list[EditDelta]]]"  # open transactions, outermost first
+
+    def __init__(
+        self,
+        volume: BlockVolume,
+        history_limit: int = None,
+        memory_limit: int = None,
+    ) -> None:
+        self.volume = volume
+        self.history_limit = history_limit
+        self.memory_limit = memory_limit
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self._transactions = []
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the deltas of the undo and redo history."""
+        entries = [*self.undo_stack, *self.redo_stack]
+        return sum(entry.delta.nbytes for entry in entries)
+
+    @property
+    def _index_dtype(self) -> type:
+        return numpy.uint32 if self.volume.state_ids.size <= 1 << 32 else numpy.int64
+
+    @property
+    def in_transaction(self) -> bool:
+        return bool(self._transactions)
+
+    @contextlib.contextmanager
+    def transaction(self, label: str = "edit") -> "Iterator[None]":
+        """Group the edits made inside the with block into one entry of history.
+
+        A transaction inside another adds its edits to the outer one. If the block raises,
+        its edits are reverted.
+        """
+        self._transactions.append((label, []))
+        try:
+            yield
+        except BaseException:
+            _, deltas = self._transactions.pop()
+            for delta in reversed(deltas):
+                self._put(delta.indexes, delta.before)
+            raise
+        _, deltas = self._transactions.pop()
+        if self._transactions:
+            self._transactions[-1][1].extend(deltas)
+        elif deltas:
+            self._push(JournalEntry(label, EditDelta.merge(deltas)))
+
+    @contextlib.contextmanager
+    def edit(
+        self,
+        region: "tuple[int | slice, int | slice, int | slice]",
+        label: str = "edit",
+    ) -> "Iterator[numpy.ndarray]":
+        """Change the state ids of a region directly, recording what changed.
+
+        Yields:
+            numpy.ndarray: a writable view of volume.state_ids over the region.
+        """
+        region = self.volume.region(region)
+        view = self.volume.state_ids[region]
+        before = view.copy()
+        with self.transaction(label):
+            try:
+                yield view
+            except BaseException:
+                view[...] = before
+                raise
+            changed = numpy.nonzero(view != before)
+            if len(changed[0]):
+                positions = tuple(c + r.start for c, r in zip(changed, region))
+                indexes = numpy.ravel_multi_index(positions, self.volume.shape)
+                self._record(
+                    EditDelta(
+                        indexes.astype(self._index_dtype),
+                        before[changed],
+                        view[changed].copy(),
+                    )
+                )
+
+    def __setitem__(self, position: "tuple[int, int, int]", block: Block) -> None:
+        with self.edit(position, "set block") as view:
+            view[...] = self.volume.factory.state_id(block)
+
+    def set_state(
+        self, positions: "tuple[int, int, int] | numpy.ndarray", **states: str
+    ) -> None:
+        """Change properties of the blocks at one or many positions. See Block.set_state.
+
+        Each different state among the positions is changed once, then all positions are
+        written together. Nothing changes if any of the blocks rejects the states.
+
+        Args:
+            positions (tuple[int, int, int] | numpy.ndarray): a position, or positions
+                shaped (count, 3).
+        """
+        positions = numpy.asarray(positions).reshape(-1, 3)
+        if not len(positions):
+            return
+        positions = positions + (positions < 0) * numpy.array(self.volume.shape)
+        factory = self.volume.factory
+        old, inverse = numpy.unique(
+            self.volume.state_ids[tuple(positions.T)], return_inverse=True
+        )
+        new = numpy.empty_like(old)
+        for i, state_id in enumerate(old.tolist()):
+            block = factory.create_from_state_id(state_id)
+            block.set_states(**states)
+            new[i] = factory.state_id(block)
+        lower = positions.min(axis=0)
+        region = tuple(
+            slice(int(start), int(stop) + 1)
+            for start, stop in zip(lower, positions.max(axis=0))
+        )
+        with self.edit(region, "set state") as view:
+            view[tuple((positions - lower).T)] = new[inverse.reshape(-1)]
+
+    def fill(
+        self,
+        region: "tuple[int | slice, int | slice, int | slice]",
+        block: "Block | str",
+    ) -> None:
+        """Set every position of region to the same block."""
+        if isinstance(block, str):
+            block = self.volume.factory.create(block)
+        with self.edit(region, "fill") as view:
+            view[...] = self.volume.factory.state_id(block)
+
+    def replace(
+        self,
+        region: "tuple[int | slice, int | slice, int | slice]",
+        replacements: "dict[str, Block | str]",
+    ) -> None:
+        """Replace blocks in region. See BlockTransform.replace."""
+        self.transform_states(region, BlockTransform.replace(replacements))
+
+    def transform_states(
+        self,
+        region: "tuple[int | slice, int | slice, int | slice]",
+        *transforms: BlockTransform,
+    ) -> None:
+        """Rotate, reflect or replace the states of blocks in region, without moving them."""
+        if any(t.translator is not None for t in transforms):
+            raise ValueError("Remapping to another factory can't be journaled")
+        table, _ = compose_tables(self.volume.factory, transforms)
+        label = ", ".join(t.name for t in transforms)
+        with self.edit(region, label) as view:
+            view[...] = table[view]
+
+    def update_connections(
+        self,
+        region: "tuple[int | slice, int | slice, int | slice]" = (slice(None),) * 3,
+        solid: TraitQuery = None,
+    ) -> None:
+        """Recompute the connections of fences, panes, walls and wire in region.
+
+        See connections.update_connections.
+        """
+        region = self.volume.region(region)
+        _, after = recompute_region(self.volume, region, solid)
+        with self.edit(region, "update connections") as view:
+            view[...] = after
+
+    def undo(self) -> "JournalEntry | None":
+        """Revert the newest entry of history.
+
+        Returns:
+            JournalEntry: the entry reverted, or None if there is nothing to undo.
+        """
+        self._check_closed()
+        if not self.undo_stack:
+            return None
+        entry = self.undo_stack.pop()
+        self._put(entry.delta.indexes, entry.delta.before)
+        self.redo_stack.append(entry)
+        return entry
+
+    def redo(self) -> "JournalEntry | None":
+        """Reapply the newest entry undone.
+
+        Returns:
+            JournalEntry: the entry reapplied, or None if there is nothing to redo.
+        """
+        self._check_closed()
+        if not self.redo_stack:
+            return None
+        entry = self.redo_stack.pop()
+        self._put(entry.delta.indexes, entry.delta.after)
+        self.undo_stack.append(entry)
+        return entry
+
+    def squash(self, count: int = 2, label: str = None) -> JournalEntry:
+        """Combine the newest count entries of history into one.
+
+        Args:
+            count (int): Optional. Number of entries to combine.
+            label (str): Optional. Label of the combined entry. Defaults to the oldest label.
+        """
+        self._check_closed()
+        if not 1 <= count <= len(self.undo_stack):
+            raise ValueError(
+                f"Can't squash {count} of {len(self.undo_stack)} entries of history"
+            )
+        entries = [self.undo_stack.pop() for _ in range(count)][::-1]
+        entry = JournalEntry(
+            label or entries[0].label,
+            EditDelta.merge([e.delta for e in entries]),
+        )
+        self.undo_stack.append(entry)
+        return entry
+
+    def clear(self) -> None:
+        """Forget all history."""
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+    def _record(self, delta: EditDelta) -> None:
+        self._transactions[-1][1].append(delta)
+
+    def _push(self, entry: JournalEntry) -> None:
+        self.undo_stack.append(entry)
+        self.redo_stack.clear()
+        if self.history_limit is not None:
+            while len(self.undo_stack) > self.history_limit:
+                self.undo_stack.popleft()
+        if self.memory_limit is not None:
+            while len(self.undo_stack) > 1 and self.nbytes > self.memory_limit:
+                self.undo_stack.popleft()
+
+    def _put(self, indexes: numpy.ndarray, state_ids: numpy.ndarray) -> None:
+        numpy.put(
+            self.volume.state_ids, indexes, state_ids.astype(STATE_ID_DTYPE, copy=False)
+        )
+
+    def _check_closed(self) -> None:
+        if self._transactions:
+            raise RuntimeError("History can't change while a transaction is open")
@@ -0,0 +1,228 @@
+from math import floor
+from typing import TYPE_CHECKING
+
+from .objects.entity import Entity
+
+if TYPE_CHECKING:
+    Box = tuple[float, float, float, float, float, float]
+    CellRange = tuple[int, int, int, int, int, int]
+
+
+class EntityIndex:
+    """A uniform grid spatial hash of positioned entities.
+
+    Each entity is stored in every grid cell its bounding box touches, so queries only look
+    at entities in nearby cells. Entities are indexed by identity. If an entity's pos is
+    changed directly instead of with move, the index will be stale.
+    """
+
+    cell_size: float
+    _cells: "dict[tuple[int, int, int], set[Entity]]"
+    _boxes: "dict[Entity, Box]"
+    _cell_ranges: "dict[Entity, CellRange]"
+
+    def __init__(self, cell_size: float = 4.0, entities: "list[Entity]" = []) -> None:
+        if cell_size <= 0:
+            raise ValueError(f"Cell size must be positive. Supplied: {cell_size}")
+        self.cell_size = cell_size
+        self._cells = {}
+        self._boxes = {}
+        self._cell_ranges = {}
+        for entity in entities:
+            self.insert(entity)
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+    def __contains__(self, entity: Entity) -> bool:
+        return entity in self._boxes
+
+    def __iter__(self) -> iter:
+        yield from self._boxes
+
+    def insert(self, entity: Entity) -> None:
+        """Add an entity at its current pos."""
+        if entity in self._boxes:
+            raise ValueError(f"Entity {entity.id} is already in the index.")
+        box = entity.bounding_box
+        cell_range = self._cell_range(box)
+        self._boxes[entity] = box
+        self._cell_ranges[entity] = cell_range
+        for cell in self._iter_cells(cell_range):
+            self._cells.setdefault(cell, set()).add(entity)
+
+    def remove(self, entity: Entity) -> None:
+        """Remove an entity. Raises KeyError if it is not in the index."""
+        cell_range = self._cell_ranges.pop(entity)
+        del self._boxes[entity]
+        self._discard_from_cells(entity, cell_range)
+
+    def move(self, entity: Entity, pos: "tuple[float, float, float]") -> None:
+        """Set an entity's pos and update the cells it is stored in.
+
+        Args:
+            entity (Entity): an entity already in the index.
+            pos (tuple[float, float, float]): new x, y, z of the entity.
+        """
+        old_range = self._cell_ranges[entity]
+        entity.pos = tuple(pos)
+        box = entity.bounding_box
+        self._boxes[entity] = box
+        new_range = self._cell_range(box)
+        if new_range == old_range:
+            return
+        self._cell_ranges[entity] = new_range
+        self._discard_from_cells(entity, old_range)
+        for cell in self._iter_cells(new_range):
+            self._cells.setdefault(cell, set()).add(entity)
+
+    def query_box(
+        self,
+        min_corner: "tuple[float, float, float]",
+        max_corner: "tuple[float, float, float]",
+        category: str = None,
+    ) -> "list[Entity]":
+        """Find entities whose bounding box overlaps a box.
+
+        Args:
+            min_corner (tuple[float, float, float]): lowest x, y, z of the box.
+            max_corner (tuple[float, float, float]): highest x, y, z of the box.
+            category (str): Optional. Only return entities with this category, like "MONSTER".
+        """
+        box = (*min_corner, *max_corner)
+        return [
+            entity
+            for entity in self._candidates(self._cell_range(box), category)
+            if _overlaps(self._boxes[entity], box)
+        ]
+
+    def query_radius(
+        self,
+        center: "tuple[float, float, float]",
+        radius: float,
+        category: str = None,
+    ) -> "list[Entity]":
+        """Find entities whose bounding box is within radius of a point.
+
+        Args:
+            center (tuple[float, float, float]): x, y, z of the point.
+            radius (float): maximum distance from the point to the bounding box.
+            category (str): Optional. Only return entities with this category, like "MONSTER".
+        """
+        cx, cy, cz = center
+        search = (
+            cx - radius,
+            cy - radius,
+            cz - radius,
+            cx + radius,
+            cy + radius,
+            cz + radius,
+        )
+        radius_squared = radius * radius
+        found = []
+        for entity in self._candidates(self._cell_range(search), category):
+            min_x, min_y, min_z, max_x, max_y, max_z = self._boxes[entity]
+            dx = max(min_x - cx, 0.0, cx - max_x)
+            dy = max(min_y - cy, 0.0, cy - max_y)
+            dz = max(min_z - cz, 0.0, cz - max_z)
+            if dx * dx + dy * dy + dz * dz <= radius_squared:
+                found.append(entity)
+        return found
+
+    def overlapping_pairs(
+        self, category: str = None, other_category: str = None
+    ) -> "list[tuple[Entity, Entity]]":
+        """Find every pair of entities whose bounding boxes overlap.
+
+        Args:
+            category (str): Optional. The first entity of each pair must have this category.
+            other_category (str): Optional. The second entity of each pair must have this category.
+                Defaults to category.
+
+        Returns:
+            list[tuple[Entity, Entity]]: each overlapping pair once.
+        """
+        if other_category is None:
+            other_category = category
+        boxes = self._boxes
+        cell_ranges = self._cell_ranges
+        pairs = []
+        for cell, entities in self._cells.items():
+            if len(entities) < 2:
+                continue
+            firsts = {e for e in entities if _matches(e, category)}
+            seconds = {e for e in entities if _matches(e, other_category)}
+            for first in firsts:
+                first_range = cell_ranges[first]
+                for second in seconds:
+                    if first is second:
+                        continue
+                    # Either order qualifies, so only keep one of them.
+                    if first in seconds and second in firsts and id(first) > id(second):
+                        continue
+                    # Report the pair only in the lowest cell both entities share.
+                    second_range = cell_ranges[second]
+                    if cell != (
+                        max(first_range[0], second_range[0]),
+                        max(first_range[1], second_range[1]),
+                        max(first_range[2], second_range[2]),
+                    ):
+                        continue
+                    if _overlaps(boxes[first], boxes[second]):
+                        pairs.append((first, second))
+        return pairs
+
+    def _candidates(self, cell_range: "CellRange", category: str) -> "set[Entity]":
+        "Get entities stored in any cell of cell_range."
+        candidates = set()
+        cells = self._cells
+        for cell in self._iter_cells(cell_range):
+            entities = cells.get(cell)
+            if entities:
+                candidates.update(entities)
+        if category is not None:
+            return {e for e in candidates if e.traits.category == category}
+        return candidates
+
+    def _cell_range(self, box: "Box") -> "CellRange":
+        "Get lowest and highest cell coordinates touched by box."
+        size = self.cell_size
+        return (
+            floor(box[0] / size),
+            floor(box[1] / size),
+            floor(box[2] / size),
+            floor(box[3] / size),
+            floor(box[4] / size),
+            floor(box[5] / size),
+        )
+
+    @staticmethod
+    def _iter_cells(cell_range: "CellRange") -> iter:
+        min_x, min_y, min_z, max_x, max_y, max_z = cell_range
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                for z in range(min_z, max_z + 1):
+                    yield (x, y, z)
+
+    def _discard_from_cells(self, entity: Entity, cell_range: "CellRange") -> None:
+        for cell in self._iter_cells(cell_range):
+            entities = self._cells[cell]
+            entities.discard(entity)
+            if not entities:
+                del self._cells[cell]
+
+
+def _matches(entity: Entity, category: str) -> bool:
+    return category is None or entity.traits.category == category
+
+
+def _overlaps(box: "Box", other: "Box") -> bool:
+    "Check if two boxes intersect. Boxes that only touch do not overlap."
+    return (
+        box[0] < other[3]
+        and other[0] < box[3]
+        and box[1] < other[4]
+        and other[1] < box[4]
+        and box[2] < other[5]
+        and other[2] < box[5]
+    )
@@ -0,0 +1,180 @@
+"""Opt-in call counts, timings and cache hit rates for the library's hot paths.
+
+Nothing is measured until enable() is called. Enabling wraps the measured methods on their
+classes and disable() puts the originals back, so disabled instrumentation costs nothing.
+Measurement is global to the process.
+
+Example:
+    from minecraft_object_utils import instrumentation
+    instrumentation.enable()
+    factory = MinecraftObjectFactory()
+    block = factory.block.create("oak_stairs")
+    block.rotate(Axis.Y, 90)
+    print(instrumentation.snapshot())
+    instrumentation.disable()
+
+Times include nested measured calls. For example BlockFactory.register includes
+BaseObjectFactory.register, and rotating 180 degrees includes two Block.reflect calls.
+"""
+import functools
+import threading
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from .base_factory import BaseObjectFactory
+from .compiled_data import is_compiled
+from .minecraft_object_factory import BlockFactory, EnchantmentFactory
+from .mod_info import ModInfo
+from .objects.block import Block
+from .objects.inventory import Inventory
+from .trait_pool import TraitPool
+
+if TYPE_CHECKING:
+    # Called after every measured call with the call's name, seconds taken, and for calls
+    # that look something up and return, whether it was a hit. Otherwise hit is None.
+    Callback = Callable[[str, float, "bool | None"], None]
+
+# (class, method, cache name or None, hit check or None)
+# A hit check gets the call's arguments and result. Calls that raise are counted as errors
+# of the call, not as hits or misses.
+_TARGETS = [
+    (BaseObjectFactory, "load_from_toml", None, None),
+    (BaseObjectFactory, "load_from_file", None, None),
+    (BaseObjectFactory, "read_file", None, None),
+    (BaseObjectFactory, "register", None, None),
+    (BaseObjectFactory, "create", None, None),
+    (BlockFactory, "register", None, None),
+    (EnchantmentFactory, "register", None, None),
+    (
+        ModInfo,
+        "get_file_path",
+        "compiled_data",
+        lambda args, result: is_compiled(result),
+    ),
+    (TraitPool, "intern", "trait_pool", lambda args, result: result is not args[1]),
+    (Block, "set_state", None, None),
+    (Block, "set_states", None, None),
+    (Block, "rotate", None, None),
+    (Block, "reflect", None, None),
+    (Inventory, "__setitem__", None, None),
+    (Inventory, "__delitem__", None, None),
+    (Inventory, "insert", None, None),
+    (Inventory, "pop", None, None),
+    (Inventory, "remove", None, None),
+    (Inventory, "clear", None, None),
+    (Inventory, "reverse", None, None),
+    (Inventory, "sort", None, None),
+    (Inventory, "apply_delta", None, None),
+]
+
+_lock = threading.Lock()
+_originals: "dict[tuple[type, str], Callable]" = {}
+_calls: "dict[str, list]" = {}  # name: [count, seconds, errors]
+_caches: "dict[str, list]" = {}  # cache name: [hits, misses]
+_callback: "Callback | None" = None
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+def enable(callback: "Callback" = None) -> None:
+    """Start measuring. Counts keep adding to any taken before the last disable().
+
+    Args:
+        callback (Callable): Optional. Called as callback(name, seconds, hit) after every
+            measured call. Keep it quick, it runs inside the measured code.
+    """
+    global _callback
+    _callback = callback
+    if is_enabled():
+        return
+    for cls, method_name, cache_name, hit_check in _TARGETS:
+        original = cls.__dict__[method_name]
+        _originals[(cls, method_name)] = original
+        setattr(
+            cls,
+            method_name,
+            _measure(original, f"{cls.__name__}.{method_name}", cache_name, hit_check),
+        )
+
+
+def disable() -> None:
+    """Stop measuring and restore the original methods. Measurements are kept."""
+    global _callback
+    for (cls, method_name), original in _originals.items():
+        setattr(cls, method_name, original)
+    _originals.clear()
+    _callback = None
+
+
+def reset() -> None:
+    """Forget all measurements."""
+    with _lock:
+        _calls.clear()
+        _caches.clear()
+
+
+def snapshot() -> dict:
+    """Get a copy of the measurements so far.
+
+    Returns:
+        dict: {"calls": {name: {"count": int, "seconds": float, "errors": int}},
+               "caches": {cache name: {"hits": int, "misses": int, "hit_rate": float}}}
+    """
+    with _lock:
+        calls = {
+            name: {"count": count, "seconds": seconds, "errors": errors}
+            for name, (count, seconds, errors) in _calls.items()
+        }
+        caches = {
+            name: {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            }
+            for name, (hits, misses) in _caches.items()
+        }
+    return {"calls": calls, "caches": caches}
+
+
+def _measure(
+    original: Callable,
+    name: str,
+    cache_name: "str | None",
+    hit_check: "Callable | None",
+) -> Callable:
+    @functools.wraps(original)
+    def measured(*args, **kwargs) -> object:
+        start = time.perf_counter()
+        try:
+            result = original(*args, **kwargs)
+        except Exception:
+            _record(name, time.perf_counter() - start, cache_name, None, error=True)
+            raise
+        seconds = time.perf_counter() - start
+        hit = None if hit_check is None else bool(hit_check(args, result))
+        _record(name, seconds, cache_name, hit)
+        return result
+
+    return measured
+
+
+def _record(
+    name: str,
+    seconds: float,
+    cache_name: "str | None",
+    hit: "bool | None",
+    error: bool = False,
+) -> None:
+    with _lock:
+        call = _calls.setdefault(name, [0, 0.0, 0])
+        call[0] += 1
+        call[1] += seconds
+        call[2] += error
+        if cache_name is not None and hit is not None:
+            _caches.setdefault(cache_name, [0, 0])[0 if hit else 1] += 1
+    callback = _callback
+    if callback is not None:
+        callback(name, seconds, hit)
@@ -1,21 +1,355 @@
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterator
+
 from .base_factory import BaseObjectFactory
 from .mod_info import VANILLA_JAVA_LATEST, ModInfo
 from .objects.block import Block, BlockTraits
 from .objects.enchantment import Enchantment, EnchantmentTraits
 from .objects.entity import Entity, EntityTraits
 from .objects.item import ItemStack, ItemTraits
+from .trait_index import TraitQuery
+from .trait_pool import TraitPool
+
+# (event loop, factory class, trait pool, mods): task loading that factory
+_loading: "dict[tuple, object]" = {}
 
 
 class BlockFactory(BaseObjectFactory[Block, BlockTraits]):
-    """Registers BlockTraits and allows creation of Block instances from them."""
+    """Registers BlockTraits and allows creation of Block instances from them.
+
+    Every state of every registered block has a state id. Blocks are numbered in registration
+    order and states in each block's state index order, matching vanilla's global palette
+    when blocks are registered in game registry order.
+    """
 
     file_name_part: str = "block"
+    _state_bases: "dict[str, int]"  # block id: state id of its first state
+    _base_ids: "list[int]"  # first state id of each block in registration order
+    _base_traits: "list[BlockTraits]"
+    # (source id, target id, target state index or None for its default): target state index
+    # of each source state, and target traits
+    _conversions: "dict[tuple[str, str, int | None], tuple[array[int], BlockTraits]]"
+    _state_bits: "dict[TraitQuery, int]"  # query: bitset of matching state ids
+
+    @property
+    def state_count(self) -> int:
+        """Gets the number of states of all registered blocks."""
+        if not self._base_traits:
+            return 0
+        return self._base_ids[-1] + self._base_traits[-1].state_count
+
+    def __init__(
+        self,
+        mods: "list[ModInfo]" = [VANILLA_JAVA_LATEST],
+        trait_pool: TraitPool = None,
+    ) -> None:
+        self._state_bases = {}
+        self._base_ids = []
+        self._base_traits = []
+        self._conversions = {}
+        self._state_bits = {}
+        super().__init__(mods, trait_pool)
+
+    def register(self, object_traits: BlockTraits) -> None:
+        """Saves new traits to the factory."""
+        base = self.state_count
+        super().register(object_traits)
+        self._state_bases[object_traits.id] = base
+        self._base_ids.append(base)
+        self._base_traits.append(object_traits)
+        self._state_bits.clear()
+
+    def state_id(self, block: Block) -> int:
+        """Get the state id of a block's current state."""
+        return self._state_bases[block.id] + block.state_index
+
+    def first_state_id(self, block_id: str) -> int:
+        """Get the state id of a block's state with index 0."""
+        if ":" not in block_id:
+            block_id = f"minecraft:{block_id}"
+        if block_id not in self._state_bases:
+            raise ValueError(f"{self.__class__.__name__} has no {block_id}.")
+        return self._state_bases[block_id]
+
+    def state_id_of(self, block_id: str, state: "dict[str, str]" = {}) -> int:
+        """Get the state id of a block id and state. Properties missing from state use their default."""
+        first_state_id = self.first_state_id(block_id)
+        if ":" not in block_id:
+            block_id = f"minecraft:{block_id}"
+        return first_state_id + self.registry[block_id].state_index(state)
+
+    def decode_state_id(self, state_id: int) -> "tuple[BlockTraits, int]":
+        """Get the block traits and state index that a state id refers to."""
+        if not 0 <= state_id < self.state_count:
+            raise IndexError(f"State id {state_id} is out of range")
+        i = bisect_right(self._base_ids, state_id) - 1
+        return self._base_traits[i], state_id - self._base_ids[i]
+
+    def create_from_state_id(self, state_id: int) -> Block:
+        """Create a Block from a state id."""
+        traits, index = self.decode_state_id(state_id)
+        return Block(traits, **traits.state_from_index(index))
+
+    def iter_states(self) -> "Iterator[tuple[int, str, dict[str, str]]]":
+        """Lazily generate (state id, block id, state) for every state in state id order."""
+        state_id = 0
+        for traits in self._base_traits:
+            for state in traits.iter_states():
+                yield state_id, traits.id, state
+                state_id += 1
+
+    def state_bits(self, trait_query: TraitQuery) -> int:
+        """Get a bitset of the state ids that match a query, cached by query. Bit n is state id n.
+
+        Example: factory.state_bits(StateValue("waterlogged", "true") | BlockId("water"))
+        """
+        try:
+            return self._state_bits[trait_query]
+        except KeyError:
+            bits = self._state_bits[trait_query] = trait_query.state_bits(self)
+        except TypeError:  # arguments that can't be hashed
+            bits = trait_query.state_bits(self)
+        return bits
+
+    def convert(self, block: Block, target: "Block | str") -> Block:
+        """Create a different block with the state of block, as far as the target allows.
+
+        Properties the target has are copied when it allows the value. Others take their
+        value from target: its default state for a block id, or its current state for a Block.
+
+        Example:
+            factory.convert(oak_stairs, "spruce_stairs")
+        """
+        table, traits = self._conversion(block.id, target)
+        converted = Block(traits)
+        converted._state.update(traits.state_from_index(table[block.state_index]))
+        return converted
+
+    def convert_state_id(self, state_id: int, target: "Block | str") -> int:
+        """Get the state id a state converts to. See convert."""
+        source, index = self.decode_state_id(state_id)
+        table, traits = self._conversion(source.id, target)
+        return self._state_bases[traits.id] + table[index]
+
+    def conversion_table(self, source_id: str, target: "Block | str") -> "array[int]":
+        """Get the table from each state index of a block to the state index it converts to.
+
+        Tables are built on first use and cached. See convert.
+        """
+        return self._conversion(source_id, target)[0]
+
+    def _conversion(
+        self, source_id: str, target: "Block | str"
+    ) -> "tuple[array[int], BlockTraits]":
+        if ":" not in source_id:
+            source_id = f"minecraft:{source_id}"
+        if isinstance(target, str):
+            if ":" not in target:
+                target = f"minecraft:{target}"
+            key = (source_id, target, None)
+        else:
+            key = (source_id, target.id, target.state_index)
+        if key not in self._conversions:
+            if source_id not in self.registry:
+                raise ValueError(f"{self.__class__.__name__} has no {source_id}.")
+            source = self.registry[source_id]
+            if isinstance(target, str):
+                target = self.create(target)
+            table = self._build_conversion(source, target)
+            self._conversions[key] = (table, target.traits)
+        return self._conversions[key]
+
+    @staticmethod
+    def _build_conversion(source: BlockTraits, target: Block) -> "array[int]":
+        # A target index is a sum of value index * stride. Properties the source shares
+        # add a term that depends on the source's value. The rest add a constant.
+        constant = 0
+        terms = []  # (source stride, source value count, target term by source value)
+        source_layout = {
+            prop.id: (prop, stride) for prop, stride in source._get_state_layout()
+        }
+        for prop, stride in target.traits._get_state_layout():
+            fixed = prop.value_index[target.get_state(prop.id)]
+            if prop.id not in source_layout:
+                constant += fixed * stride
+                continue
+            source_prop, source_stride = source_layout[prop.id]
+            by_value = [
+                prop.value_index.get(value, fixed) * stride
+                for value in source_prop.allowed
+            ]
+            terms.append((source_stride, len(by_value), by_value))
+        if not terms:
+            return array("l", [constant] * source.state_count)
+        try:
+            import numpy
+        except ImportError:
+            return array(
+                "l",
+                (
+                    constant + sum(by_value[i // s % n] for s, n, by_value in terms)
+                    for i in range(source.state_count)
+                ),
+            )
+        # The same sum for every state index at once. "l" is a C long in numpy and array.
+        index = numpy.arange(source.state_count)
+        table = numpy.full(source.state_count, constant, dtype="l")
+        for s, n, by_value in terms:
+            table += numpy.array(by_value, dtype="l")[index // s % n]
+        converted = array("l")
+        converted.frombytes(table.tobytes())
+        return converted
 
 
 class EnchantmentFactory(BaseObjectFactory[Enchantment, EnchantmentTraits]):
-    """Registers EnchantmentTraits and allows creation of Enchantment instances from them."""
+    """Registers EnchantmentTraits and allows creation of Enchantment instances from them.
+
+    Can check enchantments against items. The first check builds bitsets from the registry:
+    one bit per enchantment, a mask of enchantments per category, and a mask of conflicting
+    enchantments per enchantment. Registering new traits rebuilds them on the next check.
+    """
 
     file_name_part: str = "enchantment"
+    _bits: "dict[str, tuple[int, int, int]] | None"  # id: (bit, max level, conflicts)
+    _category_masks: "dict[str, int]"
+    _item_masks: "dict[ItemTraits, int]"
+
+    def __init__(
+        self,
+        mods: "list[ModInfo]" = [VANILLA_JAVA_LATEST],
+        trait_pool: TraitPool = None,
+    ) -> None:
+        self._bits = None
+        self._category_masks = {}
+        self._item_masks = {}
+        super().__init__(mods, trait_pool)
+
+    def register(self, object_traits: EnchantmentTraits) -> None:
+        """Saves new traits to the factory."""
+        super().register(object_traits)
+        self._bits = None
+
+    def category_mask(self, category: str) -> int:
+        """Get bitset of enchantments in a category. Bits follow registration order."""
+        self._build_tables()
+        return self._category_masks.get(category, 0)
+
+    def is_applicable(self, enchantment_id: str, item_traits: ItemTraits) -> bool:
+        """Check if an enchantment's category matches the item."""
+        self._build_tables()
+        bit = self._bits.get(self._full_id(enchantment_id))
+        return bit is not None and bool(bit[0] & self._item_mask(item_traits))
+
+    def are_compatible(self, enchantment_id: str, other_id: str) -> bool:
+        """Check if two different enchantments can be on the same item."""
+        self._build_tables()
+        enchantment_id, other_id = self._full_id(enchantment_id), self._full_id(
+            other_id
+        )
+        if enchantment_id not in self._bits or other_id not in self._bits:
+            raise ValueError(
+                f"{self.__class__.__name__} has no {enchantment_id} or {other_id}."
+            )
+        return not self._bits[enchantment_id][2] & self._bits[other_id][0]
+
+    def is_valid(self, item_stack: ItemStack) -> bool:
+        """Check an item's enchantments for level range, category match, duplicates and conflicts."""
+        self._build_tables()
+        bits = self._bits
+        mask = 0
+        conflicts = 0
+        for enchantment in item_stack.enchantments:
+            info = bits.get(enchantment.traits.id)
+            if info is None or mask & info[0] or not 1 <= enchantment.level <= info[1]:
+                return False
+            mask |= info[0]
+            conflicts |= info[2]
+        return not mask & conflicts and not mask & ~self._item_mask(item_stack.traits)
+
+    def validate(self, item_stack: ItemStack) -> "list[str]":
+        """Describe every problem with an item's enchantments.
+
+        Args:
+            item_stack (ItemStack): the enchanted item to check.
+
+        Returns:
+            list[str]: one message per problem. Empty if the enchantments are valid.
+        """
+        if self.is_valid(item_stack):
+            return []
+        errors = []
+        item_mask = self._item_mask(item_stack.traits)
+        seen = {}
+        for enchantment in item_stack.enchantments:
+            ench_id = enchantment.traits.id
+            if ench_id not in self._bits:
+                errors.append(f"{self.__class__.__name__} has no {ench_id}.")
+                continue
+            bit, max_level, conflicts = self._bits[ench_id]
+            if not 1 <= enchantment.level <= max_level:
+                errors.append(
+                    f"Level {enchantment.level} of {ench_id} is invalid. Max level: {max_level}."
+                )
+            if not bit & item_mask:
+                errors.append(
+                    f"Enchantment {ench_id} can't be applied to {item_stack.id}."
+                )
+            if ench_id in seen:
+                errors.append(
+                    f"Enchantment {ench_id} is on {item_stack.id} more than once."
+                )
+            errors.extend(
+                f"Enchantment {ench_id} conflicts with {other_id}."
+                for other_id, other_bit in seen.items()
+                if conflicts & other_bit
+            )
+            seen[ench_id] = bit
+        return errors
+
+    def _build_tables(self) -> None:
+        "Compute enchantment bits, category masks and conflict masks if stale."
+        if self._bits is not None:
+            return
+        bit_of = {ench_id: 1 << i for i, ench_id in enumerate(self.registry)}
+        category_masks = {}
+        conflict_masks = dict.fromkeys(bit_of, 0)
+        for ench_id, traits in self.registry.items():
+            category_masks[traits.category] = (
+                category_masks.get(traits.category, 0) | bit_of[ench_id]
+            )
+            for other_id in traits.exclusive:
+                if other_id in bit_of:
+                    conflict_masks[ench_id] |= bit_of[other_id]
+                    conflict_masks[other_id] |= bit_of[ench_id]
+        self._category_masks = category_masks
+        self._item_masks = {}
+        self._bits = {
+            ench_id: (
+                bit_of[ench_id],
+                traits.max_level,
+                conflict_masks[ench_id] & ~bit_of[ench_id],
+            )
+            for ench_id, traits in self.registry.items()
+        }
+
+    def _item_mask(self, item_traits: ItemTraits) -> int:
+        "Get bitset of enchantments whose category applies to the item, and its extras."
+        mask = self._item_masks.get(item_traits)
+        if mask is None:
+            mask = 0
+            for category in item_traits.enchantment_categories:
+                mask |= self._category_masks.get(category, 0)
+            for ench_id in item_traits.extra_enchantments:
+                bit = self._bits.get(self._full_id(ench_id))
+                if bit is not None:
+                    mask |= bit[0]
+            self._item_masks[item_traits] = mask
+        return mask
+
+    @staticmethod
+    def _full_id(object_id: str) -> str:
+        return object_id if ":" in object_id else f"minecraft:{object_id}"
 
 
 class EntityFactory(BaseObjectFactory[Entity, EntityTraits]):
@@ -31,7 +365,11 @@ class ItemFactory(BaseObjectFactory[ItemStack, ItemTraits]):
 
 
 class MinecraftObjectFactory:
-    """Sets up all object factories at once."""
+    """Sets up all object factories at once.
+
+    In asyncio code, use `await MinecraftObjectFactory.create_async()` to load without
+    blocking the event loop.
+    """
 
     _mods: "list[ModInfo]"
     block: BlockFactory
@@ -43,12 +381,16 @@ class MinecraftObjectFactory:
     def mods(self) -> "list[ModInfo]":
         return self._mods
 
-    def __init__(self, mods: "list[ModInfo]" = [VANILLA_JAVA_LATEST]) -> None:
+    def __init__(
+        self,
+        mods: "list[ModInfo]" = [VANILLA_JAVA_LATEST],
+        trait_pool: TraitPool = None,
+    ) -> None:
         self._mods = mods
-        self.block = BlockFactory(mods)
-        self.enchantment = EnchantmentFactory(mods)
-        self.entity = EntityFactory(mods)
-        self.item = ItemFactory(mods)
+        self.block = BlockFactory(mods, trait_pool)
+        self.enchantment = EnchantmentFactory(mods, trait_pool)
+        self.entity = EntityFactory(mods, trait_pool)
+        self.item = ItemFactory(mods, trait_pool)
 
     def import_mod(self, mod: ModInfo) -> None:
         """Imports configs from file for all factories.
@@ -56,7 +398,111 @@ class MinecraftObjectFactory:
         Args:
             mod (ModInfo): describes object collection to be imported
         """
-        self.block.import_mod(mod)
-        self.enchantment.import_mod(mod)
-        self.entity.import_mod(mod)
-        self.item.import_mod(mod)
+        self._import_mods([mod])
+
+    @classmethod
+    async def create_async(
+        cls,
+        mods: "list[ModInfo]" = [VANILLA_JAVA_LATEST],
+        trait_pool: TraitPool = None,
+    ) -> "MinecraftObjectFactory":
+        """Load a factory without blocking the event loop.
+
+        Files are read and parsed in the loop's default executor, all four factories at
+        once. The factory is returned only after everything has loaded. Tasks awaiting the
+        same mods and trait pool while a load is running share that load.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        key = (
+            loop,
+            cls,
+            trait_pool,
+            tuple((m.directory, m.versioned_name) for m in mods),
+        )
+        task = _loading.get(key)
+        if task is None:
+            task = loop.create_task(cls._load_async(mods, trait_pool))
+            _loading[key] = task
+            task.add_done_callback(lambda _: _loading.pop(key, None))
+        # One awaiter being cancelled must not cancel the load for the others.
+        return await asyncio.shield(task)
+
+    @classmethod
+    async def _load_async(
+        cls, mods: "list[ModInfo]", trait_pool: "TraitPool | None"
+    ) -> "MinecraftObjectFactory":
+        factory = cls([], trait_pool)
+        factory._mods = mods
+        await factory._import_mods_async(mods)
+        return factory
+
+    async def import_mod_async(self, mod: ModInfo) -> None:
+        """Imports configs from file for all factories without blocking the event loop.
+
+        Files are read and parsed in the loop's default executor. Nothing is registered
+        until every file has been read, then all of it is registered at once.
+
+        Args:
+            mod (ModInfo): describes object collection to be imported
+        """
+        await self._import_mods_async([mod])
+
+    def _import_mods(self, mods: "list[ModInfo]") -> None:
+        factories = self._factories()
+        self._register_mod_files(
+            factories, [_read_mod_files(factory, mods) for factory in factories]
+        )
+
+    async def _import_mods_async(self, mods: "list[ModInfo]") -> None:
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        factories = self._factories()
+        read_files = await asyncio.gather(
+            *(
+                loop.run_in_executor(None, _read_mod_files, factory, mods)
+                for factory in factories
+            )
+        )
+        # No awaits from here on, so other tasks never see a partly imported factory.
+        self._register_mod_files(factories, read_files)
+
+    def _factories(self) -> "list[BaseObjectFactory]":
+        return [self.block, self.enchantment, self.entity, self.item]
+
+    @staticmethod
+    def _register_mod_files(
+        factories: "list[BaseObjectFactory]",
+        read_files: "list[list[tuple[ModInfo, str, list]]]",
+    ) -> None:
+        """Register files read by _read_mod_files. Registers none if any id is already taken."""
+        for factory, files in zip(factories, read_files):
+            seen = set(factory.registry)
+            for _, _, traits in files:
+                for object_traits in traits:
+                    if object_traits.id in seen:
+                        raise ValueError(
+                            f"Already registered {factory.file_name_part} {object_traits.id}"
+                        )
+                    seen.add(object_traits.id)
+        for factory, files in zip(factories, read_files):
+            for mod, file_path, traits in files:
+                factory.register_file(file_path, traits)
+                factory.mods.append(mod)
+
+
+def _read_mod_files(
+    factory: BaseObjectFactory, mods: "list[ModInfo]"
+) -> "list[tuple[ModInfo, str, list]]":
+    """Read the factory's file of each mod without registering anything."""
+    files = []
+    for mod in mods:
+        file_path = mod.get_file_path(factory.file_name_part)
+        if file_path in (f for _, f, _ in files):
+            continue
+        traits = factory.read_file(file_path)
+        if traits is not None:
+            files.append((mod, file_path, traits))
+    return files
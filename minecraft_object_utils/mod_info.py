@@ -21,6 +21,16 @@ class ModInfo:
         self.directory = directory
 
     def get_file_path(self, factory_name: str) -> str:
+        """Get the file to import. Prefers an up to date compiled file over the toml file."""
+        from .compiled_data import compiled_path_for, is_up_to_date
+
+        toml_path = self.get_toml_path(factory_name)
+        compiled_path = compiled_path_for(toml_path)
+        if is_up_to_date(compiled_path, toml_path):
+            return compiled_path
+        return toml_path
+
+    def get_toml_path(self, factory_name: str) -> str:
         return os.path.join(
             self.directory, f"{self.versioned_name}-{factory_name}.toml"
         )
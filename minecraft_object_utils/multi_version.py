@@ -0,0 +1,142 @@
+from .minecraft_object_factory import MinecraftObjectFactory
+from .mod_info import ModInfo
+from .objects.base_object import BaseObjectTraits
+from .state_translation import StateTranslator
+from .trait_pool import TraitPool
+
+FACTORY_NAMES = ["block", "enchantment", "entity", "item"]
+
+
+class TraitsChange:
+    """How one object's traits differ between two versions."""
+
+    fields: "list[str]"  # trait fields with a different value, other than props
+    added_props: "list[str]"
+    removed_props: "list[str]"
+    changed_props: "list[str]"  # props with a different default or allowed values
+
+    def __init__(self, old: BaseObjectTraits, new: BaseObjectTraits) -> None:
+        old_fields = {k: v for k, v in vars(old).items() if not k.startswith("_")}
+        new_fields = {k: v for k, v in vars(new).items() if not k.startswith("_")}
+        old_props = {p.id: p for p in old_fields.pop("props", [])}
+        new_props = {p.id: p for p in new_fields.pop("props", [])}
+        self.fields = sorted(
+            k
+            for k in old_fields.keys() | new_fields.keys()
+            if old_fields.get(k) != new_fields.get(k)
+        )
+        self.added_props = [p for p in new_props if p not in old_props]
+        self.removed_props = [p for p in old_props if p not in new_props]
+        self.changed_props = [
+            p
+            for p, prop in new_props.items()
+            if p in old_props
+            and old_props[p] is not prop
+            and (old_props[p].default, old_props[p].allowed)
+            != (prop.default, prop.allowed)
+        ]
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.fields or self.added_props or self.removed_props or self.changed_props
+        )
+
+
+class RegistryDiff:
+    """Ids added, removed and changed in one factory's registry between two versions."""
+
+    added: "list[str]"
+    removed: "list[str]"
+    changed: "dict[str, TraitsChange]"
+
+    def __init__(
+        self,
+        old_registry: "dict[str, BaseObjectTraits]",
+        new_registry: "dict[str, BaseObjectTraits]",
+    ) -> None:
+        self.added = [i for i in new_registry if i not in old_registry]
+        self.removed = [i for i in old_registry if i not in new_registry]
+        self.changed = {}
+        for object_id, traits in new_registry.items():
+            old_traits = old_registry.get(object_id)
+            # Pooled traits are shared, so identical traits are the same object.
+            if old_traits is None or old_traits is traits:
+                continue
+            change = TraitsChange(old_traits, traits)
+            if change:
+                self.changed[object_id] = change
+
+
+class MultiVersionRegistry:
+    """Loads several versions side by side, sharing identical traits between them.
+
+    Every version is a normal MinecraftObjectFactory. They all import through one TraitPool,
+    so traits, block properties and allowed value lists that did not change between versions
+    exist once in memory. Memory grows with the differences between versions.
+
+    Example:
+        versions = MultiVersionRegistry({"1.19": [ModInfo("minecraft", "1.19")], "1.20": [VANILLA_JAVA_LATEST]})
+        block = versions["1.19"].block.create("stone")
+        print(versions.diff("1.19", "1.20", "block").added)
+    """
+
+    trait_pool: TraitPool
+    _versions: "dict[str, MinecraftObjectFactory]"
+    _translators: "dict[tuple, StateTranslator]"
+
+    @property
+    def versions(self) -> "list[str]":
+        return list(self._versions)
+
+    def __init__(self, versions: "dict[str, list[ModInfo]]" = {}) -> None:
+        self.trait_pool = TraitPool()
+        self._versions = {}
+        self._translators = {}
+        for name, mods in versions.items():
+            self.add_version(name, mods)
+
+    def __getitem__(self, name: str) -> MinecraftObjectFactory:
+        return self._versions[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._versions
+
+    def add_version(self, name: str, mods: "list[ModInfo]") -> MinecraftObjectFactory:
+        """Load a version's mods and keep its factory under name."""
+        if name in self._versions:
+            raise ValueError(f"Already loaded version {name}")
+        factory = MinecraftObjectFactory(mods, self.trait_pool)
+        self._versions[name] = factory
+        return factory
+
+    def diff(self, old: str, new: str, factory_name: str = "block") -> RegistryDiff:
+        """Compare one factory's registry between two loaded versions.
+
+        Args:
+            old (str): name of the earlier version.
+            new (str): name of the later version.
+            factory_name (str): "block", "enchantment", "entity" or "item"
+        """
+        if factory_name not in FACTORY_NAMES:
+            raise ValueError(
+                f"Factory name must be one of {FACTORY_NAMES}. Supplied: {factory_name}"
+            )
+        return RegistryDiff(
+            getattr(self[old], factory_name).registry,
+            getattr(self[new], factory_name).registry,
+        )
+
+    def translator(self, old: str, new: str, **rules: dict) -> StateTranslator:
+        """Get the block state translator between two loaded versions. Built once per pair and rules.
+
+        Args:
+            old (str): name of the version to translate from.
+            new (str): name of the version to translate to.
+            **rules: block_renames, prop_renames, value_renames or defaults. See StateTranslator.
+        """
+        key = (old, new, repr(sorted(rules.items())))
+        if key not in self._translators:
+            self._translators[key] = StateTranslator(
+                self[old].block, self[new].block, **rules
+            )
+        return self._translators[key]
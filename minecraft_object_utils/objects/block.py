@@ -1,4 +1,6 @@
 import contextlib
+from collections.abc import Iterator
+from itertools import product
 
 from .base_object import BaseObject, BaseObjectTraits
 from .block_state.constants import Axis, Direction
@@ -12,6 +14,7 @@ class BlockProperty:
     id: str
     default: str
     allowed: "list[str]"
+    value_index: "dict[str, int]"  # allowed value: position in allowed
 
     def __init__(
         self, id: str, default_value: str, allowed_values: "list[str]"
@@ -19,20 +22,41 @@ class BlockProperty:
         self.id = id
         self.default = str(default_value).lower()
         self.allowed = [str(v).lower() for v in allowed_values]
+        self.value_index = {v: i for i, v in enumerate(self.allowed)}
 
 
 class BlockTraits(BaseObjectTraits):
-    """The definition of a block. Describes possible states and behavior in the game."""
+    """The definition of a block. Describes possible states and behavior in the game.
+
+    Every valid state has a state index from 0 to state_count - 1. Like vanilla, properties
+    are ordered by name and the last property's value changes fastest, so indexes follow
+    the game's block state order.
+    """
 
     props: "list[BlockProperty]"
     piston_behavior: str
     inventory_slots: int
+    _state_layout: "list[tuple[BlockProperty, int]] | None"  # (prop, stride) by name
+
+    @property
+    def state_count(self) -> int:
+        """Gets the number of valid states."""
+        layout = self._get_state_layout()
+        return layout[0][1] * len(layout[0][0].allowed) if layout else 1
+
+    @property
+    def default_state_index(self) -> int:
+        """Gets the state index of the default state."""
+        return sum(
+            p.value_index[p.default] * stride for p, stride in self._get_state_layout()
+        )
 
     def __init__(self, id: str, **kwargs) -> None:
         super().__init__(id)
         self.props = kwargs.get("props", [])
         self.inventory_slots = kwargs.get("inventory_slots", None)
         self.piston_behavior = kwargs.get("piston_behavior", "NORMAL")
+        self._state_layout = None
 
     @staticmethod
     def create_from_toml(block_id: str, **kwargs: dict) -> "BlockTraits":
@@ -51,6 +75,56 @@ class BlockTraits(BaseObjectTraits):
             inventory_slots=inventory_slots,
         )
 
+    def iter_states(self) -> "Iterator[dict[str, str]]":
+        """Lazily generate every valid state in state index order."""
+        layout = self._get_state_layout()
+        names = [p.id for p, _ in layout]
+        for values in product(*(p.allowed for p, _ in layout)):
+            yield dict(zip(names, values))
+
+    def state_index(self, state: "dict[str, str]") -> int:
+        """Get the state index of a state. Properties missing from state use their default.
+
+        Args:
+            state (dict[str, str]): property names and values. Example: {"facing": "east"}
+        """
+        index = 0
+        for prop, stride in self._get_state_layout():
+            value = state.get(prop.id, prop.default)
+            try:
+                index += prop.value_index[value] * stride
+            except KeyError:
+                raise ValueError(
+                    f"'{value}' is not a valid state. Valid values are: {prop.allowed}"
+                ) from None
+        return index
+
+    def state_from_index(self, index: int) -> "dict[str, str]":
+        """Get the state with a state index, without creating any other states.
+
+        Args:
+            index (int): from 0 to state_count - 1
+        """
+        if not 0 <= index < self.state_count:
+            raise IndexError(f"State index {index} is out of range for block {self.id}")
+        state = {}
+        for prop, stride in self._get_state_layout():
+            state[prop.id] = prop.allowed[index // stride]
+            index %= stride
+        return state
+
+    def _get_state_layout(self) -> "list[tuple[BlockProperty, int]]":
+        "Get props ordered by name with the mixed radix stride of each."
+        if self._state_layout is None:
+            layout = []
+            stride = 1
+            for prop in sorted(self.props, key=lambda p: p.id, reverse=True):
+                layout.append((prop, stride))
+                stride *= len(prop.allowed)
+            layout.reverse()
+            self._state_layout = layout
+        return self._state_layout
+
 
 class Block(BaseObject):
     """Represents a block and its state. Restricts state to valid values."""
@@ -64,6 +138,11 @@ class Block(BaseObject):
         """Gets a copy of the block's state."""
         return self._state.copy()
 
+    @property
+    def state_index(self) -> int:
+        """Gets the index of the block's state among all states of its traits."""
+        return self.traits.state_index(self._state)
+
     def __init__(self, traits: BlockTraits, **kwargs) -> None:
         super().__init__(traits)
         if self.traits.inventory_slots is not None:
@@ -1,4 +1,7 @@
-from strenum import StrEnum
+try:
+    from enum import StrEnum
+except ImportError:  # Python < 3.11
+    from strenum import StrEnum
 
 
 class StrLowerEnum(StrEnum):
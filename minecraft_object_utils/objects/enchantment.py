@@ -8,6 +8,7 @@ class EnchantmentTraits(BaseObjectTraits):
     category: str
     rarity: str
     curse: bool
+    exclusive: "list[str]"  # ids of enchantments that can't be combined with this one
 
     def __init__(self, id: str, **kwargs) -> None:
         super().__init__(id)
@@ -15,6 +16,10 @@ class EnchantmentTraits(BaseObjectTraits):
         self.category = kwargs.get("category", None)
         self.rarity = kwargs.get("rarity", None)
         self.curse = kwargs.get("curse", False)
+        self.exclusive = [
+            other if ":" in other else f"minecraft:{other}"
+            for other in kwargs.get("exclusive", [])
+        ]
 
     @staticmethod
     def create_from_toml(enchantment_id: str, **kwargs) -> "EnchantmentTraits":
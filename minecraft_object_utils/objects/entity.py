@@ -25,6 +25,22 @@ class Entity(BaseObject):
     """Represents an entity and stores common NBT."""
 
     traits: EntityTraits
+    pos: "tuple[float, float, float]"  # x, y, z of the bottom center
+
+    @property
+    def bounding_box(self) -> "tuple[float, float, float, float, float, float]":
+        """Gets the axis aligned bounding box as (min x, min y, min z, max x, max y, max z)."""
+        x, y, z = self.pos
+        half_width = self.traits.width / 2
+        return (
+            x - half_width,
+            y,
+            z - half_width,
+            x + half_width,
+            y + self.traits.height,
+            z + half_width,
+        )
 
     def __init__(self, entity_info: EntityTraits, **kwargs) -> None:
         super().__init__(entity_info)
+        self.pos = tuple(kwargs.get("pos", (0.0, 0.0, 0.0)))
@@ -4,14 +4,28 @@ from .item import ItemStack
 
 
 class Inventory(MutableSequence):
-    """A list-like object that represents a minecraft inventory."""
+    """A list-like object that represents a minecraft inventory.
+
+    Slots that change are recorded until the next checkpoint, so a delta of only the
+    changed slots can be sent elsewhere and applied with apply_delta. Changes made to
+    an ItemStack in place are not tracked; assign the slot again to record them.
+    """
 
     _inventory: "list[ItemStack]"
+    _dirty: "set[int]"
+
+    @property
+    def dirty_slots(self) -> "list[int]":
+        """Gets the sorted slots that changed since the last checkpoint."""
+        return sorted(self._dirty)
 
     def __init__(self, capacity: int) -> None:
         self._inventory = [None] * capacity
+        self._dirty = set()
 
     def __delitem__(self, i: int) -> None:
+        if self._inventory[i] is not None:
+            self._dirty.add(self._slot(i))
         self._inventory[i] = None
 
     def __getitem__(self, i: "int | slice") -> "ItemStack | list[ItemStack]":
@@ -22,6 +36,8 @@ class Inventory(MutableSequence):
             raise TypeError(
                 f"Inventory can only hold ItemStack objects or None. Supplied: {type(input)}"
             )
+        if self._inventory[i] is not item_stack:
+            self._dirty.add(self._slot(i))
         self._inventory[i] = item_stack
 
     def __iter__(self) -> iter:
@@ -38,8 +54,21 @@ class Inventory(MutableSequence):
         inst.__dict__.update(self.__dict__)
         # Create a copy and avoid triggering descriptors
         inst.__dict__["_inventory"] = self.__dict__["_inventory"][:]
+        inst.__dict__["_dirty"] = self.__dict__["_dirty"].copy()
         return inst
 
+    def _slot(self, i: int) -> int:
+        "Convert a possibly negative index to its slot number."
+        return i + len(self._inventory) if i < 0 else i
+
+    def _mark_moved(self, previous: "list[ItemStack]") -> None:
+        "Record every slot whose item stack differs from the previous contents."
+        self._dirty.update(
+            slot
+            for slot, (old, new) in enumerate(zip(previous, self._inventory))
+            if old is not new
+        )
+
     def set_slot(self, slot: int, item_stack: ItemStack) -> None:
         """Set item stack for desired slot."""
         self.__setitem__(slot, item_stack)
@@ -84,11 +113,14 @@ class Inventory(MutableSequence):
 
     def clear(self) -> None:
         """Remove all items from every slot in inventory."""
+        self._dirty.update(
+            slot for slot, item in enumerate(self._inventory) if item is not None
+        )
         self._inventory = [None for _ in self._inventory]
 
     def copy(self) -> "Inventory":
-        """Make a shallow copy of the inventory."""
-        return Inventory.create_from_list(self._inventory)
+        """Make a shallow copy of the inventory. The copy has the same changed slots."""
+        return self.__copy__()
 
     def count(self, item_stack: ItemStack) -> int:
         """Return number of occurrences of value."""
@@ -103,11 +135,36 @@ class Inventory(MutableSequence):
 
     def reverse(self) -> None:
         """Reverses the order of all slots in inventory."""
+        previous = self._inventory[:]
         self._inventory.reverse()
+        self._mark_moved(previous)
 
     def sort(self, /, *args, **kwds) -> None:
         """Sort the inventory according to built-in python list sort."""
+        previous = self._inventory[:]
         self._inventory.sort(*args, **kwds)
+        self._mark_moved(previous)
+
+    def checkpoint(self) -> None:
+        """Forget changed slots. Later deltas only describe changes after this call."""
+        self._dirty.clear()
+
+    def get_delta(self) -> "dict[int, ItemStack | None]":
+        """Get the changed slots since the last checkpoint.
+
+        Returns:
+            dict[int, ItemStack | None]: maps slot to its new item stack, or None if it was emptied.
+        """
+        return {slot: self._inventory[slot] for slot in sorted(self._dirty)}
+
+    def apply_delta(self, delta: "dict[int, ItemStack | None]") -> None:
+        """Update slots from a delta made by get_delta. Applied slots are marked as changed.
+
+        Args:
+            delta (dict[int, ItemStack | None]): maps slot to new item stack, or None to empty it.
+        """
+        for slot, item_stack in delta.items():
+            self.__setitem__(slot, item_stack)
 
     def insert(self, *args) -> None:
         raise NotImplementedError
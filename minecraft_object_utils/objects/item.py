@@ -8,12 +8,16 @@ class ItemTraits(BaseObjectTraits):
     max_stack_size: int
     max_damage: int
     is_fire_resistant: bool
+    enchantment_categories: "list[str]"  # enchantment categories that apply to item
+    extra_enchantments: "list[str]"  # enchantments outside those categories that apply
 
     def __init__(self, item_id: str, **kwargs) -> None:
         super().__init__(item_id)
         self.max_stack_size = kwargs.get("max_stack_size", 64)
         self.max_damage = kwargs.get("max_damage", 0)
         self.is_fire_resistant = kwargs.get("is_fire_resistant", False)
+        self.enchantment_categories = kwargs.get("enchantment_categories", [])
+        self.extra_enchantments = kwargs.get("extra_enchantments", [])
 
     @staticmethod
     def create_from_toml(item_id: str, **kwargs) -> "ItemTraits":
@@ -0,0 +1,226 @@
+"""Apply block transforms to large volumes or block lists on a pool of worker processes.
+
+Transforms are first combined into one table from source state id to result state id. The
+state ids and the table are placed in one shared memory segment, and each worker remaps a
+chunk of the ids in place. Workers never load a registry: a table lookup is all they do.
+Positions are rotated or reflected in the parent with numpy before the ids are shared.
+
+Example:
+    result = transform_volume(volume, [BlockTransform.rotate(Axis.Y, 90)], max_workers=8)
+    for chunk in result.chunks:
+        print(chunk.start, chunk.stop, chunk.seconds)
+"""
+import contextlib
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy
+
+from .block_volume import STATE_ID_DTYPE, BlockTransform, BlockVolume
+from .minecraft_object_factory import BlockFactory
+from .objects.block import Block
+from .state_translation import UNMAPPABLE
+
+DEFAULT_CHUNK_SIZE = 1 << 22  # state ids per chunk, 16MB of int32
+
+
+class ChunkTiming:
+    """How long one chunk of state ids took to remap, and in which process."""
+
+    start: int
+    stop: int
+    seconds: float
+    pid: int
+
+    def __init__(self, start: int, stop: int, seconds: float, pid: int) -> None:
+        self.start = start
+        self.stop = stop
+        self.seconds = seconds
+        self.pid = pid
+
+    def __repr__(self) -> str:
+        return f"ChunkTiming({self.start}:{self.stop}, {self.seconds:.4f}s, pid {self.pid})"
+
+
+class TransformResult:
+    """The transformed volume or blocks, with timing for every chunk in order."""
+
+    volume: "BlockVolume | None"
+    blocks: "list[Block] | None"
+    chunks: "list[ChunkTiming]"
+    seconds: float  # wall time of the whole transform
+
+    def __init__(
+        self,
+        chunks: "list[ChunkTiming]",
+        seconds: float,
+        volume: BlockVolume = None,
+        blocks: "list[Block]" = None,
+    ) -> None:
+        self.volume = volume
+        self.blocks = blocks
+        self.chunks = chunks
+        self.seconds = seconds
+
+
+def compose_tables(
+    block_factory: BlockFactory, transforms: "list[BlockTransform]"
+) -> "tuple[numpy.ndarray, BlockFactory]":
+    """Combine transforms into one state id table.
+
+    Returns:
+        tuple[numpy.ndarray, BlockFactory]: the table, and the factory its results belong to.
+    """
+    table = numpy.arange(block_factory.state_count, dtype=STATE_ID_DTYPE)
+    for transform in transforms:
+        step = transform.table(block_factory)
+        table = numpy.where(table == UNMAPPABLE, UNMAPPABLE, step[table])
+        block_factory = transform.target_factory(block_factory)
+    return table.astype(STATE_ID_DTYPE, copy=False), block_factory
+
+
+def transform_volume(
+    volume: BlockVolume,
+    transforms: "list[BlockTransform]",
+    max_workers: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    executor: Executor = None,
+) -> TransformResult:
+    """Apply transforms in order to a volume.
+
+    Args:
+        volume (BlockVolume): the volume to transform. It is not changed.
+        transforms (list[BlockTransform]): rotations, reflections and remaps.
+        max_workers (int): Optional. Size of the process pool to create. 1 runs in this process.
+        chunk_size (int): Optional. Number of blocks each task remaps.
+        executor (Executor): Optional. A process pool to use instead of creating one.
+    """
+    start = time.perf_counter()
+    table, target = compose_tables(volume.factory, transforms)
+    moved = volume.state_ids
+    for transform in transforms:
+        moved = transform.move_positions(moved)
+    state_ids, chunks = remap_state_ids(moved, table, max_workers, chunk_size, executor)
+    return TransformResult(
+        chunks,
+        time.perf_counter() - start,
+        volume=BlockVolume(target, state_ids),
+    )
+
+
+def transform_blocks(
+    block_factory: BlockFactory,
+    blocks: "list[Block]",
+    transforms: "list[BlockTransform]",
+    max_workers: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    executor: Executor = None,
+) -> TransformResult:
+    """Apply the state changes of transforms to a list of blocks from block_factory.
+
+    Blocks have no positions, so only their states change. The result holds new blocks in
+    the same order. A block that keeps an inventory keeps the same Inventory object.
+    See transform_volume for the other arguments.
+    """
+    start = time.perf_counter()
+    table, target = compose_tables(block_factory, transforms)
+    state_ids = numpy.fromiter(
+        (block_factory.state_id(b) for b in blocks),
+        dtype=STATE_ID_DTYPE,
+        count=len(blocks),
+    )
+    state_ids, chunks = remap_state_ids(
+        state_ids, table, max_workers, chunk_size, executor
+    )
+    states = {}
+    result = []
+    for block, state_id in zip(blocks, state_ids.tolist()):
+        if state_id not in states:
+            traits, index = target.decode_state_id(state_id)
+            states[state_id] = (traits, traits.state_from_index(index))
+        traits, state = states[state_id]
+        new_block = Block(traits)
+        new_block._state.update(state)
+        if hasattr(block, "inventory") and hasattr(new_block, "inventory"):
+            new_block.inventory = block.inventory
+        result.append(new_block)
+    return TransformResult(chunks, time.perf_counter() - start, blocks=result)
+
+
+def remap_state_ids(
+    state_ids: numpy.ndarray,
+    table: numpy.ndarray,
+    max_workers: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    executor: Executor = None,
+) -> "tuple[numpy.ndarray, list[ChunkTiming]]":
+    """Look up every state id in table, in chunks, on a process pool.
+
+    Returns:
+        tuple[numpy.ndarray, list[ChunkTiming]]: a new array the shape of state_ids, and
+            the timing of each chunk in order.
+    """
+    size = state_ids.size
+    bounds = [(a, min(a + chunk_size, size)) for a in range(0, size, chunk_size)]
+    if executor is None and (max_workers == 1 or len(bounds) <= 1):
+        result = numpy.array(state_ids, dtype=STATE_ID_DTYPE, order="C")
+        flat = result.reshape(-1)
+        chunks = [_remap_chunk(flat, table, a, b) for a, b in bounds]
+    else:
+        shm = shared_memory.SharedMemory(
+            create=True, size=(len(table) + size) * STATE_ID_DTYPE().itemsize
+        )
+        shared_table = shared_ids = None
+        try:
+            shared_table, shared_ids = _views(shm, len(table), size)
+            shared_table[:] = table
+            shared_ids.reshape(state_ids.shape)[...] = state_ids
+            with contextlib.ExitStack() as stack:
+                pool = executor or stack.enter_context(ProcessPoolExecutor(max_workers))
+                futures = [
+                    pool.submit(_remap_shared_chunk, shm.name, len(table), size, a, b)
+                    for a, b in bounds
+                ]
+                chunks = [future.result() for future in futures]
+            result = shared_ids.reshape(state_ids.shape).copy()
+        finally:
+            # Views must be gone before the segment can close.
+            shared_table = shared_ids = None
+            shm.close()
+            shm.unlink()
+    unmappable = numpy.count_nonzero(result == UNMAPPABLE)
+    if unmappable:
+        raise ValueError(f"{unmappable} blocks have states that can't be translated")
+    return result, chunks
+
+
+def _views(
+    shm: shared_memory.SharedMemory, table_size: int, size: int
+) -> "tuple[numpy.ndarray, numpy.ndarray]":
+    buffer = numpy.ndarray(table_size + size, dtype=STATE_ID_DTYPE, buffer=shm.buf)
+    return buffer[:table_size], buffer[table_size:]
+
+
+def _remap_chunk(
+    state_ids: numpy.ndarray, table: numpy.ndarray, start: int, stop: int
+) -> ChunkTiming:
+    began = time.perf_counter()
+    chunk = state_ids[start:stop]
+    chunk[...] = table[chunk]
+    return ChunkTiming(start, stop, time.perf_counter() - began, os.getpid())
+
+
+def _remap_shared_chunk(
+    name: str, table_size: int, size: int, start: int, stop: int
+) -> ChunkTiming:
+    shm = shared_memory.SharedMemory(name)
+    table = state_ids = None
+    try:
+        table, state_ids = _views(shm, table_size, size)
+        timing = _remap_chunk(state_ids, table, start, stop)
+    finally:
+        table = state_ids = None
+        shm.close()
+    return timing
@@ -0,0 +1,278 @@
+"""Stream a block volume through generator stages one chunk at a time.
+
+A source yields Chunks: a box of positions and their state ids. Stages take an iterable of
+chunks and yield chunks, so they compose by nesting, and a sink consumes them. Only a few
+chunks are in memory at once, and blocks are never created per position: predicates run
+once per distinct state and state changes are table lookups. A chunk holding a single
+state, such as a section of air, is handled with one lookup.
+
+Example:
+    chunks = read_chunks(volume_file)
+    chunks = where(chunks, lambda block: block.id.endswith("_stairs"))
+    chunks = transform_states(chunks, BlockTransform.rotate(Axis.Y, 90))
+    write_chunks(chunks, volume_file)
+"""
+import weakref
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from functools import partial
+from itertools import chain
+
+import numpy
+
+from .block_volume import BlockTransform, BlockVolume, iter_tiles, state_mask
+from .minecraft_object_factory import BlockFactory
+from .objects.block import Block
+from .parallel_transform import compose_tables
+from .state_translation import UNMAPPABLE
+from .trait_index import TraitQuery
+from .volume_file import VolumeFile
+
+SECTION_SHAPE = (16, 16, 16)
+
+# predicate: {factory: int8 table of state id: 1 matches, 0 doesn't, -1 not checked yet}
+_predicate_tables: "weakref.WeakKeyDictionary[Callable, weakref.WeakKeyDictionary]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class Chunk:
+    """A box of positioned blocks passing through a pipeline.
+
+    Attributes:
+        region (tuple[slice, slice, slice]): where the chunk is in its source.
+        state_ids (numpy.ndarray): state ids of factory, shaped like region.
+        mask (numpy.ndarray): Optional. The positions selected by earlier stages. None
+            selects every position.
+    """
+
+    region: "tuple[slice, slice, slice]"
+    factory: BlockFactory
+    state_ids: numpy.ndarray
+    mask: "numpy.ndarray | None"
+    _uniform: "int | None | bool"  # the only state id, None if mixed, False if not checked
+
+    def __init__(
+        self,
+        region: "tuple[slice, slice, slice]",
+        factory: BlockFactory,
+        state_ids: numpy.ndarray,
+        mask: numpy.ndarray = None,
+    ) -> None:
+        self.region = region
+        self.factory = factory
+        self.state_ids = state_ids
+        self.mask = mask
+        self._uniform = False
+
+    @property
+    def origin(self) -> "tuple[int, int, int]":
+        return tuple(r.start for r in self.region)
+
+    @property
+    def uniform_state(self) -> "int | None":
+        """The state id of every position if the chunk holds only one state, else None."""
+        if self._uniform is False:
+            flat = self.state_ids.reshape(-1)
+            first = flat[0] if flat.size else None
+            uniform = flat.size and not numpy.any(flat != first)
+            self._uniform = int(first) if uniform else None
+        return self._uniform
+
+    def selected(self) -> numpy.ndarray:
+        """Get the state ids of the selected positions, in C order."""
+        if self.mask is None:
+            return self.state_ids.reshape(-1)
+        return self.state_ids[self.mask]
+
+    def positions(self) -> "Iterator[tuple[tuple[int, int, int], int]]":
+        """Generate (position in the source, state id) for each selected position."""
+        mask = (
+            self.mask
+            if self.mask is not None
+            else numpy.ones(self.state_ids.shape, bool)
+        )
+        origin = numpy.array(self.origin)
+        for position, state_id in zip(numpy.argwhere(mask) + origin, self.selected()):
+            yield tuple(position.tolist()), int(state_id)
+
+
+def read_chunks(
+    source: "BlockVolume | VolumeFile",
+    chunk_shape: "tuple[int, int, int]" = SECTION_SHAPE,
+) -> "Iterator[Chunk]":
+    """Generate chunks covering a volume or volume file in C order.
+
+    Chunks of a volume file are read as they are reached, so the file is never loaded whole.
+    """
+    for region in iter_tiles(source.shape, chunk_shape):
+        state_ids = (
+            source.read(region).state_ids
+            if isinstance(source, VolumeFile)
+            else source.state_ids[region]
+        )
+        yield Chunk(region, source.factory, state_ids)
+
+
+def where(
+    chunks: "Iterable[Chunk]", predicate: "Callable[[Block], bool] | TraitQuery"
+) -> "Iterator[Chunk]":
+    """Select the positions whose block matches predicate, among those already selected.
+
+    A function is called once per distinct state, and results are kept for later chunks
+    and pipelines for as long as the function exists. A TraitQuery is evaluated for every
+    state at once and cached. Chunks with no match are dropped.
+    """
+    for chunk in chunks:
+        if isinstance(predicate, TraitQuery):
+            table = state_mask(chunk.factory, predicate)
+            check = table.__getitem__
+        else:
+            table = _predicate_table(predicate, chunk.factory)
+            check = partial(_check_states, table, chunk.factory, predicate)
+        uniform = chunk.uniform_state
+        if uniform is not None:
+            if not check(numpy.array([uniform]))[0]:
+                continue
+            yield chunk
+            continue
+        matches = check(chunk.state_ids)
+        mask = matches if chunk.mask is None else matches & chunk.mask
+        if mask.any():
+            chunk.mask = mask
+            yield chunk
+
+
+def transform_states(
+    chunks: "Iterable[Chunk]", *transforms: BlockTransform
+) -> "Iterator[Chunk]":
+    """Rotate, reflect, replace or remap the states of selected positions, without moving them.
+
+    Tables are composed once per factory. Chunks are changed in place and yielded.
+
+    Raises:
+        ValueError: a remap has no target state for a selected block.
+    """
+    tables = {}  # factory: (table, target factory)
+    for chunk in chunks:
+        if chunk.factory not in tables:
+            tables[chunk.factory] = compose_tables(chunk.factory, transforms)
+        table, target = tables[chunk.factory]
+        uniform = chunk.uniform_state
+        if uniform is not None and chunk.mask is None:
+            changed = numpy.full(
+                chunk.state_ids.shape, table[uniform], dtype=table.dtype
+            )
+            chunk._uniform = int(table[uniform])
+        else:
+            changed = table[chunk.state_ids]
+            if chunk.mask is not None:
+                changed = numpy.where(chunk.mask, changed, chunk.state_ids)
+            chunk._uniform = False
+        if numpy.any(changed == UNMAPPABLE):
+            raise ValueError(
+                f"Blocks in chunk at {chunk.origin} have states that can't be translated"
+            )
+        chunk.state_ids = changed
+        chunk.factory = target
+        yield chunk
+
+
+def count_states(chunks: "Iterable[Chunk]") -> "Counter[int]":
+    """Count the selected positions of each state id."""
+    totals = numpy.zeros(0, dtype=numpy.int64)
+    uniform_counts = Counter()
+    for chunk in chunks:
+        uniform = chunk.uniform_state
+        if uniform is not None and chunk.mask is None:
+            uniform_counts[uniform] += chunk.state_ids.size
+            continue
+        counts = numpy.bincount(chunk.selected(), minlength=len(totals))
+        if len(counts) > len(totals):
+            counts[: len(totals)] += totals
+            totals = counts
+        else:
+            totals += counts
+    (state_ids,) = numpy.nonzero(totals)
+    uniform_counts.update(dict(zip(state_ids.tolist(), totals[state_ids].tolist())))
+    return uniform_counts
+
+
+def count_blocks(chunks: "Iterable[Chunk]", factory: BlockFactory) -> "Counter[str]":
+    """Count the selected positions of each block id. Chunks must hold states of factory."""
+    counts = Counter()
+    for state_id, count in count_states(chunks).items():
+        counts[factory.decode_state_id(state_id)[0].id] += count
+    return counts
+
+
+def write_chunks(chunks: "Iterable[Chunk]", target: "BlockVolume | VolumeFile") -> int:
+    """Write the selected positions of each chunk to the same region of target.
+
+    Returns:
+        int: number of chunks written.
+
+    Raises:
+        ValueError: a chunk holds states of a different factory than target. Nothing is
+            written if it is the first chunk, otherwise the chunks before it are.
+    """
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is None:
+        return 0
+    if first.factory is not target.factory:
+        raise ValueError("Chunks hold states of a different factory than the target")
+    written = 0
+    for chunk in chain([first], chunks):
+        if chunk.factory is not target.factory:
+            raise ValueError(
+                "Chunks hold states of a different factory than the target"
+            )
+        state_ids = chunk.state_ids
+        if chunk.mask is not None:
+            existing = (
+                target.read(chunk.region).state_ids
+                if isinstance(target, VolumeFile)
+                else target.state_ids[chunk.region]
+            )
+            state_ids = numpy.where(chunk.mask, state_ids, existing)
+        if isinstance(target, VolumeFile):
+            target.write(chunk.region, state_ids)
+        else:
+            target.state_ids[chunk.region] = state_ids
+        written += 1
+    return written
+
+
+def _predicate_table(
+    predicate: "Callable[[Block], bool]", factory: BlockFactory
+) -> numpy.ndarray:
+    try:
+        by_factory = _predicate_tables.setdefault(
+            predicate, weakref.WeakKeyDictionary()
+        )
+    except TypeError:  # not weakly referenceable, so the results last for one call
+        by_factory = weakref.WeakKeyDictionary()
+    table = by_factory.get(factory)
+    if table is None or len(table) != factory.state_count:
+        # Registering blocks adds state ids after the old ones, so keep what was checked.
+        grown = numpy.full(factory.state_count, -1, dtype=numpy.int8)
+        if table is not None and len(table) < len(grown):
+            grown[: len(table)] = table
+        table = by_factory[factory] = grown
+    return table
+
+
+def _check_states(
+    table: numpy.ndarray,
+    factory: BlockFactory,
+    predicate: "Callable[[Block], bool]",
+    state_ids: numpy.ndarray,
+) -> numpy.ndarray:
+    """Look up predicate results for state ids, calling it for states not seen before."""
+    results = table[state_ids]
+    if numpy.any(results < 0):
+        for state_id in numpy.unique(state_ids[results < 0]).tolist():
+            table[state_id] = bool(predicate(factory.create_from_state_id(state_id)))
+        results = table[state_ids]
+    return results.astype(bool)
@@ -0,0 +1,88 @@
+from bisect import bisect_left, insort
+
+from .mod_info import VANILLA_NAMESPACE
+
+
+class RegistrySearch:
+    """Sorted index of registry ids for prefix searches and typo suggestions.
+
+    Ids are kept in two sorted lists: full ids ("namespace:path"), and paths paired with
+    their full id. A query with a namespace searches full ids. A query without one searches
+    paths in every namespace, so "oak_st" finds "minecraft:oak_stairs" and "othermod:oak_stool".
+    """
+
+    _ids: "list[str]"
+    _paths: "list[tuple[str, str]]"  # (path, full id)
+    _ids_by_path: "dict[str, list[str]] | None"
+
+    def __init__(self, ids: "list[str]" = []) -> None:
+        self._ids = sorted(ids)
+        self._paths = sorted((_path(object_id), object_id) for object_id in ids)
+        self._ids_by_path = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, object_id: str) -> bool:
+        i = bisect_left(self._ids, object_id)
+        return i < len(self._ids) and self._ids[i] == object_id
+
+    def add(self, object_id: str) -> None:
+        """Index a newly registered id."""
+        insort(self._ids, object_id)
+        insort(self._paths, (_path(object_id), object_id))
+        self._ids_by_path = None
+
+    def prefix(self, query: str, limit: int = None) -> "list[str]":
+        """Find ids that start with query, sorted.
+
+        Args:
+            query (str): start of an id. Example: "minecraft:oak_" or "oak_"
+            limit (int): Optional. Return at most this many ids.
+
+        Returns:
+            list[str]: full ids of matches.
+        """
+        query = query.lower()
+        if ":" in query:
+            start = bisect_left(self._ids, query)
+            end = bisect_left(self._ids, query + "\uffff")
+            matches = self._ids[start:end]
+        else:
+            start = bisect_left(self._paths, (query,))
+            end = bisect_left(self._paths, (query + "\uffff",))
+            matches = [object_id for _, object_id in self._paths[start:end]]
+            matches.sort()
+        return matches if limit is None else matches[:limit]
+
+    def suggest(self, query: str, limit: int = 5, cutoff: float = 0.6) -> "list[str]":
+        """Find ids similar to query, best match first. Useful for typos.
+
+        Args:
+            query (str): a possibly misspelled id. The minecraft namespace is assumed if one is not supplied.
+            limit (int): Return at most this many ids.
+            cutoff (float): Similarity between 0 and 1 that a match must reach.
+        """
+        from difflib import get_close_matches
+
+        query = query.lower()
+        if ":" not in query:
+            query = f"{VANILLA_NAMESPACE}:{query}"
+        namespace, path = query.split(":", 1)
+        if self._ids_by_path is None:
+            self._ids_by_path = {}
+            for other_path, object_id in self._paths:
+                self._ids_by_path.setdefault(other_path, []).append(object_id)
+        paths = self._ids_by_path
+        ranked = []
+        for match in get_close_matches(path, paths, limit, cutoff):
+            # Prefer the queried namespace when several share a path.
+            ranked.extend(
+                sorted(paths[match], key=lambda i: i.split(":", 1)[0] != namespace)
+            )
+        return ranked[:limit]
+
+
+def _path(object_id: str) -> str:
+    """Get the part of an id after its namespace. An id without one is all path."""
+    return object_id.partition(":")[2] or object_id
@@ -0,0 +1,167 @@
+"""Hash a block volume section by section to find what changed between two snapshots.
+
+A volume is split into cubic sections. Each section is hashed from its state ids, and every
+2x2x2 group of hashes is hashed again into a parent until one root hash covers the volume.
+Two trees with equal roots hold equal volumes. Diffing only descends where hashes differ,
+so a few edits in a large build are found without comparing every block.
+
+Example:
+    tree = SectionHashTree(volume)
+    before = tree.copy()
+    tree[10, 64, 10] = factory.block.create("stone")
+    for region in before.diff(tree):
+        print(volume.state_ids[region])
+"""
+import hashlib
+import itertools
+
+import numpy
+
+from .block_volume import BlockVolume
+from .objects.block import Block
+
+SECTION_SIZE = 16
+DIGEST_SIZE = 16
+
+
+class SectionHashTree:
+    """A tree of hashes over the sections of a BlockVolume.
+
+    Edits made through the tree mark their sections as changed. After changing
+    volume.state_ids directly, call mark_changed with the edited region. Hashes are brought
+    up to date on the next read, rehashing only changed sections and their ancestors.
+    """
+
+    volume: BlockVolume
+    section_size: int
+    # Hashes of each level as uint8 arrays shaped (*grid, DIGEST_SIZE). levels[0] holds
+    # section hashes, levels[-1] holds only the root.
+    levels: "list[numpy.ndarray]"
+    _changed: "set[tuple[int, int, int]]"  # sections to rehash
+
+    def __init__(self, volume: BlockVolume, section_size: int = SECTION_SIZE) -> None:
+        if section_size < 1:
+            raise ValueError(f"Section size must be positive: {section_size}")
+        self.volume = volume
+        self.section_size = section_size
+        grid = tuple(max(1, -(-n // section_size)) for n in volume.shape)
+        self.levels = [numpy.zeros((*grid, DIGEST_SIZE), dtype=numpy.uint8)]
+        while grid != (1, 1, 1):
+            grid = tuple(-(-n // 2) for n in grid)
+            self.levels.append(numpy.zeros((*grid, DIGEST_SIZE), dtype=numpy.uint8))
+        self._changed = set(itertools.product(*(range(n) for n in self.grid)))
+
+    @property
+    def grid(self) -> "tuple[int, int, int]":
+        """Number of sections along each axis."""
+        return self.levels[0].shape[:3]
+
+    @property
+    def root(self) -> bytes:
+        """The hash covering the whole volume."""
+        self._rehash()
+        return self.levels[-1][0, 0, 0].tobytes()
+
+    def section_hash(self, section: "tuple[int, int, int]") -> bytes:
+        """Get the hash of one section by its index in the grid."""
+        self._rehash()
+        return self.levels[0][section].tobytes()
+
+    def section_region(
+        self, section: "tuple[int, int, int]"
+    ) -> "tuple[slice, slice, slice]":
+        """Get the slices of the volume a section covers."""
+        size = self.section_size
+        return tuple(
+            slice(i * size, min((i + 1) * size, n))
+            for i, n in zip(section, self.volume.shape)
+        )
+
+    def __setitem__(self, position: "tuple[int, int, int]", block: Block) -> None:
+        self.volume[position] = block
+        self.mark_changed(position)
+
+    def mark_changed(
+        self, region: "tuple[int | slice, int | slice, int | slice]"
+    ) -> None:
+        """Mark the sections overlapping a position or region of the volume as changed.
+
+        Args:
+            region (tuple[int | slice, ...]): an index into volume.state_ids, such as (x, y, z)
+                or (slice(0, 32), 64, slice(None)).
+        """
+        ranges = []
+        for i in self.volume.region(region):
+            if i.stop <= i.start:
+                return
+            ranges.append(
+                range(
+                    i.start // self.section_size, (i.stop - 1) // self.section_size + 1
+                )
+            )
+        self._changed.update(itertools.product(*ranges))
+
+    def copy(self) -> "SectionHashTree":
+        """Copy the tree and its volume, to keep as a snapshot."""
+        self._rehash()
+        tree = SectionHashTree.__new__(SectionHashTree)
+        tree.volume = self.volume.copy()
+        tree.section_size = self.section_size
+        tree.levels = [level.copy() for level in self.levels]
+        tree._changed = set()
+        return tree
+
+    def diff(self, other: "SectionHashTree") -> "list[tuple[slice, slice, slice]]":
+        """Find the sections that differ from another tree of the same size.
+
+        State ids are compared, so both volumes must use the same block data.
+
+        Returns:
+            list[tuple[slice, slice, slice]]: the volume regions of changed sections, in order.
+        """
+        if (
+            self.volume.shape != other.volume.shape
+            or self.section_size != other.section_size
+        ):
+            raise ValueError(
+                "Only trees of the same volume shape and section size can be diffed"
+            )
+        self._rehash()
+        other._rehash()
+        changed = []
+        pending = [(len(self.levels) - 1, (0, 0, 0))]
+        while pending:
+            depth, node = pending.pop()
+            if numpy.array_equal(self.levels[depth][node], other.levels[depth][node]):
+                continue
+            if depth == 0:
+                changed.append(node)
+                continue
+            children = self.levels[depth - 1].shape[:3]
+            for offset in itertools.product(range(2), repeat=3):
+                child = tuple(2 * i + o for i, o in zip(node, offset))
+                if all(i < n for i, n in zip(child, children)):
+                    pending.append((depth - 1, child))
+        return [self.section_region(section) for section in sorted(changed)]
+
+    def _rehash(self) -> None:
+        if not self._changed:
+            return
+        state_ids = self.volume.state_ids
+        leaves = self.levels[0]
+        for section in self._changed:
+            digest = hashlib.blake2b(
+                state_ids[self.section_region(section)].tobytes(),
+                digest_size=DIGEST_SIZE,
+            )
+            leaves[section] = numpy.frombuffer(digest.digest(), dtype=numpy.uint8)
+        nodes = self._changed
+        for children, parents in zip(self.levels, self.levels[1:]):
+            nodes = {tuple(i // 2 for i in node) for node in nodes}
+            for x, y, z in nodes:
+                block = children[
+                    2 * x : 2 * x + 2, 2 * y : 2 * y + 2, 2 * z : 2 * z + 2
+                ]
+                digest = hashlib.blake2b(block.tobytes(), digest_size=DIGEST_SIZE)
+                parents[x, y, z] = numpy.frombuffer(digest.digest(), dtype=numpy.uint8)
+        self._changed = set()
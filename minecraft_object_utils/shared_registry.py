@@ -0,0 +1,162 @@
+"""Share a loaded factory's registries with worker processes through shared memory.
+
+The parent exports a loaded factory once. Workers attach by the segment's name and unpickle
+their own copy of the factory from shared memory, skipping file reads, toml parsing and
+registration, though each worker still holds a full factory. The state tables are views
+into the segment that every process reads without copying, for work that only needs to
+map state ids to blocks and doesn't use the factory.
+
+Segment layout:
+    8 bytes      length of the json description, little endian
+    json         {"format": 1, "factory": [offset, length], "tables": {name: [offset, count]}}
+    factory      the pickled factory
+    tables       int32 arrays
+Sections start on 8 byte boundaries.
+
+Example:
+    with SharedRegistry.export(factory) as shared:
+        with ProcessPoolExecutor() as pool:
+            pool.map(work, [(shared.name, chunk) for chunk in chunks])
+
+    def work(args):
+        name, chunk = args
+        factory = get_shared_factory(name)
+"""
+import json
+import pickle
+import struct
+from multiprocessing import shared_memory
+
+from .minecraft_object_factory import MinecraftObjectFactory
+
+SHARED_FORMAT = 1
+_LENGTH = struct.Struct("<Q")
+_TABLE_ITEMSIZE = 4
+
+# segment name: registry attached by this process
+_attached: "dict[str, SharedRegistry]" = {}
+
+
+class SharedRegistry:
+    """A loaded factory and its state tables in a shared memory segment.
+
+    The exporting process owns the segment and removes it on unlink(), or when leaving a
+    with block. Attached processes only close their handle.
+
+    Tables:
+        block_first_state_ids: the first global state id of each block, in registry order.
+        state_blocks: the registry position of the block each global state id belongs to.
+    """
+
+    name: str
+    owner: bool
+    tables: "dict[str, memoryview]"  # read only int32 views into the segment
+    _shm: shared_memory.SharedMemory
+    _description: dict
+    _factory: "MinecraftObjectFactory | None"
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool) -> None:
+        self._shm = shm
+        self.name = shm.name
+        self.owner = owner
+        self._factory = None
+        (length,) = _LENGTH.unpack_from(shm.buf, 0)
+        self._description = json.loads(
+            bytes(shm.buf[_LENGTH.size : _LENGTH.size + length])
+        )
+        if self._description.get("format") != SHARED_FORMAT:
+            raise ValueError(
+                f"Unsupported shared registry format {self._description.get('format')}"
+            )
+        self.tables = {
+            table: shm.buf[offset : offset + count * _TABLE_ITEMSIZE]
+            .toreadonly()
+            .cast("i")
+            for table, (offset, count) in self._description["tables"].items()
+        }
+
+    def __enter__(self) -> "SharedRegistry":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+        if self.owner:
+            self.unlink()
+
+    @staticmethod
+    def export(factory: MinecraftObjectFactory) -> "SharedRegistry":
+        """Copy a factory's registries into a new shared memory segment owned by the caller."""
+        pickled = pickle.dumps(factory, protocol=pickle.HIGHEST_PROTOCOL)
+        tables = _state_tables(factory)
+        description = {"format": SHARED_FORMAT, "factory": None, "tables": {}}
+        # Offsets are part of the description, so repeat until its length settles.
+        encoded = b""
+        while True:
+            offset = _align(_LENGTH.size + len(encoded))
+            description["factory"] = [offset, len(pickled)]
+            offset = _align(offset + len(pickled))
+            for table, values in tables.items():
+                description["tables"][table] = [offset, len(values)]
+                offset = _align(offset + len(values) * _TABLE_ITEMSIZE)
+            previous_length = len(encoded)
+            encoded = json.dumps(description, separators=(",", ":")).encode()
+            if _align(_LENGTH.size + len(encoded)) == _align(
+                _LENGTH.size + previous_length
+            ):
+                break
+
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        _LENGTH.pack_into(shm.buf, 0, len(encoded))
+        shm.buf[_LENGTH.size : _LENGTH.size + len(encoded)] = encoded
+        factory_offset = description["factory"][0]
+        shm.buf[factory_offset : factory_offset + len(pickled)] = pickled
+        for table, values in tables.items():
+            table_offset = description["tables"][table][0]
+            struct.pack_into(f"<{len(values)}i", shm.buf, table_offset, *values)
+        return SharedRegistry(shm, owner=True)
+
+    @staticmethod
+    def attach(name: str) -> "SharedRegistry":
+        """Open a segment exported by another process."""
+        return SharedRegistry(shared_memory.SharedMemory(name), owner=False)
+
+    @property
+    def factory(self) -> MinecraftObjectFactory:
+        """The exported factory, unpickled on first use. Changes to it stay in this process."""
+        if self._factory is None:
+            offset, length = self._description["factory"]
+            with self._shm.buf[offset : offset + length] as pickled:
+                # The segment was written by export() in a process of the same program.
+                self._factory = pickle.loads(pickled)  # noqa: S301
+        return self._factory
+
+    def close(self) -> None:
+        """Release this process's views of the segment."""
+        for table in self.tables.values():
+            table.release()
+        self.tables = {}
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Remove the segment. Only the exporting process should call this."""
+        self._shm.unlink()
+
+
+def get_shared_factory(name: str) -> MinecraftObjectFactory:
+    """Get the factory exported under name, attaching once per process."""
+    if name not in _attached:
+        _attached[name] = SharedRegistry.attach(name)
+    return _attached[name].factory
+
+
+def _state_tables(factory: MinecraftObjectFactory) -> "dict[str, list[int]]":
+    first_state_ids = []
+    state_blocks = []
+    for position, block_id in enumerate(factory.block.registry):
+        first_state_ids.append(factory.block.first_state_id(block_id))
+        state_blocks.extend([position] * factory.block.registry[block_id].state_count)
+    return {"block_first_state_ids": first_state_ids, "state_blocks": state_blocks}
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) // 8 * 8
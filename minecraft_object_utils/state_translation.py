@@ -0,0 +1,169 @@
+from array import array
+from typing import TYPE_CHECKING
+
+from .minecraft_object_factory import BlockFactory
+from .objects.block import Block
+
+if TYPE_CHECKING:
+    import numpy
+
+UNMAPPABLE = -1
+
+
+def _full_id(object_id: str) -> str:
+    return object_id if ":" in object_id else f"minecraft:{object_id}"
+
+
+class StateTranslator:
+    """A table from every source state id to a target state id, built once per factory pair.
+
+    Blocks keep their id unless renamed. Each property keeps its value, after renaming the
+    property or value if a rule says to. Target properties the source block lacks get a value
+    from defaults, or else the target property's default. Source properties the target
+    block lacks are dropped. A state is unmappable if its block is missing from the target
+    or one of its values is not allowed there.
+
+    Args:
+        source (BlockFactory): the factory state ids are translated from.
+        target (BlockFactory): the factory state ids are translated to.
+        block_renames (dict[str, str]): source block id: target block id.
+        prop_renames (dict[str, dict[str, str]]): source block id: {source prop: target prop}.
+            Use "*" as the block id to rename a property in every block.
+        value_renames (dict[str, dict[str, str]]): target prop: {source value: target value}.
+        defaults (dict[str, dict[str, str]]): target block id: {target prop: value}.
+
+    Example:
+        translator = StateTranslator(old.block, new.block, block_renames={"grass_path": "dirt_path"})
+        new_ids = translator.translate_array(old_ids)
+    """
+
+    source: BlockFactory
+    target: BlockFactory
+    table: "array[int]"  # source state id: target state id, or UNMAPPABLE
+    unmappable: "dict[int, str]"  # source state id: reason it can't be translated
+
+    def __init__(
+        self,
+        source: BlockFactory,
+        target: BlockFactory,
+        block_renames: "dict[str, str]" = {},
+        prop_renames: "dict[str, dict[str, str]]" = {},
+        value_renames: "dict[str, dict[str, str]]" = {},
+        defaults: "dict[str, dict[str, str]]" = {},
+    ) -> None:
+        self.source = source
+        self.target = target
+        self.block_renames = {
+            _full_id(k): _full_id(v) for k, v in block_renames.items()
+        }
+        self.prop_renames = {
+            k if k == "*" else _full_id(k): v for k, v in prop_renames.items()
+        }
+        self.value_renames = value_renames
+        self.defaults = {_full_id(k): v for k, v in defaults.items()}
+        self.table = array("l")
+        self.unmappable = {}
+        self._build()
+
+    def _build(self) -> None:
+        "Translate every source state."
+        any_block_renames = self.prop_renames.get("*", {})
+        for source_id, traits in self.source.registry.items():
+            first_state_id = self.source.first_state_id(source_id)
+            target_id = self.block_renames.get(source_id, source_id)
+            target_traits = self.target.registry.get(target_id)
+            if target_traits is None:
+                self._add_unmappable(
+                    first_state_id, traits.state_count, f"{target_id} is not in target"
+                )
+                continue
+            renames = {**any_block_renames, **self.prop_renames.get(source_id, {})}
+            target_props = {p.id for p in target_traits.props}
+            target_base = self.target.first_state_id(target_id)
+            defaults = self.defaults.get(target_id, {})
+            for offset, state in enumerate(traits.iter_states()):
+                target_state = dict(defaults)
+                for prop, value in state.items():
+                    prop = renames.get(prop, prop)
+                    if prop in target_props:
+                        target_state[prop] = self.value_renames.get(prop, {}).get(
+                            value, value
+                        )
+                try:
+                    self.table.append(
+                        target_base + target_traits.state_index(target_state)
+                    )
+                except ValueError:
+                    self.table.append(UNMAPPABLE)
+                    self.unmappable[
+                        first_state_id + offset
+                    ] = f"{target_id} does not allow {target_state}"
+
+    def _add_unmappable(self, first_state_id: int, count: int, reason: str) -> None:
+        self.table.extend([UNMAPPABLE] * count)
+        for state_id in range(first_state_id, first_state_id + count):
+            self.unmappable[state_id] = reason
+
+    def translate_id(self, state_id: int) -> int:
+        """Get the target state id of a source state id. Raises ValueError if unmappable."""
+        target_state_id = self.table[state_id]
+        if target_state_id == UNMAPPABLE:
+            raise ValueError(
+                f"State id {state_id} can't be translated: {self.unmappable[state_id]}"
+            )
+        return target_state_id
+
+    def translate_block(self, block: Block) -> Block:
+        """Create the target version of a source block."""
+        return self.target.create_from_state_id(
+            self.translate_id(self.source.state_id(block))
+        )
+
+    def translate_array(
+        self, state_ids: "numpy.ndarray", fallback: int = None
+    ) -> "numpy.ndarray":
+        """Translate a numpy array of source state ids in one indexing operation.
+
+        Args:
+            state_ids (numpy.ndarray): source state ids of any shape.
+            fallback (int): Optional. Target state id for unmappable states.
+                Without it, unmappable states raise ValueError listing the problems.
+
+        Returns:
+            numpy.ndarray: target state ids with the same shape.
+        """
+        import numpy
+
+        table = numpy.frombuffer(
+            self.table, dtype=numpy.dtype(f"i{self.table.itemsize}")
+        )
+        translated = table[state_ids]
+        missing = translated == UNMAPPABLE
+        if missing.any():
+            if fallback is None:
+                raise ValueError(f"Can't translate states: {self.summarize(state_ids)}")
+            translated[missing] = fallback
+        return translated
+
+    def summarize(self, state_ids: "numpy.ndarray" = None) -> "dict[str, int]":
+        """Count unmappable states by reason.
+
+        Args:
+            state_ids (numpy.ndarray): Optional. Count occurrences in these source state ids.
+                Without it, count every unmappable source state.
+        """
+        counts = {}
+        if state_ids is None:
+            for reason in self.unmappable.values():
+                counts[reason] = counts.get(reason, 0) + 1
+            return counts
+        import numpy
+
+        table = numpy.frombuffer(
+            self.table, dtype=numpy.dtype(f"i{self.table.itemsize}")
+        )
+        missing = numpy.asarray(state_ids)[table[state_ids] == UNMAPPABLE]
+        for state_id, count in zip(*numpy.unique(missing, return_counts=True)):
+            reason = self.unmappable[int(state_id)]
+            counts[reason] = counts.get(reason, 0) + int(count)
+        return counts
@@ -0,0 +1,121 @@
+import re
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    TomlLoads = Callable[[str], dict]
+
+# Header of an object's main table, like [minecraft.stone]. Sub-tables such as
+# [minecraft.stone.properties.snowy] stay with the object above them.
+OBJECT_TABLE_HEADER = re.compile(r"^\[\s*[\w\-]+\s*\.\s*[\w\-]+\s*\]\s*$", re.MULTILINE)
+
+_BACKENDS: "dict[str, Callable[[], TomlLoads]]" = {
+    "tomllib": lambda: import_module("tomllib").loads,
+    "tomli": lambda: import_module("tomli").loads,
+    "toml": lambda: import_module("toml").loads,
+}
+_PREFERENCE = ["tomllib", "tomli", "toml"]
+_loaded: "dict[str, TomlLoads]" = {}
+
+
+def register_toml_backend(name: str, get_loads: "Callable[[], TomlLoads]") -> None:
+    """Add a toml parser that factories can use.
+
+    Args:
+        name (str): name to select the backend by.
+        get_loads (Callable): returns a function that parses toml text to a dict.
+            Called the first time the backend is used, so it may import its parser lazily.
+    """
+    _BACKENDS[name] = get_loads
+    _loaded.pop(name, None)
+    if name not in _PREFERENCE:
+        _PREFERENCE.append(name)
+
+
+def available_toml_backends() -> "list[str]":
+    """Get names of backends whose parser can be imported, fastest first."""
+    available = []
+    for name in _PREFERENCE:
+        try:
+            get_toml_loads(name)
+        except ImportError:
+            continue
+        available.append(name)
+    return available
+
+
+def get_toml_loads(backend: str = None) -> "TomlLoads":
+    """Get the parse function of a backend.
+
+    Args:
+        backend (str): Optional. "tomllib", "tomli", "toml" or a registered name.
+            Defaults to the first importable backend: the stdlib tomllib when present.
+    """
+    if backend is None:
+        for name in _PREFERENCE:
+            try:
+                return get_toml_loads(name)
+            except ImportError:
+                continue
+        raise ImportError(f"No toml backend could be imported. Tried: {_PREFERENCE}")
+    if backend not in _BACKENDS:
+        raise ValueError(f"Unknown toml backend '{backend}'. Known: {list(_BACKENDS)}")
+    if backend not in _loaded:
+        _loaded[backend] = _BACKENDS[backend]()
+    return _loaded[backend]
+
+
+def load_toml(file_path: str, backend: str = None) -> "dict[str, dict]":
+    """Parse a whole toml file into nested dicts."""
+    with open(file_path, encoding="utf-8") as file:
+        return get_toml_loads(backend)(file.read())
+
+
+def iter_toml_objects(
+    file_path: str, backend: str = None
+) -> "Iterator[tuple[str, str, dict]]":
+    """Parse an object traits file one object at a time.
+
+    The file is read up to the next object's main table header and only that object's
+    tables are parsed, so objects can be turned into traits before the rest of the file is
+    read. An object's tables must be next to each other, as generated files write them.
+
+    Args:
+        file_path (str): location of file to read.
+        backend (str): Optional. Name of the toml backend to parse with.
+
+    Yields:
+        tuple[str, str, dict]: namespace, object id, and the object's table.
+    """
+    loads = get_toml_loads(backend)
+    with open(file_path, encoding="utf-8") as file:
+        for text in _iter_object_tables(file):
+            for namespace, namespace_traits in loads(text).items():
+                for object_id, object_data in namespace_traits.items():
+                    yield namespace, object_id, object_data
+
+
+def _iter_object_tables(lines: "Iterable[str]") -> "Iterator[str]":
+    """Join lines into the text of each object's tables, reading no further than needed."""
+    lines = iter(lines)
+    chunk = []
+    in_object = False
+    for line in lines:
+        if line.startswith("[") and OBJECT_TABLE_HEADER.match(line):
+            if in_object:
+                yield "".join(chunk)
+                chunk = []
+            in_object = True
+        elif not in_object and not _is_comment(line):
+            # Not laid out one object per table. Parse everything at once.
+            yield "".join([*chunk, line, *lines])
+            return
+        chunk.append(line)
+    if chunk:
+        yield "".join(chunk)
+
+
+def _is_comment(line: str) -> bool:
+    return not line.strip() or line.lstrip().startswith("#")
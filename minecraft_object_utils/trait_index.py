@@ -0,0 +1,269 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from functools import reduce
+from typing import TYPE_CHECKING
+
+from .objects.base_object import BaseObjectTraits
+
+if TYPE_CHECKING:
+    from .minecraft_object_factory import BlockFactory
+
+# Spelled as tuples rather than unions so isinstance works before Python 3.10.
+_ELEMENTWISE_TYPES = (list, tuple, set)
+_NUMERIC_TYPES = (int, float)
+
+
+class TraitIndex:
+    """Inverted indexes from block property names, property values and trait fields to ids.
+
+    Scalar trait fields are indexed by value. Numeric fields are also kept sorted for range
+    queries, and list fields are indexed by each element.
+    """
+
+    ids: "set[str]"
+    _props: "dict[str, set[str]]"  # property name: ids
+    _prop_values: "dict[tuple[str, str], set[str]]"  # (property name, allowed value): ids
+    _fields: "dict[tuple[str, object], set[str]]"  # (field name, value): ids
+    _present: "dict[str, set[str]]"  # field name: ids where field is not None
+    _numeric: "dict[str, list[tuple[float, str]]]"  # field name: sorted (value, id)
+
+    def __init__(self, traits: "list[BaseObjectTraits]" = []) -> None:
+        self.ids = set()
+        self._props = {}
+        self._prop_values = {}
+        self._fields = {}
+        self._present = {}
+        self._numeric = {}
+        for object_traits in traits:
+            self.add(object_traits)
+
+    def add(self, object_traits: BaseObjectTraits) -> None:
+        """Index newly registered traits."""
+        object_id = object_traits.id
+        self.ids.add(object_id)
+        for field, value in vars(object_traits).items():
+            if field == "id" or field.startswith("_"):
+                continue
+            if field == "props":
+                for prop in value:
+                    self._props.setdefault(prop.id, set()).add(object_id)
+                    for allowed in prop.allowed:
+                        self._prop_values.setdefault((prop.id, allowed), set()).add(
+                            object_id
+                        )
+                continue
+            if value is None:
+                continue
+            self._present.setdefault(field, set()).add(object_id)
+            if isinstance(value, _ELEMENTWISE_TYPES):
+                for element in value:
+                    self._fields.setdefault((field, element), set()).add(object_id)
+                continue
+            self._fields.setdefault((field, value), set()).add(object_id)
+            if isinstance(value, _NUMERIC_TYPES) and not isinstance(value, bool):
+                insort(self._numeric.setdefault(field, []), (value, object_id))
+
+    def has_prop(self, prop_name: str) -> "set[str]":
+        """Get ids of blocks that have a property."""
+        return set(self._props.get(prop_name, ()))
+
+    def prop_value(self, prop_name: str, value: str) -> "set[str]":
+        """Get ids of blocks where a property allows value."""
+        return set(self._prop_values.get((prop_name, str(value).lower()), ()))
+
+    def field_equals(self, field: str, value: object) -> "set[str]":
+        """Get ids where a trait field is value, or contains value for list fields."""
+        return set(self._fields.get((field, value), ()))
+
+    def has_field(self, field: str) -> "set[str]":
+        """Get ids where a trait field is not None."""
+        return set(self._present.get(field, ()))
+
+    def field_range(
+        self, field: str, minimum: float = None, maximum: float = None
+    ) -> "set[str]":
+        """Get ids where a numeric trait field is between minimum and maximum, inclusive.
+
+        Args:
+            field (str): name of a numeric trait field. Example: "max_damage"
+            minimum (float): Optional. Lowest allowed value.
+            maximum (float): Optional. Highest allowed value.
+        """
+        values = self._numeric.get(field, [])
+        start = 0 if minimum is None else bisect_left(values, (minimum,))
+        end = (
+            len(values)
+            if maximum is None
+            else bisect_right(values, (maximum, "\uffff"))
+        )
+        return {object_id for _, object_id in values[start:end]}
+
+
+class TraitQuery(ABC):
+    """A question about traits that a TraitIndex can answer. Combine with &, | and ~.
+
+    Queries also match block states. Queries about traits match every state of a matching
+    block, and StateValue matches single states. Queries with equal arguments are equal, so
+    results can be cached by query.
+    """
+
+    @abstractmethod
+    def evaluate(self, index: TraitIndex) -> "set[str]":
+        """Get the ids that match."""
+
+    def state_bits(self, block_factory: "BlockFactory") -> int:
+        """Get a bitset of the block states that match. Bit n is global state id n."""
+        return reduce(
+            int.__or__,
+            (_all_states(block_factory, i) for i in self.evaluate(block_factory.index)),
+            0,
+        )
+
+    def _key(self) -> tuple:
+        return (type(self), tuple(vars(self).values()))
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, TraitQuery) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __and__(self, other: "TraitQuery") -> "TraitQuery":
+        return And(self, other)
+
+    def __or__(self, other: "TraitQuery") -> "TraitQuery":
+        return Or(self, other)
+
+    def __invert__(self) -> "TraitQuery":
+        return Not(self)
+
+
+class HasProp(TraitQuery):
+    """Blocks that have a property. Example: HasProp("facing")"""
+
+    def __init__(self, prop_name: str) -> None:
+        self.prop_name = str(prop_name).lower()
+
+    def evaluate(self, index: TraitIndex) -> "set[str]":
+        return index.has_prop(self.prop_name)
+
+
+class PropValue(TraitQuery):
+    """Blocks with a property that allows a value. Example: PropValue("facing", "up")"""
+
+    def __init__(self, prop_name: str, value: str) -> None:
+        self.prop_name = str(prop_name).lower()
+        self.value = str(value).lower()
+
+    def evaluate(self, index: TraitIndex) -> "set[str]":
+        return index.prop_value(self.prop_name, self.value)
+
+
+class StateValue(TraitQuery):
+    """Block states where a property has a value. Example: StateValue("facing", "north")
+
+    As a trait query it matches blocks that allow the value, like PropValue.
+    """
+
+    def __init__(self, prop_name: str, value: str) -> None:
+        self.prop_name = str(prop_name).lower()
+        self.value = str(value).lower()
+
+    def evaluate(self, index: TraitIndex) -> "set[str]":
+        return index.prop_value(self.prop_name, self.value)
+
+    def state_bits(self, block_factory: "BlockFactory") -> int:
+        bits = 0
+        for block_id in self.evaluate(block_factory.index):
+            traits = block_factory.registry[block_id]
+            prop, stride = next(
+                (prop, stride)
+                for prop, stride in traits._get_state_layout()
+                if prop.id == self.prop_name
+            )
+            # State indexes with the value come in runs of stride, once every period.
+            period = stride * len(prop.allowed)
+            run = ((1 << stride) - 1) << (prop.value_index[self.value] * stride)
+            repeats = traits.state_count // period
+            pattern = run * (((1 << (period * repeats)) - 1) // ((1 << period) - 1))
+            bits |= pattern << block_factory.first_state_id(block_id)
+        return bits
+
+
+class BlockId(TraitQuery):
+    """Traits with one of the given ids. Example: BlockId("stone", "minecraft:granite")"""
+
+    def __init__(self, *ids: str) -> None:
+        self.ids = tuple(i if ":" in i else f"minecraft:{i}" for i in ids)
+
+    def evaluate(self, index: TraitIndex) -> "set[str]":
+        return index.ids.intersection(self.ids)
+
+
+class Field(TraitQuery):
+    """Traits with a field value. Without a value, traits where the field is not None.
+
+    Example: Field("piston_behavior", "DESTROY") or Field("inventory_slots")
+    """
+
+    def __init__(self, field: str, *value: object) -> None:
+        self.field = field
+        self.value = value
+
+    def evaluate(self, index: TraitIndex) -> "set[str]":
+        if not self.value:
+            return index.has_field(self.field)
+        return index.field_equals(self.field, self.value[0])
+
+
+class FieldRange(TraitQuery):
+    """Traits with a numeric field in an inclusive range. Example: FieldRange("max_damage", 1)"""
+
+    def __init__(
+        self, field: str, minimum: float = None, maximum: float = None
+    ) -> None:
+        self.field = field
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def evaluate(self, index: TraitIndex) -> "set[str]":
+        return index.field_range(self.field, self.minimum, self.maximum)
+
+
+class And(TraitQuery):
+    def __init__(self, *queries: TraitQuery) -> None:
+        self.queries = queries
+
+    def evaluate(self, index: TraitIndex) -> "set[str]":
+        return set.intersection(*(q.evaluate(index) for q in self.queries))
+
+    def state_bits(self, block_factory: "BlockFactory") -> int:
+        return reduce(int.__and__, (q.state_bits(block_factory) for q in self.queries))
+
+
+class Or(TraitQuery):
+    def __init__(self, *queries: TraitQuery) -> None:
+        self.queries = queries
+
+    def evaluate(self, index: TraitIndex) -> "set[str]":
+        return set.union(*(q.evaluate(index) for q in self.queries))
+
+    def state_bits(self, block_factory: "BlockFactory") -> int:
+        return reduce(int.__or__, (q.state_bits(block_factory) for q in self.queries))
+
+
+class Not(TraitQuery):
+    def __init__(self, query: TraitQuery) -> None:
+        self.query = query
+
+    def evaluate(self, index: TraitIndex) -> "set[str]":
+        return index.ids - self.query.evaluate(index)
+
+    def state_bits(self, block_factory: "BlockFactory") -> int:
+        every_state = (1 << block_factory.state_count) - 1
+        return every_state ^ self.query.state_bits(block_factory)
+
+
+def _all_states(block_factory: "BlockFactory", block_id: str) -> int:
+    state_count = block_factory.registry[block_id].state_count
+    return ((1 << state_count) - 1) << block_factory.first_state_id(block_id)
@@ -0,0 +1,54 @@
+from .objects.base_object import BaseObjectTraits
+from .objects.block import BlockProperty
+
+
+class TraitPool:
+    """Hands out one shared instance for traits and block properties with identical content.
+
+    Factories that import through the same pool share every trait object, property and
+    allowed value list that did not change between their files. Shared objects must be
+    treated as read only.
+    """
+
+    _traits: "dict[tuple, BaseObjectTraits]"
+    _props: "dict[tuple, BlockProperty]"
+    _allowed: "dict[tuple, tuple[list[str], dict[str, int]]]"  # values: (allowed, value_index)
+
+    def __init__(self) -> None:
+        self._traits = {}
+        self._props = {}
+        self._allowed = {}
+
+    def __len__(self) -> int:
+        return len(self._traits)
+
+    def intern(self, object_traits: BaseObjectTraits) -> BaseObjectTraits:
+        """Get the pooled traits equal to object_traits, adding it if it is new."""
+        props = getattr(object_traits, "props", None)
+        if props is not None:
+            object_traits.props = [self.intern_property(p) for p in props]
+        return self._traits.setdefault(content_key(object_traits), object_traits)
+
+    def intern_property(self, prop: BlockProperty) -> BlockProperty:
+        """Get the pooled block property equal to prop, adding it if it is new."""
+        allowed_key = tuple(prop.allowed)
+        shared = self._allowed.get(allowed_key)
+        if shared is None:
+            self._allowed[allowed_key] = (prop.allowed, prop.value_index)
+        else:
+            prop.allowed, prop.value_index = shared
+        return self._props.setdefault((prop.id, prop.default, allowed_key), prop)
+
+
+def content_key(object_traits: BaseObjectTraits) -> tuple:
+    """Make a hashable key from everything that describes the traits."""
+    fields = []
+    for field, value in sorted(vars(object_traits).items()):
+        if field.startswith("_"):
+            continue
+        if field == "props":
+            value = tuple((p.id, p.default, tuple(p.allowed)) for p in value)
+        elif isinstance(value, list):
+            value = tuple(value)
+        fields.append((field, value))
+    return (type(object_traits), tuple(fields))
@@ -0,0 +1,350 @@
+"""Store block volumes larger than memory in a file read through numpy.memmap.
+
+File layout:
+    8 bytes      MAGIC
+    8 bytes      length of the json header, little endian
+    json         {"format": 1, "shape": [x, y, z], "index_dtype": "<u2", "data_offset": n}
+    data         palette indexes in C order, starting at data_offset
+    palette      json list of [block id, {property: value}], after the data
+
+Opening a file only reads the header and the palette. The palette is rewritten when a file
+with new states is flushed or closed. Because it names blocks and states instead of state
+ids, a file can be opened with any factory that has its blocks.
+
+Example:
+    with VolumeFile.create("slice.mcvol", factory.block, (4096, 384, 4096)) as volume_file:
+        for region in volume_file.tiles():
+            volume_file.write(region, generate(region))
+"""
+import json
+import os
+import struct
+from collections.abc import Iterator
+
+import numpy
+
+from .block_volume import (
+    STATE_ID_DTYPE,
+    BlockTransform,
+    BlockVolume,
+    iter_tiles,
+    region_of,
+    state_mask,
+)
+from .minecraft_object_factory import BlockFactory
+from .parallel_transform import compose_tables
+from .state_translation import UNMAPPABLE
+from .trait_index import TraitQuery
+
+MAGIC = b"MCVOLUME"
+VOLUME_FILE_FORMAT = 1
+INDEX_DTYPES = [numpy.dtype("<u1"), numpy.dtype("<u2"), numpy.dtype("<u4")]
+DEFAULT_TILE_SHAPE = (64, 64, 64)
+_LENGTH = struct.Struct("<Q")
+_DATA_ALIGNMENT = 64
+
+
+class VolumeFile:
+    """A block volume in a file, mapped into memory instead of read.
+
+    Attributes:
+        indexes (numpy.memmap): palette index of every position, indexed [x, y, z].
+        palette (numpy.ndarray): state id of each palette entry in factory.
+    """
+
+    path: str
+    factory: BlockFactory
+    indexes: numpy.memmap
+    palette: numpy.ndarray
+    writable: bool
+    _palette_offset: int
+    _palette_changed: bool
+    _lookup: "numpy.ndarray | None"  # state id: palette index, or -1
+
+    @property
+    def shape(self) -> "tuple[int, int, int]":
+        self._check_open()
+        return self.indexes.shape
+
+    def __init__(
+        self,
+        path: str,
+        factory: BlockFactory,
+        indexes: numpy.memmap,
+        palette: numpy.ndarray,
+        palette_offset: int,
+        writable: bool,
+    ) -> None:
+        self.path = path
+        self.factory = factory
+        self.indexes = indexes
+        self.palette = palette
+        self.writable = writable
+        self._palette_offset = palette_offset
+        self._palette_changed = False
+        self._lookup = None
+
+    def __enter__(self) -> "VolumeFile":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @staticmethod
+    def create(
+        path: str,
+        factory: BlockFactory,
+        shape: "tuple[int, int, int]",
+        fill: str = "air",
+        index_dtype: str = "<u2",
+    ) -> "VolumeFile":
+        """Create a file where every position holds the block fill.
+
+        The data is allocated sparsely where the file system allows, so creating is quick.
+
+        Args:
+            index_dtype (str): Optional. Palette index type: "<u1", "<u2" or "<u4". Limits
+                the number of distinct states the file can hold.
+        """
+        index_dtype = numpy.dtype(index_dtype)
+        if index_dtype not in INDEX_DTYPES:
+            raise ValueError(f"Palette indexes must be one of {INDEX_DTYPES}")
+        shape = tuple(int(n) for n in shape)
+        header = {
+            "format": VOLUME_FILE_FORMAT,
+            "shape": shape,
+            "index_dtype": index_dtype.str,
+        }
+        # The data offset is part of the header, so repeat until it settles.
+        data_offset = 0
+        while True:
+            header["data_offset"] = data_offset
+            encoded = json.dumps(header, separators=(",", ":")).encode()
+            aligned = _align(len(MAGIC) + _LENGTH.size + len(encoded))
+            if aligned == data_offset:
+                break
+            data_offset = aligned
+        size = int(numpy.prod(shape)) * index_dtype.itemsize
+        with open(path, "wb") as file:
+            file.write(MAGIC + _LENGTH.pack(len(encoded)) + encoded)
+            file.truncate(data_offset + size)
+            file.seek(data_offset + size)
+            entry = _palette_entry(factory, factory.state_id(factory.create(fill)))
+            file.write(json.dumps([entry]).encode())
+        return VolumeFile.open(path, factory, writable=True)
+
+    @staticmethod
+    def open(path: str, factory: BlockFactory, writable: bool = False) -> "VolumeFile":
+        """Map a file into memory without reading its data.
+
+        Raises:
+            ValueError: the file isn't a volume file, or factory lacks one of its states.
+        """
+        with open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a volume file: {path}")
+            (length,) = _LENGTH.unpack(file.read(_LENGTH.size))
+            header = json.loads(file.read(length))
+            if header.get("format") != VOLUME_FILE_FORMAT:
+                raise ValueError(
+                    f"Unsupported volume file format {header.get('format')}"
+                )
+            index_dtype = numpy.dtype(header["index_dtype"])
+            shape = tuple(header["shape"])
+            palette_offset = (
+                header["data_offset"] + int(numpy.prod(shape)) * index_dtype.itemsize
+            )
+            file.seek(palette_offset)
+            palette = numpy.array(
+                [
+                    factory.state_id_of(block_id, state)
+                    for block_id, state in json.load(file)
+                ],
+                dtype=STATE_ID_DTYPE,
+            )
+        indexes = numpy.memmap(
+            path,
+            dtype=index_dtype,
+            mode="r+" if writable else "r",
+            offset=header["data_offset"],
+            shape=shape,
+        )
+        return VolumeFile(path, factory, indexes, palette, palette_offset, writable)
+
+    def tiles(
+        self, tile_shape: "tuple[int, int, int]" = DEFAULT_TILE_SHAPE
+    ) -> "Iterator[tuple[slice, slice, slice]]":
+        """Generate boxes of at most tile_shape that cover the volume, in C order."""
+        return iter_tiles(self.shape, tile_shape)
+
+    def read(
+        self, region: "tuple[int | slice, int | slice, int | slice]"
+    ) -> BlockVolume:
+        """Read a box of the file into memory as a BlockVolume."""
+        region = region_of(region, self.shape)
+        return BlockVolume(self.factory, self.palette[self.indexes[region]])
+
+    def mask(
+        self,
+        trait_query: TraitQuery,
+        region: "tuple[int | slice, int | slice, int | slice]" = (slice(None),) * 3,
+    ) -> numpy.ndarray:
+        """Get a boolean array of the positions in region whose block matches a query.
+
+        The query is checked once per palette entry, then looked up for every index.
+        """
+        region = region_of(region, self.shape)
+        return state_mask(self.factory, trait_query)[self.palette][self.indexes[region]]
+
+    def positions(
+        self,
+        trait_query: TraitQuery,
+        tile_shape: "tuple[int, int, int]" = DEFAULT_TILE_SHAPE,
+    ) -> numpy.ndarray:
+        """Get the (x, y, z) of every position whose block matches a query, tile by tile.
+
+        Returns:
+            numpy.ndarray: shaped (matches, 3), ordered by tile.
+        """
+        self._check_open()
+        palette_mask = state_mask(self.factory, trait_query)[self.palette]
+        found = [numpy.empty((0, 3), dtype=numpy.intp)]
+        for region in self.tiles(tile_shape):
+            matches = numpy.argwhere(palette_mask[self.indexes[region]])
+            if len(matches):
+                found.append(matches + [r.start for r in region])
+        return numpy.concatenate(found)
+
+    def write(
+        self,
+        region: "tuple[int | slice, int | slice, int | slice]",
+        volume: "BlockVolume | numpy.ndarray",
+    ) -> None:
+        """Write blocks to a box of the file, adding new states to the palette.
+
+        Args:
+            volume (BlockVolume | numpy.ndarray): blocks from factory, or their state ids,
+                shaped like the box.
+        """
+        self._check_writable()
+        region = region_of(region, self.shape)
+        state_ids = numpy.asarray(getattr(volume, "state_ids", volume))
+        lookup = self._get_lookup()
+        new_ids = numpy.unique(state_ids[lookup[state_ids] < 0])
+        if len(new_ids):
+            capacity = numpy.iinfo(self.indexes.dtype).max + 1
+            if len(self.palette) + len(new_ids) > capacity:
+                raise ValueError(f"The palette can't hold more than {capacity} states")
+            lookup[new_ids] = numpy.arange(
+                len(self.palette), len(self.palette) + len(new_ids)
+            )
+            self.palette = numpy.concatenate(
+                [self.palette, new_ids.astype(STATE_ID_DTYPE)]
+            )
+            self._palette_changed = True
+        self.indexes[region] = lookup[state_ids]
+
+    def transform_states(self, *transforms: BlockTransform) -> None:
+        """Apply state changes to every block by changing only the palette.
+
+        Positions don't move, so no data is read or written. A remap changes the file's
+        factory to the translator's target.
+        """
+        self._check_open()
+        self._check_writable()
+        table, target = compose_tables(self.factory, transforms)
+        palette = table[self.palette]
+        unmappable = numpy.count_nonzero(palette == UNMAPPABLE)
+        if unmappable:
+            raise ValueError(f"{unmappable} palette states can't be translated")
+        self.factory = target
+        self.palette = palette
+        self._palette_changed = True
+        self._lookup = None
+
+    def transform(
+        self,
+        path: str,
+        *transforms: BlockTransform,
+        tile_shape: "tuple[int, int, int]" = DEFAULT_TILE_SHAPE,
+    ) -> "VolumeFile":
+        """Write a rotated, reflected, replaced or remapped copy of the volume to a new file.
+
+        Works one tile at a time: palette indexes move with their positions and the states
+        change through the palette. If it fails, no file is left at path.
+        """
+        whole, moved_shape = region_of((slice(None),) * 3, self.shape), self.shape
+        for transform in transforms:
+            whole, moved_shape = transform.move_region(whole, moved_shape)
+        table, target = compose_tables(self.factory, transforms)
+        palette = table[self.palette]
+        if numpy.count_nonzero(palette == UNMAPPABLE):
+            raise ValueError("Some palette states can't be translated")
+        try:
+            with VolumeFile.create(
+                path, target, moved_shape, index_dtype=self.indexes.dtype.str
+            ) as result:
+                result.palette = palette
+                result._palette_changed = True
+                for region in self.tiles(tile_shape):
+                    indexes = self.indexes[region]
+                    shape = self.shape
+                    for transform in transforms:
+                        indexes = transform.move_positions(indexes)
+                        region, shape = transform.move_region(region, shape)
+                    result.indexes[region] = indexes
+        except BaseException:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+        return VolumeFile.open(path, target, writable=self.writable)
+
+    def flush(self) -> None:
+        """Write changed data and the palette to the file."""
+        self._check_open()
+        if not self.writable:
+            return
+        self.indexes.flush()
+        if self._palette_changed:
+            entries = [_palette_entry(self.factory, int(i)) for i in self.palette]
+            with open(self.path, "r+b") as file:
+                file.seek(self._palette_offset)
+                file.write(json.dumps(entries).encode())
+                file.truncate()
+            self._palette_changed = False
+
+    def close(self) -> None:
+        """Flush and unmap the file. Arrays taken from indexes must not be used after this."""
+        if self.indexes is None:
+            return
+        self.flush()
+        mapping = self.indexes._mmap
+        self.indexes = None
+        if mapping is not None:
+            mapping.close()
+
+    def _get_lookup(self) -> numpy.ndarray:
+        if self._lookup is None:
+            self._lookup = numpy.full(self.factory.state_count, -1, dtype=numpy.int64)
+            # Reversed, so a state that is in the palette twice finds its first index.
+            self._lookup[self.palette[::-1]] = numpy.arange(
+                len(self.palette) - 1, -1, -1
+            )
+        return self._lookup
+
+    def _check_open(self) -> None:
+        if self.indexes is None:
+            raise ValueError(f"{self.path} is closed")
+
+    def _check_writable(self) -> None:
+        if not self.writable:
+            raise PermissionError(f"{self.path} was opened read only")
+
+
+def _palette_entry(factory: BlockFactory, state_id: int) -> list:
+    traits, index = factory.decode_state_id(state_id)
+    return [traits.id, traits.state_from_index(index)]
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _DATA_ALIGNMENT) * _DATA_ALIGNMENT
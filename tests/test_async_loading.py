@@ -0,0 +1,66 @@
+import asyncio
+import os.path
+
+import pytest
+
+from minecraft_object_utils import MinecraftObjectFactory, ModInfo
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+VANILLA_JAVA = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+TEST_1_1 = ModInfo(TEST_NAMESPACE, "1.1", TEST_DIRECTORY)
+
+
+def test_create_async_matches_sync() -> None:
+    factory = asyncio.run(MinecraftObjectFactory.create_async([VANILLA_JAVA]))
+    expected = MinecraftObjectFactory([VANILLA_JAVA])
+    for name in ["block", "enchantment", "entity", "item"]:
+        assert list(getattr(factory, name).registry) == list(
+            getattr(expected, name).registry
+        )
+        assert getattr(factory, name).mods == [VANILLA_JAVA]
+    assert factory.mods == [VANILLA_JAVA]
+    stone = factory.block.create("stone")
+    assert factory.block.state_id(stone) == expected.block.state_id(stone)
+
+
+def test_concurrent_awaiters_share_load() -> None:
+    async def load_many() -> "list[MinecraftObjectFactory]":
+        return await asyncio.gather(
+            *(MinecraftObjectFactory.create_async([VANILLA_JAVA]) for _ in range(5)),
+            MinecraftObjectFactory.create_async([TEST_1_1]),
+        )
+
+    factories = asyncio.run(load_many())
+    assert all(f is factories[0] for f in factories[:5])
+    assert factories[5] is not factories[0]
+
+    async def load_twice() -> "list[MinecraftObjectFactory]":
+        first = await MinecraftObjectFactory.create_async([VANILLA_JAVA])
+        second = await MinecraftObjectFactory.create_async([VANILLA_JAVA])
+        return [first, second]
+
+    first, second = asyncio.run(load_twice())
+    assert first is not second
+
+
+def test_import_mod_async(tmp_path) -> None:
+    (tmp_path / "mod1-1.0-block.toml").write_text("[mod1.fake_block]\n")
+    mod = ModInfo("mod1", "1.0", str(tmp_path))
+    factory = MinecraftObjectFactory([VANILLA_JAVA])
+    asyncio.run(factory.import_mod_async(mod))
+    assert factory.block.mods == [VANILLA_JAVA, mod]
+    assert factory.item.mods == [VANILLA_JAVA]
+    assert factory.block.create("mod1:fake_block").id == "mod1:fake_block"
+
+
+def test_import_mod_async_all_or_nothing() -> None:
+    factory = MinecraftObjectFactory([VANILLA_JAVA])
+    blocks = dict(factory.block.registry)
+    items = dict(factory.item.registry)
+    with pytest.raises(ValueError):
+        # 1.1 repeats most of 1.0's ids.
+        asyncio.run(factory.import_mod_async(TEST_1_1))
+    assert factory.block.registry == blocks
+    assert factory.item.registry == items
+    assert factory.block.mods == [VANILLA_JAVA]
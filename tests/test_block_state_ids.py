@@ -0,0 +1,138 @@
+import os.path
+
+import pytest
+
+from minecraft_object_utils import (
+    BlockFactory,
+    BlockProperty,
+    BlockTraits,
+    MinecraftObjectFactory,
+    ModInfo,
+)
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+VANILLA_JAVA = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+
+BLOCK_FACTORY = BlockFactory([VANILLA_JAVA])
+
+
+@pytest.fixture
+def test_traits() -> BlockTraits:
+    return BlockTraits(
+        "test:block",
+        props=[
+            BlockProperty("powered", False, [True, False]),
+            BlockProperty("facing", "north", ["north", "south", "west"]),
+        ],
+    )
+
+
+def test_state_count(test_traits: BlockTraits) -> None:
+    assert test_traits.state_count == 6
+    assert BlockTraits("test:plain").state_count == 1
+    assert BLOCK_FACTORY.registry["minecraft:glow_lichen"].state_count == 128
+
+
+def test_state_order(test_traits: BlockTraits) -> None:
+    # properties sorted by name, last property changes fastest
+    assert list(test_traits.iter_states()) == [
+        {"facing": "north", "powered": "true"},
+        {"facing": "north", "powered": "false"},
+        {"facing": "south", "powered": "true"},
+        {"facing": "south", "powered": "false"},
+        {"facing": "west", "powered": "true"},
+        {"facing": "west", "powered": "false"},
+    ]
+    assert test_traits.default_state_index == 1
+    assert list(BlockTraits("test:plain").iter_states()) == [{}]
+
+
+def test_rank_unrank() -> None:
+    for traits in BLOCK_FACTORY.registry.values():
+        for index, state in enumerate(traits.iter_states()):
+            assert traits.state_index(state) == index
+            assert traits.state_from_index(index) == state
+
+
+def test_invalid_state(test_traits: BlockTraits) -> None:
+    with pytest.raises(ValueError):
+        test_traits.state_index({"facing": "up"})
+    with pytest.raises(IndexError):
+        test_traits.state_from_index(6)
+
+
+def test_block_state_index() -> None:
+    block = BLOCK_FACTORY.create("chest", facing="west", type="left")
+    assert block.state_index == block.traits.state_index(block.state)
+    assert block.traits.state_from_index(block.state_index) == block.state
+
+
+def test_factory_state_ids() -> None:
+    assert BLOCK_FACTORY.state_count == sum(
+        t.state_count for t in BLOCK_FACTORY.registry.values()
+    )
+    assert [s for s, _, _ in BLOCK_FACTORY.iter_states()] == list(
+        range(BLOCK_FACTORY.state_count)
+    )
+    for state_id, block_id, state in BLOCK_FACTORY.iter_states():
+        block = BLOCK_FACTORY.create_from_state_id(state_id)
+        assert block.id == block_id
+        assert block.state == state
+        assert BLOCK_FACTORY.state_id(block) == state_id
+    with pytest.raises(IndexError):
+        BLOCK_FACTORY.decode_state_id(BLOCK_FACTORY.state_count)
+
+
+def test_register_extends_state_ids(test_traits: BlockTraits) -> None:
+    factory = BlockFactory([VANILLA_JAVA])
+    count = factory.state_count
+    factory.register(test_traits)
+    assert factory.state_count == count + 6
+    assert factory.state_id_of("test:block") == count + 1
+
+
+def test_vanilla_state_ids() -> None:
+    factory = MinecraftObjectFactory().block
+    assert factory.state_id_of("air") == 0
+    assert factory.state_id_of("stone") == 1
+    assert factory.state_id_of("grass_block", {"snowy": "true"}) == 8
+    assert factory.state_id_of("grass_block") == 9
+    assert factory.state_id_of("oak_log", {"axis": "x"}) == 130
+
+
+def test_convert() -> None:
+    rail = BLOCK_FACTORY.create("powered_rail", shape="ascending_east", powered="true")
+    rail.set_state("waterlogged", "true")
+    converted = BLOCK_FACTORY.convert(rail, "detector_rail")
+    assert converted.id == "minecraft:detector_rail"
+    assert converted.state == {"powered": "true", "shape": "ascending_east"}
+
+    target = BLOCK_FACTORY.create("powered_rail", waterlogged="true", powered="true")
+    converted = BLOCK_FACTORY.convert(
+        BLOCK_FACTORY.create("detector_rail", shape="east_west"), target
+    )
+    assert converted.state == {
+        "powered": "false",
+        "shape": "east_west",
+        "waterlogged": "true",
+    }
+
+    chest = BLOCK_FACTORY.create("chest", facing="west")
+    button = BLOCK_FACTORY.create("oak_button", facing="west")
+    assert BLOCK_FACTORY.convert_state_id(
+        BLOCK_FACTORY.state_id(chest), "oak_button"
+    ) == BLOCK_FACTORY.state_id(button)
+    with pytest.raises(ValueError):
+        BLOCK_FACTORY.convert(chest, "granite")
+
+
+def test_conversion_tables_cached() -> None:
+    table = BLOCK_FACTORY.conversion_table("chest", "oak_button")
+    assert BLOCK_FACTORY.conversion_table("minecraft:chest", "oak_button") is table
+    target = BLOCK_FACTORY.create("oak_button", face="floor")
+    assert BLOCK_FACTORY.conversion_table("chest", target) is not table
+    traits = BLOCK_FACTORY.registry["minecraft:chest"]
+    for index, state in enumerate(traits.iter_states()):
+        expected = BLOCK_FACTORY.create("oak_button", facing=state["facing"])
+        assert table[index] == expected.state_index
@@ -0,0 +1,172 @@
+import itertools
+import os.path
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from minecraft_object_utils import (
+    Axis,
+    Block,
+    BlockFactory,
+    BlockId,
+    BlockProperty,
+    BlockTraits,
+    BlockTransform,
+    BlockVolume,
+    ModInfo,
+    StateValue,
+)
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+VANILLA_JAVA = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+
+BLOCK_FACTORY = BlockFactory([VANILLA_JAVA])
+
+
+@pytest.fixture
+def test_volume() -> BlockVolume:
+    rng = numpy.random.default_rng(7)
+    return BlockVolume(
+        BLOCK_FACTORY, rng.integers(0, BLOCK_FACTORY.state_count, size=(3, 4, 5))
+    )
+
+
+def rotate_position(
+    position: "tuple[int, int, int]", axis: Axis, shape: "tuple[int, int, int]"
+) -> "tuple[int, int, int]":
+    """Rotate a position 90 degrees about axis by the right hand rule, then shift into the box."""
+    x, y, z = position
+    size_x, size_y, size_z = shape
+    if axis == Axis.X:
+        return x, size_z - 1 - z, y
+    if axis == Axis.Y:
+        return z, y, size_x - 1 - x
+    return size_y - 1 - y, x, z
+
+
+def test_get_set() -> None:
+    volume = BlockVolume.filled(BLOCK_FACTORY, (2, 2, 2), "stone")
+    assert volume.shape == (2, 2, 2)
+    assert volume[1, 1, 1].id == "minecraft:stone"
+    chest = BLOCK_FACTORY.create("chest", facing="east", type="left")
+    volume[0, 1, 0] = chest
+    assert volume[0, 1, 0].state == chest.state
+    assert volume.copy() == volume
+    with pytest.raises(ValueError):
+        BlockVolume(BLOCK_FACTORY, numpy.zeros((2, 2)))
+
+
+@pytest.mark.parametrize("axis", list(Axis))
+def test_rotate_matches_blocks(test_volume: BlockVolume, axis: Axis) -> None:
+    rotated = test_volume.rotate(axis, 90)
+    for position in itertools.product(*(range(n) for n in test_volume.shape)):
+        block = test_volume[position]
+        block.rotate(axis, 90)
+        moved = rotated[rotate_position(position, axis, test_volume.shape)]
+        assert (moved.id, moved.state) == (block.id, block.state)
+
+
+def test_rotate_y_inverse(test_volume: BlockVolume) -> None:
+    # Every state can turn about Y, so a full turn gives the same volume back.
+    assert test_volume.rotate(Axis.Y, 90).rotate(Axis.Y, 270) == test_volume
+    assert test_volume.rotate(Axis.Y, 90).rotate("y", 90) == test_volume.rotate(
+        Axis.Y, 180
+    )
+
+
+@pytest.mark.parametrize("axis", list(Axis))
+def test_reflect(test_volume: BlockVolume, axis: Axis) -> None:
+    reflected = test_volume.reflect(axis)
+    index = {Axis.X: 0, Axis.Y: 1, Axis.Z: 2}[axis]
+    position = [0, 1, 2]
+    mirrored = list(position)
+    mirrored[index] = test_volume.shape[index] - 1 - position[index]
+    block = test_volume[tuple(position)]
+    block.reflect(axis)
+    assert reflected[tuple(mirrored)].state == block.state
+
+
+def test_transform_table_cached() -> None:
+    first = BlockTransform.rotate(Axis.Y, 90).table(BLOCK_FACTORY)
+    assert BlockTransform.rotate("y", 450).table(BLOCK_FACTORY) is first
+    assert len(first) == BLOCK_FACTORY.state_count
+
+
+def test_transform_table_after_register() -> None:
+    factory = BlockFactory([VANILLA_JAVA])
+    BlockTransform.rotate(Axis.Y, 90).table(factory)
+    factory.register(
+        BlockTraits(
+            "test:new_block",
+            props=[
+                BlockProperty("facing", "north", ["north", "south", "west", "east"])
+            ],
+        )
+    )
+    volume = BlockVolume.filled(
+        factory, (2, 1, 1), factory.create("test:new_block", facing="north")
+    )
+    rotated = volume.rotate(Axis.Y, 90)
+    assert rotated[0, 0, 0].get_state("facing") == "west"
+
+
+def expected_replacement(block: Block, target: Block) -> "tuple[str, dict[str, str]]":
+    replaced = target.copy()
+    for prop in target.traits.props:
+        value = block.try_get_state(prop.id, None)
+        if value in prop.allowed:
+            replaced.set_state(prop.id, value)
+    return replaced.id, replaced.state
+
+
+def test_replace_carries_states() -> None:
+    replacements = {
+        "powered_rail": BLOCK_FACTORY.create("detector_rail"),
+        "detector_rail": BLOCK_FACTORY.create("powered_rail", waterlogged="true"),
+        "chest": BLOCK_FACTORY.create("oak_button", face="wall", facing="south"),
+    }
+    state_ids = [
+        state_id
+        for state_id, block_id, _ in BLOCK_FACTORY.iter_states()
+        if block_id != "minecraft:glow_lichen"
+    ]
+    volume = BlockVolume(BLOCK_FACTORY, numpy.array(state_ids).reshape(-1, 1, 1))
+    replaced = volume.replace(replacements)
+    for x in range(volume.shape[0]):
+        block = volume[x, 0, 0]
+        result = replaced[x, 0, 0]
+        target = replacements.get(block.id.split(":")[1])
+        if target is None:
+            assert (result.id, result.state) == (block.id, block.state)
+        else:
+            assert (result.id, result.state) == expected_replacement(block, target)
+
+
+def test_replace_by_id() -> None:
+    volume = BlockVolume.filled(BLOCK_FACTORY, (2, 1, 1), "stone")
+    volume[1, 0, 0] = BLOCK_FACTORY.create("chest", facing="west", waterlogged="true")
+    replaced = volume.replace({"minecraft:stone": "cobblestone", "chest": "oak_button"})
+    assert replaced[0, 0, 0].id == "minecraft:cobblestone"
+    assert replaced[1, 0, 0].state == {
+        "face": "wall",
+        "facing": "west",
+        "powered": "false",
+    }
+    with pytest.raises(ValueError):
+        volume.replace({"stone": "granite"})
+
+
+def test_mask_and_positions(test_volume: BlockVolume) -> None:
+    query = StateValue("facing", "north") | BlockId("stone")
+    expected = numpy.zeros(test_volume.shape, dtype=bool)
+    for position in itertools.product(*(range(n) for n in test_volume.shape)):
+        block = test_volume[position]
+        expected[position] = (
+            block.try_get_state("facing", None) == "north"
+            or block.id == "minecraft:stone"
+        )
+    assert numpy.array_equal(test_volume.mask(query), expected)
+    assert numpy.array_equal(test_volume.positions(query), numpy.argwhere(expected))
+    assert test_volume.mask(~query).sum() == expected.size - expected.sum()
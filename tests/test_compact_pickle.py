@@ -0,0 +1,104 @@
+import os.path
+import pickle
+
+import pytest
+
+from minecraft_object_utils import (
+    Block,
+    BlockBatch,
+    BlockTraits,
+    Inventory,
+    MinecraftObjectFactory,
+    ModInfo,
+    compact_pickle,
+)
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+VANILLA_JAVA = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+
+
+@pytest.fixture
+def test_factory() -> MinecraftObjectFactory:
+    factory = MinecraftObjectFactory([VANILLA_JAVA])
+    compact_pickle.register_pickle_factory(factory)
+    yield factory
+    compact_pickle.register_pickle_factory(None)
+
+
+def round_trip(obj: object) -> object:
+    return pickle.loads(pickle.dumps(obj))
+
+
+def test_block_by_reference(test_factory: MinecraftObjectFactory) -> None:
+    block = test_factory.block.create("powered_rail", shape="east_west", powered="true")
+    compact = pickle.dumps(block)
+    copy = pickle.loads(compact)
+    assert copy.traits is block.traits
+    assert copy.state == block.state
+
+    compact_pickle.register_pickle_factory(None)
+    full = pickle.dumps(block)
+    assert len(compact) * 4 < len(full)
+    assert pickle.loads(full).state == block.state
+
+
+def test_unregistered_traits_pickle_in_full(
+    test_factory: MinecraftObjectFactory,
+) -> None:
+    block = Block(BlockTraits("test:loose"))
+    copy = round_trip(block)
+    assert copy.id == "test:loose"
+    assert copy.traits is not block.traits
+
+
+def test_missing_factory_on_load(test_factory: MinecraftObjectFactory) -> None:
+    compact = pickle.dumps(test_factory.block.create("stone"))
+    compact_pickle.register_pickle_factory(None)
+    with pytest.raises(RuntimeError):
+        pickle.loads(compact)
+
+
+def test_item_stack_with_enchantments(test_factory: MinecraftObjectFactory) -> None:
+    item_stack = test_factory.item.create(
+        "wooden_shovel",
+        damage=3,
+        enchantments=[test_factory.enchantment.create("efficiency", level=2)],
+    )
+    copy = round_trip(item_stack)
+    assert copy == item_stack
+    assert copy.traits is item_stack.traits
+    assert [(e.id, e.level) for e in copy.enchantments] == [("minecraft:efficiency", 2)]
+
+
+def test_inventory_columns(test_factory: MinecraftObjectFactory) -> None:
+    chest = test_factory.block.create("chest", facing="west")
+    chest.inventory[2] = test_factory.item.create("wooden_shovel", damage=5)
+    chest.inventory[20] = test_factory.item.create("netherite_block", count=40)
+    chest.inventory.checkpoint()
+    chest.inventory[21] = test_factory.item.create("exposed_copper", count=2)
+
+    copy = round_trip(chest)
+    assert copy.state == chest.state
+    assert list(copy.inventory) == list(chest.inventory)
+    assert copy.inventory.dirty_slots == [21]
+    assert isinstance(copy.inventory, Inventory)
+
+    empty = round_trip(test_factory.block.create("chest"))
+    assert list(empty.inventory) == [None] * 27
+
+
+def test_block_batch(test_factory: MinecraftObjectFactory) -> None:
+    stone = test_factory.block.create("stone")
+    lichen = test_factory.block.create("glow_lichen", up="true")
+    chest = test_factory.block.create("chest")
+    chest.inventory[0] = test_factory.item.create("netherite_block")
+    batch = BlockBatch([stone.copy(), lichen.copy(), stone.copy(), chest] * 256)
+
+    compact = pickle.dumps(batch)
+    copy = pickle.loads(compact)
+    assert isinstance(copy, BlockBatch)
+    assert [b.id for b in copy] == [b.id for b in batch]
+    assert [b.state for b in copy] == [b.state for b in batch]
+    assert copy[3].inventory[0].id == "minecraft:netherite_block"
+    assert len(compact) * 4 < len(pickle.dumps([b.copy() for b in batch]))
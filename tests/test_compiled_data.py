@@ -0,0 +1,68 @@
+import os.path
+import shutil
+
+import pytest
+
+from minecraft_object_utils import VANILLA_JAVA_LATEST, MinecraftObjectFactory, ModInfo
+from minecraft_object_utils.compiled_data import (
+    COMPILED_SUFFIX,
+    FILE_KINDS,
+    compile_directory,
+    is_up_to_date,
+)
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+VANILLA_JAVA = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+
+
+@pytest.fixture
+def compiled_mod(tmp_path: str) -> ModInfo:
+    for kind in FILE_KINDS:
+        shutil.copy(VANILLA_JAVA.get_toml_path(kind), tmp_path)
+    compile_directory(tmp_path)
+    return ModInfo(TEST_NAMESPACE, "1.0", str(tmp_path))
+
+
+def test_bundled_data_compiled() -> None:
+    for kind in FILE_KINDS:
+        assert VANILLA_JAVA_LATEST.get_file_path(kind).endswith(COMPILED_SUFFIX)
+
+
+def test_prefers_compiled(compiled_mod: ModInfo) -> None:
+    factory = MinecraftObjectFactory([compiled_mod])
+    assert factory.block.imported[0].endswith(COMPILED_SUFFIX)
+    assert compiled_mod.get_file_path("item").endswith(COMPILED_SUFFIX)
+
+
+def test_compiled_matches_toml(compiled_mod: ModInfo) -> None:
+    compiled = MinecraftObjectFactory([compiled_mod])
+    source = MinecraftObjectFactory([VANILLA_JAVA])
+    for kind in FILE_KINDS:
+        compiled_registry = getattr(compiled, kind).registry
+        source_registry = getattr(source, kind).registry
+        assert list(compiled_registry) == list(source_registry)
+        for object_id, traits in compiled_registry.items():
+            expected = source_registry[object_id]
+            for field, value in vars(expected).items():
+                if field == "props":
+                    assert [vars(p) for p in traits.props] == [vars(p) for p in value]
+                elif not field.startswith("_"):
+                    assert getattr(traits, field) == value
+
+
+def test_stale_compiled_file(compiled_mod: ModInfo) -> None:
+    toml_path = compiled_mod.get_toml_path("entity")
+    with open(toml_path, "a") as file:
+        file.write("[minecraft.pig]\n")
+    assert compiled_mod.get_file_path("entity") == toml_path
+    factory = MinecraftObjectFactory([compiled_mod])
+    assert "minecraft:pig" in factory.entity.registry
+
+
+def test_compiled_without_toml(compiled_mod: ModInfo) -> None:
+    os.remove(compiled_mod.get_toml_path("block"))
+    compiled_path = compiled_mod.get_file_path("block")
+    assert is_up_to_date(compiled_path, compiled_mod.get_toml_path("block"))
+    factory = MinecraftObjectFactory([compiled_mod])
+    assert factory.block.create("chest").get_state("facing") == "north"
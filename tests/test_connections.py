@@ -0,0 +1,154 @@
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from minecraft_object_utils import (
+    BlockFactory,
+    BlockId,
+    BlockVolume,
+    EditJournal,
+    VolumeFile,
+)
+from minecraft_object_utils.connections import recompute_connections, update_connections
+
+BLOCK_FACTORY = BlockFactory()
+
+
+def sides(volume: BlockVolume, position: "tuple[int, int, int]") -> "list[str]":
+    block = volume[position]
+    return [block.get_state(side) for side in ("north", "south", "west", "east")]
+
+
+@pytest.fixture
+def test_volume() -> BlockVolume:
+    return BlockVolume.filled(BLOCK_FACTORY, (5, 3, 5), "air")
+
+
+def test_fences(test_volume: BlockVolume) -> None:
+    factory = BLOCK_FACTORY
+    test_volume[2, 1, 2] = factory.create("oak_fence", waterlogged="true")
+    test_volume[3, 1, 2] = factory.create("spruce_fence")
+    test_volume[1, 1, 2] = factory.create("nether_brick_fence")
+    test_volume[2, 1, 3] = factory.create("stone")
+    test_volume[2, 1, 1] = factory.create("oak_fence_gate", facing="east")
+    test_volume[3, 1, 1] = factory.create("oak_fence")
+    test_volume[3, 1, 0] = factory.create("birch_fence_gate", facing="north")
+
+    assert update_connections(test_volume) == 3
+    assert sides(test_volume, (2, 1, 2)) == ["true", "true", "false", "true"]
+    assert test_volume[2, 1, 2].get_state("waterlogged") == "true"
+    assert sides(test_volume, (3, 1, 2)) == ["true", "false", "true", "false"]
+    assert sides(test_volume, (1, 1, 2)) == ["false"] * 4
+    # A gate in line with a fence doesn't connect.
+    assert sides(test_volume, (3, 1, 1)) == ["false", "true", "false", "false"]
+    assert update_connections(test_volume) == 0
+
+
+def test_panes_and_walls(test_volume: BlockVolume) -> None:
+    factory = BLOCK_FACTORY
+    for x in range(1, 4):
+        test_volume[x, 0, 2] = factory.create("cobblestone_wall")
+    test_volume[2, 1, 2] = factory.create("stone")
+    test_volume[1, 1, 2] = factory.create("torch")
+    test_volume[0, 0, 2] = factory.create("glass_pane")
+    test_volume[0, 0, 1] = factory.create("iron_bars")
+    update_connections(test_volume)
+
+    assert sides(test_volume, (0, 0, 2)) == ["true", "false", "false", "true"]
+    assert sides(test_volume, (0, 0, 1)) == ["false", "true", "false", "false"]
+    assert sides(test_volume, (2, 0, 2)) == ["none", "none", "tall", "tall"]
+    assert test_volume[2, 0, 2].get_state("up") == "false"
+    assert sides(test_volume, (1, 0, 2)) == ["none", "none", "low", "low"]
+    assert test_volume[1, 0, 2].get_state("up") == "true"
+    assert sides(test_volume, (3, 0, 2)) == ["none", "none", "low", "none"]
+    assert test_volume[3, 0, 2].get_state("up") == "true"
+
+
+def test_redstone_wire(test_volume: BlockVolume) -> None:
+    factory = BLOCK_FACTORY
+    for x in range(3):
+        test_volume[x, 0, 2] = factory.create("redstone_wire", power="7")
+    test_volume[3, 0, 2] = factory.create("stone")
+    test_volume[3, 1, 2] = factory.create("redstone_wire")
+    test_volume[0, 0, 0] = factory.create("redstone_wire")
+    test_volume[2, 0, 0] = factory.create(
+        "redstone_wire", north="side", south="side", east="side", west="side"
+    )
+    test_volume[4, 0, 4] = factory.create("redstone_wire")
+    test_volume[3, 0, 4] = factory.create("repeater", facing="north")
+    test_volume[4, 0, 3] = factory.create("lever")
+    update_connections(test_volume)
+
+    # The end of a line points both ways.
+    assert sides(test_volume, (0, 0, 2)) == ["none", "none", "side", "side"]
+    assert sides(test_volume, (1, 0, 2)) == ["none", "none", "side", "side"]
+    assert test_volume[1, 0, 2].get_state("power") == "7"
+    assert sides(test_volume, (2, 0, 2)) == ["none", "none", "side", "up"]
+    # Wire on a block connects down to wire beside it.
+    assert sides(test_volume, (3, 1, 2)) == ["none", "none", "side", "side"]
+    # A dot stays a dot, other wire without connections becomes a cross.
+    assert sides(test_volume, (0, 0, 0)) == ["none"] * 4
+    assert sides(test_volume, (2, 0, 0)) == ["side"] * 4
+    # Repeaters only connect along their facing.
+    assert sides(test_volume, (4, 0, 4)) == ["side", "side", "none", "none"]
+
+
+def test_region_reads_neighbours(test_volume: BlockVolume) -> None:
+    fence = BLOCK_FACTORY.create("oak_fence")
+    test_volume[1, 1, 1] = fence
+    test_volume[2, 1, 1] = fence
+    update_connections(test_volume, (1, slice(None), slice(None)))
+    assert sides(test_volume, (1, 1, 1)) == ["false", "false", "false", "true"]
+    assert sides(test_volume, (2, 1, 1)) == ["false"] * 4
+
+
+def test_custom_solid(test_volume: BlockVolume) -> None:
+    test_volume[2, 1, 2] = BLOCK_FACTORY.create("glass_pane")
+    test_volume[2, 1, 1] = BLOCK_FACTORY.create("stone")
+    test_volume[2, 1, 3] = BLOCK_FACTORY.create("dirt")
+    update_connections(test_volume, solid=BlockId("dirt"))
+    assert sides(test_volume, (2, 1, 2)) == ["false", "true", "false", "false"]
+
+
+def test_volume_file_matches_volume(tmp_path) -> None:
+    factory = BLOCK_FACTORY
+    ids = [
+        factory.state_id_of(block_id)
+        for block_id in [
+            "air",
+            "stone",
+            "oak_fence",
+            "oak_fence_gate",
+            "glass_pane",
+            "cobblestone_wall",
+            "redstone_wire",
+        ]
+    ]
+    rng = numpy.random.default_rng(4)
+    volume = BlockVolume(factory, rng.choice(ids, size=(20, 12, 17)))
+    expected = recompute_connections(factory, volume.state_ids)
+    assert not numpy.array_equal(expected, volume.state_ids)
+
+    path = str(tmp_path / "connections.mcvol")
+    with VolumeFile.create(path, factory, volume.shape) as volume_file:
+        volume_file.write((slice(None),) * 3, volume)
+        update_connections(volume_file, tile_shape=(8, 5, 6))
+        assert numpy.array_equal(
+            volume_file.read((slice(None),) * 3).state_ids, expected
+        )
+
+    update_connections(volume)
+    assert numpy.array_equal(volume.state_ids, expected)
+
+
+def test_journal(test_volume: BlockVolume) -> None:
+    journal = EditJournal(test_volume)
+    fence = BLOCK_FACTORY.create("oak_fence")
+    journal[1, 1, 1] = fence
+    journal[2, 1, 1] = fence
+    before = test_volume.copy()
+    journal.update_connections()
+    assert len(journal.undo_stack[-1].delta) == 2
+    assert sides(test_volume, (1, 1, 1)) == ["false", "false", "false", "true"]
+    journal.undo()
+    assert test_volume == before
@@ -0,0 +1,165 @@
+import os.path
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from minecraft_object_utils import (
+    Axis,
+    BlockFactory,
+    BlockTransform,
+    BlockVolume,
+    EditJournal,
+    ModInfo,
+)
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+VANILLA_JAVA = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+
+BLOCK_FACTORY = BlockFactory([VANILLA_JAVA])
+
+
+@pytest.fixture
+def test_volume() -> BlockVolume:
+    return BlockVolume.filled(BLOCK_FACTORY, (8, 4, 8), "air")
+
+
+def test_undo_redo(test_volume: BlockVolume) -> None:
+    original = test_volume.copy()
+    journal = EditJournal(test_volume)
+    journal[1, 2, 3] = BLOCK_FACTORY.create("chest", facing="north")
+    journal.set_state((1, 2, 3), facing="east")
+    assert test_volume[1, 2, 3].get_state("facing") == "east"
+    edited = test_volume.copy()
+    assert [e.label for e in journal.undo_stack] == ["set block", "set state"]
+
+    assert journal.undo().label == "set state"
+    assert test_volume[1, 2, 3].get_state("facing") == "north"
+    journal.undo()
+    assert test_volume == original
+    assert journal.undo() is None
+
+    journal.redo()
+    journal.redo()
+    assert test_volume == edited
+    assert journal.redo() is None
+
+    journal.undo()
+    journal.fill((slice(None), 0, slice(None)), "stone")
+    assert journal.redo_stack == []
+
+
+def test_delta_is_compact(test_volume: BlockVolume) -> None:
+    journal = EditJournal(test_volume)
+    journal.fill((slice(0, 2), slice(None), slice(None)), "stone")
+    journal.fill((slice(None), slice(None), slice(None)), "stone")
+    first, second = (entry.delta for entry in journal.undo_stack)
+    assert len(first) == 2 * 4 * 8
+    assert len(second) == 6 * 4 * 8
+    assert first.indexes.dtype == numpy.uint32
+    journal.fill((0, 0, 0), "stone")
+    assert len(journal.undo_stack) == 2
+
+
+def test_transactions(test_volume: BlockVolume) -> None:
+    original = test_volume.copy()
+    journal = EditJournal(test_volume)
+    with journal.transaction("build"):
+        journal.fill((slice(None), 0, slice(None)), "stone")
+        with journal.transaction("door"):
+            journal[4, 1, 4] = BLOCK_FACTORY.create("oak_button", facing="north")
+            journal.transform_states((4, 1, 4), BlockTransform.rotate(Axis.Y, 90))
+        with pytest.raises(RuntimeError):
+            journal.undo()
+    assert test_volume[4, 1, 4].get_state("facing") == "west"
+    assert [e.label for e in journal.undo_stack] == ["build"]
+    assert len(journal.undo_stack[0].delta) == 8 * 8 + 1
+    journal.undo()
+    assert test_volume == original
+
+
+def test_set_state_positions(test_volume: BlockVolume) -> None:
+    journal = EditJournal(test_volume)
+    journal[0, 0, 0] = BLOCK_FACTORY.create("chest", facing="north", type="left")
+    journal[5, 1, 2] = BLOCK_FACTORY.create("chest", facing="south")
+    journal[7, 3, 7] = BLOCK_FACTORY.create("oak_button", face="floor")
+    before = test_volume.copy()
+    positions = numpy.array([[0, 0, 0], [5, 1, 2], [-1, -1, -1]])
+    journal.set_state(positions, facing="east")
+    assert len(journal.undo_stack[-1].delta) == 3
+    assert [test_volume[tuple(p)].get_state("facing") for p in positions] == [
+        "east"
+    ] * 3
+    assert test_volume[0, 0, 0].get_state("type") == "left"
+    assert test_volume[7, 3, 7].get_state("face") == "floor"
+    with pytest.raises(ValueError):
+        journal.set_state([[1, 1, 1], [0, 0, 0]], facing="west")
+    assert test_volume[0, 0, 0].get_state("facing") == "east"
+    journal.undo()
+    assert test_volume == before
+
+
+def test_failed_transaction_reverts(test_volume: BlockVolume) -> None:
+    journal = EditJournal(test_volume)
+    journal.fill((0, 0, 0), "stone")
+    edited = test_volume.copy()
+    with journal.transaction():
+        journal.fill((1, 1, 1), "stone")
+        with pytest.raises(KeyError), journal.transaction():
+            journal.fill((2, 2, 2), "stone")
+            with journal.edit((slice(None), 3, slice(None))) as view:
+                view[...] = 0
+                raise KeyError
+        assert test_volume[2, 2, 2].id == "minecraft:air"
+        assert test_volume[0, 3, 0].id == "minecraft:air"
+    assert len(journal.undo_stack) == 2
+    journal.undo()
+    assert test_volume == edited
+
+
+def test_squash(test_volume: BlockVolume) -> None:
+    original = test_volume.copy()
+    journal = EditJournal(test_volume)
+    journal.fill((0, 0, 0), "stone")
+    journal.fill((slice(0, 2), 0, 0), "cobblestone")
+    journal.fill((1, 0, 0), "air")
+    entry = journal.squash(3, label="squashed")
+    assert list(journal.undo_stack) == [entry]
+    assert len(entry.delta) == 1
+    assert entry.delta.after.tolist() == [
+        BLOCK_FACTORY.state_id(BLOCK_FACTORY.create("cobblestone"))
+    ]
+    journal.undo()
+    assert test_volume == original
+    with pytest.raises(ValueError):
+        journal.squash(1)
+
+
+def test_history_limits(test_volume: BlockVolume) -> None:
+    journal = EditJournal(test_volume, history_limit=2)
+    for x in range(4):
+        journal.fill((x, 0, 0), "stone")
+    assert len(journal.undo_stack) == 2
+    journal.undo()
+    journal.undo()
+    assert journal.undo() is None
+    assert test_volume[1, 0, 0].id == "minecraft:stone"
+
+    journal = EditJournal(test_volume, memory_limit=100)
+    journal.fill((slice(None), 1, slice(None)), "stone")
+    journal.fill((slice(None), 2, slice(None)), "stone")
+    assert len(journal.undo_stack) == 1
+    assert journal.nbytes == 64 * 12
+
+
+def test_replace(test_volume: BlockVolume) -> None:
+    journal = EditJournal(test_volume)
+    journal[0, 0, 0] = BLOCK_FACTORY.create("chest", facing="east")
+    journal[7, 0, 0] = BLOCK_FACTORY.create("chest", facing="west")
+    journal.replace((slice(0, 4), 0, 0), {"chest": "oak_button"})
+    assert test_volume[0, 0, 0].id == "minecraft:oak_button"
+    assert test_volume[0, 0, 0].get_state("facing") == "east"
+    assert test_volume[7, 0, 0].id == "minecraft:chest"
+    assert len(journal.undo().delta) == 1
+    assert test_volume[0, 0, 0].id == "minecraft:chest"
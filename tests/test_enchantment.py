@@ -2,13 +2,22 @@ import os.path
 
 import pytest
 
-from minecraft_object_utils import Enchantment, EnchantmentFactory, ModInfo
+from minecraft_object_utils import (
+    Enchantment,
+    EnchantmentFactory,
+    EnchantmentTraits,
+    ItemFactory,
+    ItemStack,
+    MinecraftObjectFactory,
+    ModInfo,
+)
 
 TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
 TEST_NAMESPACE = "test"
 VANILLA_JAVA = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
 
 ENTITY_FACTORY = EnchantmentFactory([VANILLA_JAVA])
+ITEM_FACTORY = ItemFactory([VANILLA_JAVA])
 
 
 @pytest.fixture
@@ -35,3 +44,88 @@ def test_set_invalid_level(test_enchantment: Enchantment) -> None:
         test_enchantment.level = 0
     with pytest.raises(ValueError):
         test_enchantment.level = test_enchantment.traits.max_level + 1
+
+
+@pytest.fixture
+def test_shovel() -> ItemStack:
+    return ITEM_FACTORY.create(
+        "wooden_shovel",
+        enchantments=[
+            ENTITY_FACTORY.create("efficiency", level=5),
+            ENTITY_FACTORY.create("mending"),
+        ],
+    )
+
+
+def test_exclusive_loaded() -> None:
+    assert ENTITY_FACTORY.registry["minecraft:mending"].exclusive == [
+        "minecraft:infinity"
+    ]
+    assert not ENTITY_FACTORY.are_compatible("mending", "infinity")
+    assert not ENTITY_FACTORY.are_compatible("infinity", "mending")
+    assert ENTITY_FACTORY.are_compatible("mending", "unbreaking")
+
+
+def test_category_mask() -> None:
+    mending = ENTITY_FACTORY.category_mask("BREAKABLE")
+    assert bin(mending).count("1") == 2
+    assert ENTITY_FACTORY.category_mask("NOT_A_CATEGORY") == 0
+
+
+def test_is_applicable(test_shovel: ItemStack) -> None:
+    assert ENTITY_FACTORY.is_applicable("efficiency", test_shovel.traits)
+    assert ENTITY_FACTORY.is_applicable("minecraft:vanishing_curse", test_shovel.traits)
+    assert not ENTITY_FACTORY.is_applicable("protection", test_shovel.traits)
+    assert not ENTITY_FACTORY.is_applicable("infinity", test_shovel.traits)
+
+
+def test_valid_enchantments(test_shovel: ItemStack) -> None:
+    assert ENTITY_FACTORY.is_valid(test_shovel)
+    assert ENTITY_FACTORY.validate(test_shovel) == []
+
+
+def test_invalid_enchantments(test_shovel: ItemStack) -> None:
+    test_shovel.enchantments.append(ENTITY_FACTORY.create("infinity"))
+    test_shovel.enchantments.append(ENTITY_FACTORY.create("mending"))
+    # Efficiency from data where it goes higher than in the factory's data
+    newer_efficiency = EnchantmentTraits("minecraft:efficiency", level=10)
+    test_shovel.enchantments[0] = Enchantment(newer_efficiency, level=6)
+    assert not ENTITY_FACTORY.is_valid(test_shovel)
+    assert ENTITY_FACTORY.validate(test_shovel) == [
+        "Level 6 of minecraft:efficiency is invalid. Max level: 5.",
+        "Enchantment minecraft:infinity can't be applied to minecraft:wooden_shovel.",
+        "Enchantment minecraft:infinity conflicts with minecraft:mending.",
+        "Enchantment minecraft:mending is on minecraft:wooden_shovel more than once.",
+        "Enchantment minecraft:mending conflicts with minecraft:infinity.",
+    ]
+
+
+def test_validation_updates_on_register(test_shovel: ItemStack) -> None:
+    factory = EnchantmentFactory([VANILLA_JAVA])
+    assert factory.is_valid(test_shovel)
+    factory.register(
+        EnchantmentTraits("test:rusty", category="DIGGER", exclusive=["efficiency"])
+    )
+    test_shovel.enchantments.append(factory.create("test:rusty"))
+    assert not factory.is_valid(test_shovel)
+    assert factory.validate(test_shovel) == [
+        "Enchantment test:rusty conflicts with minecraft:efficiency."
+    ]
+
+
+def test_extra_enchantments() -> None:
+    factory = MinecraftObjectFactory()
+    axe = factory.item.create(
+        "iron_axe", enchantments=[factory.enchantment.create("sharpness", level=5)]
+    )
+    assert factory.enchantment.is_valid(axe)
+    assert factory.enchantment.is_applicable("smite", axe.traits)
+    assert not factory.enchantment.is_applicable("looting", axe.traits)
+    axe.enchantments.append(factory.enchantment.create("smite"))
+    assert factory.enchantment.validate(axe) == [
+        "Enchantment minecraft:smite conflicts with minecraft:sharpness."
+    ]
+    shovel = factory.item.create(
+        "iron_shovel", enchantments=[factory.enchantment.create("sharpness")]
+    )
+    assert not factory.enchantment.is_valid(shovel)
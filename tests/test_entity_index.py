@@ -0,0 +1,85 @@
+import os.path
+
+import pytest
+
+from minecraft_object_utils import Entity, EntityFactory, EntityIndex, ModInfo
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+VANILLA_JAVA = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+
+ENTITY_FACTORY = EntityFactory([VANILLA_JAVA])
+
+
+@pytest.fixture
+def test_entities() -> "list[Entity]":
+    return [
+        ENTITY_FACTORY.create("blaze", pos=(0.0, 64.0, 0.0)),
+        ENTITY_FACTORY.create("blaze", pos=(0.5, 65.0, 0.0)),
+        ENTITY_FACTORY.create("bee", pos=(0.0, 64.5, 0.3)),
+        ENTITY_FACTORY.create("cod", pos=(30.0, 60.0, -30.0)),
+    ]
+
+
+@pytest.fixture
+def test_index(test_entities: "list[Entity]") -> EntityIndex:
+    return EntityIndex(2.0, test_entities)
+
+
+def test_bounding_box(test_entities: "list[Entity]") -> None:
+    assert test_entities[0].bounding_box == (-0.3, 64.0, -0.3, 0.3, 65.8, 0.3)
+
+
+def test_invalid_cell_size() -> None:
+    with pytest.raises(ValueError):
+        EntityIndex(0)
+
+
+def test_insert_remove(test_index: EntityIndex, test_entities: "list[Entity]") -> None:
+    assert len(test_index) == 4
+    with pytest.raises(ValueError):
+        test_index.insert(test_entities[0])
+    test_index.remove(test_entities[0])
+    assert test_entities[0] not in test_index
+    assert len(test_index) == 3
+    with pytest.raises(KeyError):
+        test_index.remove(test_entities[0])
+
+
+def test_query_box(test_index: EntityIndex, test_entities: "list[Entity]") -> None:
+    found = test_index.query_box((-1, 63, -1), (1, 64.6, 1))
+    assert set(found) == {test_entities[0], test_entities[2]}
+    found = test_index.query_box((-1, 63, -1), (1, 64.6, 1), category="MONSTER")
+    assert found == [test_entities[0]]
+    assert test_index.query_box((100, 0, 100), (101, 1, 101)) == []
+
+
+def test_query_radius(test_index: EntityIndex, test_entities: "list[Entity]") -> None:
+    assert test_index.query_radius((30.0, 60.5, -30.0), 0.5) == [test_entities[3]]
+    assert test_index.query_radius((30.0, 60.5, -31.0), 0.5) == []
+    assert len(test_index.query_radius((0.0, 64.0, 0.0), 50)) == 4
+
+
+def test_move(test_index: EntityIndex, test_entities: "list[Entity]") -> None:
+    test_index.move(test_entities[3], (0.0, 64.0, 1.0))
+    assert test_entities[3].pos == (0.0, 64.0, 1.0)
+    assert test_index.query_radius((30.0, 60.5, -30.0), 0.5) == []
+    assert test_entities[3] in test_index.query_box((-1, 63, 0), (1, 65, 2))
+
+
+def test_overlapping_pairs(
+    test_index: EntityIndex, test_entities: "list[Entity]"
+) -> None:
+    blaze, other_blaze, bee, _ = test_entities
+    pairs = {frozenset(pair) for pair in test_index.overlapping_pairs()}
+    assert len(test_index.overlapping_pairs()) == 3
+    assert pairs == {
+        frozenset((blaze, other_blaze)),
+        frozenset((blaze, bee)),
+        frozenset((other_blaze, bee)),
+    }
+    assert len(test_index.overlapping_pairs("MONSTER")) == 1
+    assert set(test_index.overlapping_pairs("CREATURE", "MONSTER")) == {
+        (bee, blaze),
+        (bee, other_blaze),
+    }
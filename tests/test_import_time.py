@@ -0,0 +1,93 @@
+import os
+import subprocess
+import sys
+from importlib.util import find_spec
+
+import minecraft_object_utils
+
+# Seconds the package's own modules may spend importing the lightweight names. The
+# default is far above the few milliseconds it takes, so only a heavy import at module
+# level fails it on a slow machine. Set the variable to check a tighter budget.
+IMPORT_BUDGET_VARIABLE = "MINECRAFT_OBJECT_UTILS_IMPORT_BUDGET"
+DEFAULT_IMPORT_BUDGET = 0.25
+
+
+def run_python(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],  # noqa: S603
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def package_import_seconds(importtime_output: str) -> float:
+    """Sum the self time of the package's modules from python -X importtime output."""
+    total_us = 0
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, module = line[len("import time:") :].split("|")
+        if module.strip().startswith("minecraft_object_utils"):
+            total_us += int(self_us)
+    return total_us / 1e6
+
+
+def test_import_time_budget() -> None:
+    budget = float(os.environ.get(IMPORT_BUDGET_VARIABLE, DEFAULT_IMPORT_BUDGET))
+    result = run_python("from minecraft_object_utils import Axis, Block, Inventory")
+    assert package_import_seconds(result.stderr) < budget
+
+
+def test_package_import_skips_heavy_modules() -> None:
+    result = run_python(
+        "import sys\n"
+        "import minecraft_object_utils\n"
+        "print(sorted(m for m in sys.modules if m.startswith('minecraft_object_utils')),"
+        " [m for m in ['numpy', 'json', 'toml', 'tomli', 'tomllib'] if m in sys.modules])"
+    )
+    assert result.stdout.strip() == "['minecraft_object_utils'] []"
+
+
+def test_numpy_names_need_numpy() -> None:
+    result = run_python(
+        "import sys\n"
+        "sys.modules['numpy'] = None\n"
+        "import minecraft_object_utils\n"
+        "print('BlockVolume' in minecraft_object_utils.__all__,"
+        " 'Block' in minecraft_object_utils.__all__)"
+    )
+    assert result.stdout.strip() == "False True"
+
+
+def test_light_names_skip_heavy_modules() -> None:
+    result = run_python(
+        "import sys\n"
+        "from minecraft_object_utils import Axis, Block, Inventory\n"
+        "heavy = ['toml', 'tomllib', 'json', 'hashlib', 'logging', 'difflib', 'numpy',"
+        " 'minecraft_object_utils.base_factory']\n"
+        "print([m for m in heavy if m in sys.modules])"
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_factory_loads_readers_on_use() -> None:
+    result = run_python(
+        "import sys\n"
+        "from minecraft_object_utils import MinecraftObjectFactory\n"
+        "print('json' in sys.modules, end=' ')\n"
+        "MinecraftObjectFactory()\n"
+        "print('json' in sys.modules, 'tomllib' in sys.modules)"
+    )
+    # The bundled data is compiled, so no toml parser is needed.
+    assert result.stdout.strip() == "False True False"
+
+
+def test_every_public_name_resolves() -> None:
+    has_numpy = find_spec("numpy") is not None
+    for name in minecraft_object_utils.__all__:
+        if not has_numpy and minecraft_object_utils._needs_numpy(name):
+            continue
+        assert getattr(minecraft_object_utils, name) is not None
+    assert "Block" in dir(minecraft_object_utils)
+    assert not hasattr(minecraft_object_utils, "NotAName")
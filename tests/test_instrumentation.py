@@ -0,0 +1,95 @@
+import os.path
+from collections.abc import Iterator
+
+import pytest
+
+from minecraft_object_utils import (
+    Axis,
+    Block,
+    Inventory,
+    ItemStack,
+    ItemTraits,
+    MinecraftObjectFactory,
+    ModInfo,
+    TraitPool,
+    instrumentation,
+)
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+VANILLA_JAVA = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+
+
+@pytest.fixture(autouse=True)
+def clean_instrumentation() -> "Iterator[None]":
+    instrumentation.reset()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_disabled_by_default() -> None:
+    set_state = Block.__dict__["set_state"]
+    factory = MinecraftObjectFactory([VANILLA_JAVA])
+    factory.block.create("chest").set_state("facing", "south")
+    assert not instrumentation.is_enabled()
+    assert instrumentation.snapshot() == {"calls": {}, "caches": {}}
+
+    instrumentation.enable()
+    assert Block.__dict__["set_state"] is not set_state
+    instrumentation.disable()
+    assert Block.__dict__["set_state"] is set_state
+
+
+def test_counts_calls() -> None:
+    instrumentation.enable()
+    factory = MinecraftObjectFactory([VANILLA_JAVA])
+    block = factory.block.create("chest")
+    block.set_state("facing", "south")
+    assert instrumentation.snapshot()["calls"]["Block.set_state"]["count"] == 1
+    block.rotate(Axis.Y, 180)
+    with pytest.raises(ValueError):
+        factory.block.create("not_a_block")
+    inventory = Inventory(3)
+    inventory[0] = ItemStack(ItemTraits("test:item"))
+    inventory.clear()
+    instrumentation.disable()
+    block.set_state("facing", "north")
+
+    calls = instrumentation.snapshot()["calls"]
+    assert calls["BaseObjectFactory.load_from_file"]["count"] == 4
+    assert calls["BlockFactory.register"]["count"] == len(factory.block.registry)
+    assert calls["BaseObjectFactory.create"]["count"] == 2
+    assert calls["BaseObjectFactory.create"]["errors"] == 1
+    assert calls["Block.rotate"]["errors"] == 0
+    assert calls["Block.rotate"]["count"] == 1
+    assert calls["Block.reflect"]["count"] == 2
+    assert calls["Inventory.__setitem__"]["count"] == 1
+    assert calls["Inventory.clear"]["count"] == 1
+    assert all(call["seconds"] >= 0 for call in calls.values())
+
+
+def test_cache_hit_rates() -> None:
+    instrumentation.enable()
+    pool = TraitPool()
+    MinecraftObjectFactory([VANILLA_JAVA], pool)
+    MinecraftObjectFactory([VANILLA_JAVA], pool)
+    hits = instrumentation.snapshot()["caches"]["trait_pool"]["hits"]
+    with pytest.raises(TypeError):
+        pool.intern(None)
+
+    snapshot = instrumentation.snapshot()
+    caches = snapshot["caches"]
+    assert caches["trait_pool"]["hits"] == caches["trait_pool"]["misses"] == hits
+    assert snapshot["calls"]["TraitPool.intern"]["errors"] == 1
+    assert caches["compiled_data"]["misses"] == 8  # test data has no compiled files
+
+
+def test_callback() -> None:
+    events = []
+    instrumentation.enable(lambda name, seconds, hit: events.append((name, hit)))
+    factory = MinecraftObjectFactory([])
+    factory.block.register(factory.block.BaseObjTraitType("test:block"))
+    factory.block.create("test:block")
+    assert ("BaseObjectFactory.create", None) in events
+    assert ("BlockFactory.register", None) in events
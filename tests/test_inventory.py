@@ -1,3 +1,4 @@
+import copy
 import os.path
 
 import pytest
@@ -155,3 +156,66 @@ def test_reverse(test_inventory: Inventory, test_items: ItemStack) -> None:
     size = len(test_items)
     for i in range(size):
         assert test_inventory[i] == test_items[size - 1 - i]
+
+
+def test_delta_new_inventory(test_inventory: Inventory, test_items: ItemStack) -> None:
+    assert test_inventory.dirty_slots == [0, 1, 2, 4]
+    delta = test_inventory.get_delta()
+    assert delta == {
+        0: test_items[0],
+        1: test_items[1],
+        2: test_items[2],
+        4: test_items[4],
+    }
+
+
+def test_delta_after_checkpoint(
+    test_inventory: Inventory, test_items: ItemStack
+) -> None:
+    test_inventory.checkpoint()
+    assert test_inventory.get_delta() == {}
+    test_inventory[0] = test_inventory[0]
+    assert test_inventory.get_delta() == {}
+    test_inventory[3] = test_items[1]
+    test_inventory.pop(0)
+    test_inventory.remove(test_items[2])
+    test_inventory[-1] = None
+    assert test_inventory.get_delta() == {0: None, 2: None, 3: test_items[1], 4: None}
+
+
+def test_delta_clear(test_inventory: Inventory) -> None:
+    test_inventory.checkpoint()
+    test_inventory.clear()
+    assert test_inventory.get_delta() == {0: None, 1: None, 2: None, 4: None}
+
+
+def test_delta_reverse(test_inventory: Inventory, test_items: ItemStack) -> None:
+    test_inventory.checkpoint()
+    test_inventory.reverse()
+    assert test_inventory.dirty_slots == [0, 1, 3, 4]
+    test_inventory.checkpoint()
+    test_inventory.sort(key=lambda item: item is None)
+    assert test_inventory.dirty_slots == [1, 2, 3, 4]
+    assert test_inventory[4] is None
+
+
+def test_apply_delta(test_inventory: Inventory, test_items: ItemStack) -> None:
+    mirror = Inventory(len(test_items))
+    mirror.apply_delta(test_inventory.get_delta())
+    test_inventory.checkpoint()
+    test_inventory.pop()
+    test_inventory[3] = test_items[0]
+    mirror.apply_delta(test_inventory.get_delta())
+    assert list(mirror) == list(test_inventory)
+
+
+def test_copies_keep_changed_slots(
+    test_inventory: Inventory, test_items: ItemStack
+) -> None:
+    test_inventory.checkpoint()
+    test_inventory[3] = test_items[0]
+    for copied in [test_inventory.copy(), copy.copy(test_inventory)]:
+        assert list(copied) == list(test_inventory)
+        assert copied.get_delta() == {3: test_items[0]}
+        copied[0] = None
+        assert test_inventory.dirty_slots == [3]
@@ -0,0 +1,89 @@
+import os.path
+
+import pytest
+
+from minecraft_object_utils import (
+    BlockTraits,
+    MinecraftObjectFactory,
+    ModInfo,
+    MultiVersionRegistry,
+    TraitPool,
+)
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+TEST_1_0 = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+TEST_1_1 = ModInfo(TEST_NAMESPACE, "1.1", TEST_DIRECTORY)
+
+
+@pytest.fixture
+def test_versions() -> MultiVersionRegistry:
+    return MultiVersionRegistry({"1.0": [TEST_1_0], "1.1": [TEST_1_1]})
+
+
+def test_versions_load(test_versions: MultiVersionRegistry) -> None:
+    assert test_versions.versions == ["1.0", "1.1"]
+    assert "1.1" in test_versions
+    assert (
+        test_versions["1.0"].block.create("cobblestone").id == "minecraft:cobblestone"
+    )
+    with pytest.raises(ValueError):
+        test_versions["1.1"].block.create("cobblestone")
+    with pytest.raises(ValueError):
+        test_versions.add_version("1.0", [TEST_1_0])
+
+
+def test_identical_traits_shared(test_versions: MultiVersionRegistry) -> None:
+    old, new = test_versions["1.0"], test_versions["1.1"]
+    for object_id in ["minecraft:stone", "minecraft:chest", "minecraft:glow_lichen"]:
+        assert old.block.registry[object_id] is new.block.registry[object_id]
+    for object_id, traits in old.entity.registry.items():
+        assert new.entity.registry[object_id] is traits
+    old_rail = old.block.registry["minecraft:powered_rail"]
+    new_rail = new.block.registry["minecraft:powered_rail"]
+    assert old_rail is not new_rail
+    assert old_rail.props[0] is new_rail.props[0]
+    assert old_rail.props[0].allowed is new_rail.props[2].allowed
+
+
+def test_pool_size(test_versions: MultiVersionRegistry) -> None:
+    single = MultiVersionRegistry({"1.0": [TEST_1_0]})
+    # 1.1 adds one item, adds two blocks and changes two blocks
+    assert len(test_versions.trait_pool) == len(single.trait_pool) + 5
+
+
+def test_block_diff(test_versions: MultiVersionRegistry) -> None:
+    diff = test_versions.diff("1.0", "1.1")
+    assert diff.added == ["minecraft:sensor_rail", "minecraft:copper_bulb"]
+    assert diff.removed == ["minecraft:cobblestone", "minecraft:detector_rail"]
+    assert list(diff.changed) == ["minecraft:powered_rail", "minecraft:skeleton_skull"]
+    rail = diff.changed["minecraft:powered_rail"]
+    assert rail.added_props == ["flooded"]
+    assert rail.removed_props == ["waterlogged"]
+    assert rail.fields == []
+    assert diff.changed["minecraft:skeleton_skull"].added_props == ["powered"]
+
+
+def test_other_diffs(test_versions: MultiVersionRegistry) -> None:
+    diff = test_versions.diff("1.0", "1.1", "item")
+    assert diff.added == ["minecraft:copper_bulb"]
+    assert not diff.removed and not diff.changed
+    with pytest.raises(ValueError):
+        test_versions.diff("1.0", "1.1", "recipe")
+
+
+def test_changed_fields() -> None:
+    pool = TraitPool()
+    old = pool.intern(BlockTraits("test:block", piston_behavior="NORMAL"))
+    new = pool.intern(BlockTraits("test:block", piston_behavior="DESTROY"))
+    same = pool.intern(BlockTraits("test:block", piston_behavior="NORMAL"))
+    assert same is old
+    old_factory = MinecraftObjectFactory([])
+    new_factory = MinecraftObjectFactory([])
+    old_factory.block.register(old)
+    new_factory.block.register(new)
+    versions = MultiVersionRegistry()
+    versions._versions = {"old": old_factory, "new": new_factory}
+    assert versions.diff("old", "new").changed["test:block"].fields == [
+        "piston_behavior"
+    ]
@@ -0,0 +1,99 @@
+import os.path
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from minecraft_object_utils import (
+    Axis,
+    BlockTransform,
+    BlockVolume,
+    ModInfo,
+    MultiVersionRegistry,
+)
+from minecraft_object_utils.parallel_transform import transform_blocks, transform_volume
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+TEST_1_0 = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+TEST_1_1 = ModInfo(TEST_NAMESPACE, "1.1", TEST_DIRECTORY)
+
+
+@pytest.fixture(scope="module")
+def test_versions() -> MultiVersionRegistry:
+    return MultiVersionRegistry({"1.0": [TEST_1_0], "1.1": [TEST_1_1]})
+
+
+@pytest.fixture(scope="module")
+def test_volume(test_versions: MultiVersionRegistry) -> BlockVolume:
+    factory = test_versions["1.0"].block
+    rng = numpy.random.default_rng(3)
+    return BlockVolume(factory, rng.integers(0, factory.state_count, size=(8, 6, 10)))
+
+
+def test_pool_matches_single_process(test_volume: BlockVolume) -> None:
+    transforms = [BlockTransform.rotate(Axis.Y, 90), BlockTransform.reflect(Axis.X)]
+    expected = test_volume.rotate(Axis.Y, 90).reflect(Axis.X)
+    result = transform_volume(test_volume, transforms, max_workers=2, chunk_size=50)
+    assert result.volume == expected
+    assert [(c.start, c.stop) for c in result.chunks] == [
+        (start, min(start + 50, 480)) for start in range(0, 480, 50)
+    ]
+    assert all(c.seconds >= 0 and c.pid != os.getpid() for c in result.chunks)
+    assert result.seconds > 0
+
+
+def test_single_process_timing(test_volume: BlockVolume) -> None:
+    result = transform_volume(
+        test_volume, [BlockTransform.rotate(Axis.Z, 180)], max_workers=1, chunk_size=100
+    )
+    assert len(result.chunks) == 5
+    assert {c.pid for c in result.chunks} == {os.getpid()}
+
+
+def test_remap(test_versions: MultiVersionRegistry) -> None:
+    old, new = test_versions["1.0"].block, test_versions["1.1"].block
+    translator = test_versions.translator(
+        "1.0", "1.1", block_renames={"detector_rail": "sensor_rail"}
+    )
+    volume = BlockVolume.filled(old, (2, 2, 2), "stone")
+    volume[0, 0, 0] = old.create("detector_rail", shape="east_west")
+    result = transform_volume(
+        volume,
+        [BlockTransform.remap(translator), BlockTransform.rotate(Axis.Y, 90)],
+        max_workers=1,
+    ).volume
+    assert result.factory is new
+    assert result[0, 0, 1].id == "minecraft:sensor_rail"
+    assert result[0, 0, 1].get_state("shape") == "north_south"
+
+    volume[1, 1, 1] = old.create("cobblestone")
+    with pytest.raises(ValueError):
+        transform_volume(volume, [BlockTransform.remap(translator)], max_workers=1)
+    air = new.state_id(new.create("air"))
+    result = transform_volume(
+        volume, [BlockTransform.remap(translator, fallback=air)], max_workers=1
+    ).volume
+    assert result[1, 1, 1].id == "minecraft:air"
+
+
+def test_transform_blocks(test_versions: MultiVersionRegistry) -> None:
+    factory = test_versions["1.0"].block
+    chest = factory.create("chest", facing="north")
+    blocks = [
+        chest,
+        factory.create("oak_button", facing="east"),
+        factory.create("stone"),
+    ]
+    result = transform_blocks(
+        factory,
+        blocks,
+        [BlockTransform.rotate(Axis.Y, 90)],
+        max_workers=2,
+        chunk_size=1,
+    )
+    assert [b.id for b in result.blocks] == [b.id for b in blocks]
+    assert result.blocks[0].get_state("facing") == "west"
+    assert result.blocks[0].inventory is chest.inventory
+    assert result.blocks[1].get_state("facing") == "north"
+    assert len(result.chunks) == 3
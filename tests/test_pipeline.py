@@ -0,0 +1,161 @@
+import os.path
+from collections import Counter
+from itertools import chain
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from minecraft_object_utils import (
+    Axis,
+    Block,
+    BlockFactory,
+    BlockId,
+    BlockTraits,
+    BlockTransform,
+    BlockVolume,
+    ModInfo,
+    VolumeFile,
+)
+from minecraft_object_utils.pipeline import (
+    count_blocks,
+    count_states,
+    read_chunks,
+    transform_states,
+    where,
+    write_chunks,
+)
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+VANILLA_JAVA = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+
+BLOCK_FACTORY = BlockFactory([VANILLA_JAVA])
+
+
+@pytest.fixture
+def test_volume() -> BlockVolume:
+    # Random blocks in the lower half, air above.
+    volume = BlockVolume.filled(BLOCK_FACTORY, (20, 32, 18), "air")
+    rng = numpy.random.default_rng(9)
+    volume.state_ids[:, :16, :] = rng.integers(
+        0, BLOCK_FACTORY.state_count, size=(20, 16, 18)
+    )
+    return volume
+
+
+def is_chest(block: Block) -> bool:
+    return block.id == "minecraft:chest"
+
+
+def test_read_chunks(test_volume: BlockVolume) -> None:
+    chunks = list(read_chunks(test_volume))
+    assert len(chunks) == 2 * 2 * 2
+    assert chunks[1].origin == (0, 0, 16)
+    assert chunks[1].state_ids.shape == (16, 16, 2)
+    air = BLOCK_FACTORY.state_id(BLOCK_FACTORY.create("air"))
+    assert [c.uniform_state for c in chunks] == [None, None, air, air] * 2
+
+
+def test_count(test_volume: BlockVolume) -> None:
+    ids, counts = numpy.unique(test_volume.state_ids, return_counts=True)
+    assert count_states(read_chunks(test_volume)) == dict(
+        zip(ids.tolist(), counts.tolist())
+    )
+    expected = Counter()
+    for state_id, count in zip(ids.tolist(), counts.tolist()):
+        expected[BLOCK_FACTORY.create_from_state_id(state_id).id] += count
+    assert count_blocks(read_chunks(test_volume), BLOCK_FACTORY) == expected
+
+
+def test_where(test_volume: BlockVolume) -> None:
+    calls = []
+
+    def is_chest_or_air(block: Block) -> bool:
+        calls.append(block)
+        return block.id in ["minecraft:chest", "minecraft:air"]
+
+    chunks = list(where(read_chunks(test_volume), is_chest_or_air))
+    assert len(calls) == len(numpy.unique(test_volume.state_ids))
+    list(where(read_chunks(test_volume), is_chest_or_air))
+    assert len(calls) == len(numpy.unique(test_volume.state_ids))
+
+    chests = list(where(chunks, is_chest))
+    assert all(c.origin[1] == 0 for c in chests)
+    positions = [p for c in chests for p, _ in c.positions()]
+    chest_ids = [
+        i
+        for i, block_id, _ in BLOCK_FACTORY.iter_states()
+        if block_id == "minecraft:chest"
+    ]
+    expected = numpy.argwhere(numpy.isin(test_volume.state_ids, chest_ids))
+    assert sorted(positions) == [tuple(p) for p in expected.tolist()]
+
+
+def test_where_after_register() -> None:
+    factory = BlockFactory([VANILLA_JAVA])
+    calls = []
+
+    def is_new(block: Block) -> bool:
+        calls.append(block)
+        return block.id == "test:new_block"
+
+    volume = BlockVolume.filled(factory, (2, 2, 2), "air")
+    assert not list(where(read_chunks(volume), is_new))
+    factory.register(BlockTraits("test:new_block"))
+    volume[1, 1, 1] = factory.create("test:new_block")
+    chunks = list(where(read_chunks(volume), is_new))
+    assert [p for c in chunks for p, _ in c.positions()] == [(1, 1, 1)]
+    # Air was checked before registering, so only the new state is checked.
+    assert [b.id for b in calls] == ["minecraft:air", "test:new_block"]
+
+
+def test_transform_and_write(tmp_path, test_volume: BlockVolume) -> None:
+    rotate = BlockTransform.rotate(Axis.Y, 90)
+    path = str(tmp_path / "test.mcvol")
+    with VolumeFile.create(path, BLOCK_FACTORY, test_volume.shape) as volume_file:
+        assert write_chunks(read_chunks(test_volume), volume_file) == 8
+        chunks = where(read_chunks(volume_file, (8, 8, 8)), is_chest)
+        write_chunks(transform_states(chunks, rotate), volume_file)
+        result = volume_file.read((slice(None), slice(None), slice(None)))
+
+    chest_ids = [
+        i
+        for i, block_id, _ in BLOCK_FACTORY.iter_states()
+        if block_id == "minecraft:chest"
+    ]
+    rotated = rotate.table(BLOCK_FACTORY)[test_volume.state_ids]
+    expected = numpy.where(
+        numpy.isin(test_volume.state_ids, chest_ids), rotated, test_volume.state_ids
+    )
+    assert numpy.array_equal(result.state_ids, expected)
+
+    copy = BlockVolume.filled(BLOCK_FACTORY, test_volume.shape, "stone")
+    write_chunks(transform_states(read_chunks(test_volume), rotate), copy)
+    assert copy == BlockVolume(BLOCK_FACTORY, rotated)
+
+
+def test_write_other_factory(test_volume: BlockVolume) -> None:
+    other = BlockVolume.filled(BlockFactory([VANILLA_JAVA]), test_volume.shape, "stone")
+    target = test_volume.copy()
+    with pytest.raises(ValueError, match="different factory"):
+        write_chunks(read_chunks(other), target)
+    assert target == test_volume
+
+    part = BlockVolume(BLOCK_FACTORY, test_volume.state_ids[:16])
+    mixed = chain(read_chunks(part), read_chunks(other))
+    with pytest.raises(ValueError, match="different factory"):
+        write_chunks(mixed, target)
+    assert write_chunks(iter([]), target) == 0
+
+
+def test_where_query(test_volume: BlockVolume) -> None:
+    chunks = where(read_chunks(test_volume), BlockId("chest"))
+    assert count_blocks(chunks, BLOCK_FACTORY) == {
+        "minecraft:chest": int(test_volume.mask(BlockId("chest")).sum())
+    }
+    assert list(where(read_chunks(test_volume), BlockId("air")))[-1].origin == (
+        16,
+        16,
+        16,
+    )
@@ -0,0 +1,74 @@
+import os.path
+
+import pytest
+
+from minecraft_object_utils import BlockFactory, BlockTraits, ModInfo, RegistrySearch
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+VANILLA_JAVA = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+
+
+@pytest.fixture
+def test_factory() -> BlockFactory:
+    factory = BlockFactory([VANILLA_JAVA])
+    factory.register(BlockTraits("othermod:powered_rail"))
+    factory.register(BlockTraits("othermod:chest_of_drawers"))
+    return factory
+
+
+def test_prefix_without_namespace(test_factory: BlockFactory) -> None:
+    assert test_factory.search.prefix("powered") == [
+        "minecraft:powered_rail",
+        "othermod:powered_rail",
+    ]
+    assert test_factory.search.prefix("CHEST") == [
+        "minecraft:chest",
+        "othermod:chest_of_drawers",
+    ]
+    assert test_factory.search.prefix("chest", limit=1) == ["minecraft:chest"]
+
+
+def test_prefix_with_namespace(test_factory: BlockFactory) -> None:
+    assert test_factory.search.prefix("minecraft:powered") == ["minecraft:powered_rail"]
+    assert test_factory.search.prefix("othermod:") == [
+        "othermod:chest_of_drawers",
+        "othermod:powered_rail",
+    ]
+    assert test_factory.search.prefix("nomod:") == []
+
+
+def test_contains(test_factory: BlockFactory) -> None:
+    assert "othermod:powered_rail" in test_factory.search
+    assert "othermod:chest" not in test_factory.search
+    assert len(test_factory.search) == len(test_factory.registry)
+
+
+def test_suggest(test_factory: BlockFactory) -> None:
+    assert test_factory.search.suggest("powerd_rail", limit=2) == [
+        "minecraft:powered_rail",
+        "othermod:powered_rail",
+    ]
+    assert test_factory.search.suggest("othermod:powerd_rail", limit=1) == [
+        "othermod:powered_rail"
+    ]
+    assert test_factory.search.suggest("zzzzzz") == []
+
+
+def test_create_suggests(test_factory: BlockFactory) -> None:
+    with pytest.raises(ValueError, match="Did you mean: minecraft:oak_button"):
+        test_factory.create("oak_buton")
+
+
+def test_search_without_factory() -> None:
+    search = RegistrySearch(["a:b", "a:c"])
+    search.add("b:bb")
+    assert search.prefix("b") == ["a:b", "b:bb"]
+
+
+def test_ids_without_namespace(test_factory: BlockFactory) -> None:
+    test_factory.register(BlockTraits("foo"))
+    assert "foo" in test_factory.registry
+    assert "foo" in test_factory.search
+    assert test_factory.search.prefix("fo") == ["foo"]
+    assert RegistrySearch(["bar", "a:bar"]).prefix("bar") == ["a:bar", "bar"]
@@ -0,0 +1,87 @@
+import os.path
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from minecraft_object_utils import BlockFactory, BlockVolume, ModInfo, SectionHashTree
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+VANILLA_JAVA = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+
+BLOCK_FACTORY = BlockFactory([VANILLA_JAVA])
+
+
+@pytest.fixture
+def test_volume() -> BlockVolume:
+    rng = numpy.random.default_rng(11)
+    return BlockVolume(
+        BLOCK_FACTORY, rng.integers(0, BLOCK_FACTORY.state_count, size=(20, 9, 33))
+    )
+
+
+def test_grid(test_volume: BlockVolume) -> None:
+    tree = SectionHashTree(test_volume, section_size=4)
+    assert tree.grid == (5, 3, 9)
+    assert [level.shape[:3] for level in tree.levels] == [
+        (5, 3, 9),
+        (3, 2, 5),
+        (2, 1, 3),
+        (1, 1, 2),
+        (1, 1, 1),
+    ]
+    assert tree.section_region((4, 2, 8)) == (slice(16, 20), slice(8, 9), slice(32, 33))
+    with pytest.raises(ValueError):
+        SectionHashTree(test_volume, section_size=0)
+
+
+def test_equal_volumes_equal_roots(test_volume: BlockVolume) -> None:
+    tree = SectionHashTree(test_volume, section_size=4)
+    other = SectionHashTree(test_volume.copy(), section_size=4)
+    assert tree.root == other.root
+    assert tree.diff(other) == []
+    other[0, 0, 0] = BLOCK_FACTORY.create("stone")
+    assert tree.root != other.root
+
+
+def test_incremental_update(test_volume: BlockVolume) -> None:
+    tree = SectionHashTree(test_volume, section_size=4)
+    snapshot = tree.copy()
+    tree[5, 8, 32] = BLOCK_FACTORY.create("stone")
+    tree[6, 7, 31] = BLOCK_FACTORY.create("chest", facing="east")
+    test_volume.state_ids[0:5, 0, 0] = BLOCK_FACTORY.state_id(
+        BLOCK_FACTORY.create("oak_button")
+    )
+    tree.mark_changed((slice(0, 5), 0, 0))
+
+    rebuilt = SectionHashTree(test_volume.copy(), section_size=4)
+    assert tree.root == rebuilt.root
+    assert snapshot.diff(tree) == [
+        (slice(0, 4), slice(0, 4), slice(0, 4)),
+        (slice(4, 8), slice(0, 4), slice(0, 4)),
+        (slice(4, 8), slice(4, 8), slice(28, 32)),
+        (slice(4, 8), slice(8, 9), slice(32, 33)),
+    ]
+    for region in snapshot.diff(tree):
+        assert not numpy.array_equal(
+            snapshot.volume.state_ids[region], test_volume.state_ids[region]
+        )
+
+
+def test_unmarked_edit_not_seen(test_volume: BlockVolume) -> None:
+    tree = SectionHashTree(test_volume, section_size=4)
+    root = tree.root
+    test_volume[1, 1, 1] = BLOCK_FACTORY.create("stone")
+    assert tree.root == root
+    tree.mark_changed((1, 1, 1))
+    assert tree.root != root
+
+
+def test_diff_shape_mismatch(test_volume: BlockVolume) -> None:
+    tree = SectionHashTree(test_volume)
+    with pytest.raises(ValueError):
+        tree.diff(SectionHashTree(test_volume, section_size=8))
+    smaller = BlockVolume(BLOCK_FACTORY, test_volume.state_ids[:10])
+    with pytest.raises(ValueError):
+        tree.diff(SectionHashTree(smaller))
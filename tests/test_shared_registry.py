@@ -0,0 +1,75 @@
+import os.path
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import pytest
+
+from minecraft_object_utils import MinecraftObjectFactory, ModInfo
+from minecraft_object_utils.shared_registry import SharedRegistry, get_shared_factory
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+VANILLA_JAVA = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+
+
+def worker_state_id(args: "tuple[str, str, dict]") -> "tuple[int, int]":
+    name, block_id, state = args
+    factory = get_shared_factory(name)
+    return os.getpid(), factory.block.state_id_of(block_id, state)
+
+
+@pytest.fixture
+def test_factory() -> MinecraftObjectFactory:
+    return MinecraftObjectFactory([VANILLA_JAVA])
+
+
+def test_attach_in_process(test_factory: MinecraftObjectFactory) -> None:
+    with SharedRegistry.export(test_factory) as shared:
+        attached = SharedRegistry.attach(shared.name)
+        factory = attached.factory
+        assert attached.factory is factory
+        for name in ["block", "enchantment", "entity", "item"]:
+            assert list(getattr(factory, name).registry) == list(
+                getattr(test_factory, name).registry
+            )
+        assert factory.mods[0].versioned_name == "test-1.0"
+        chest = factory.block.create("chest", facing="east")
+        assert factory.block.state_id(chest) == test_factory.block.state_id(chest)
+        attached.close()
+
+
+def test_tables(test_factory: MinecraftObjectFactory) -> None:
+    with SharedRegistry.export(test_factory) as shared:
+        first_state_ids = shared.tables["block_first_state_ids"]
+        state_blocks = shared.tables["state_blocks"]
+        block_ids = list(test_factory.block.registry)
+        assert len(first_state_ids) == len(block_ids)
+        assert len(state_blocks) == test_factory.block.state_count
+        for state_id, block_id, _ in test_factory.block.iter_states():
+            assert block_ids[state_blocks[state_id]] == block_id
+        assert first_state_ids[block_ids.index("minecraft:chest")] == (
+            test_factory.block.first_state_id("chest")
+        )
+        with pytest.raises(TypeError):
+            state_blocks[0] = 1
+
+
+def test_owner_unlinks(test_factory: MinecraftObjectFactory) -> None:
+    with SharedRegistry.export(test_factory) as shared:
+        name = shared.name
+        assert shared.owner
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name)
+
+
+def test_process_pool_workers(test_factory: MinecraftObjectFactory) -> None:
+    tasks = [("chest", {"facing": "south"}), ("stone", {}), ("grass_block", {})] * 4
+    expected = [test_factory.block.state_id_of(b, s) for b, s in tasks]
+    with SharedRegistry.export(test_factory) as shared, ProcessPoolExecutor(
+        max_workers=2
+    ) as pool:
+        results = list(
+            pool.map(worker_state_id, [(shared.name, b, s) for b, s in tasks])
+        )
+    assert [state_id for _, state_id in results] == expected
+    assert all(pid != os.getpid() for pid, _ in results)
@@ -0,0 +1,114 @@
+import os.path
+
+import pytest
+
+from minecraft_object_utils import ModInfo, MultiVersionRegistry, StateTranslator
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+TEST_1_0 = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+TEST_1_1 = ModInfo(TEST_NAMESPACE, "1.1", TEST_DIRECTORY)
+
+RULES = {
+    "block_renames": {"detector_rail": "sensor_rail"},
+    "prop_renames": {"powered_rail": {"waterlogged": "flooded"}},
+    "defaults": {"skeleton_skull": {"powered": "true"}},
+}
+
+
+@pytest.fixture(scope="module")
+def test_versions() -> MultiVersionRegistry:
+    return MultiVersionRegistry({"1.0": [TEST_1_0], "1.1": [TEST_1_1]})
+
+
+@pytest.fixture(scope="module")
+def translator(test_versions: MultiVersionRegistry) -> StateTranslator:
+    return test_versions.translator("1.0", "1.1", **RULES)
+
+
+def test_translate_blocks(
+    test_versions: MultiVersionRegistry, translator: StateTranslator
+) -> None:
+    old = test_versions["1.0"].block
+    block = translator.translate_block(old.create("stone"))
+    assert block.id == "minecraft:stone"
+
+    rail = old.create("detector_rail", shape="east_west", powered="true")
+    block = translator.translate_block(rail)
+    assert block.id == "minecraft:sensor_rail"
+    assert block.state == {"powered": "true", "shape": "east_west"}
+
+    block = translator.translate_block(old.create("powered_rail", waterlogged="true"))
+    assert block.state["flooded"] == "true"
+    assert "waterlogged" not in block.state
+
+    block = translator.translate_block(old.create("skeleton_skull", rotation="7"))
+    assert block.state == {"powered": "true", "rotation": "7"}
+
+
+def test_table_covers_every_state(
+    test_versions: MultiVersionRegistry, translator: StateTranslator
+) -> None:
+    assert len(translator.table) == test_versions["1.0"].block.state_count
+    for state_id, target_id in enumerate(translator.table):
+        if state_id not in translator.unmappable:
+            assert 0 <= target_id < test_versions["1.1"].block.state_count
+
+
+def test_unmappable(
+    test_versions: MultiVersionRegistry, translator: StateTranslator
+) -> None:
+    cobblestone = test_versions["1.0"].block.create("cobblestone")
+    with pytest.raises(ValueError):
+        translator.translate_block(cobblestone)
+    assert translator.summarize() == {"minecraft:cobblestone is not in target": 1}
+
+    strict = StateTranslator(test_versions["1.0"].block, test_versions["1.1"].block)
+    assert strict.summarize() == {
+        "minecraft:cobblestone is not in target": 1,
+        "minecraft:detector_rail is not in target": 12,
+    }
+
+
+def test_value_renames(test_versions: MultiVersionRegistry) -> None:
+    translator = StateTranslator(
+        test_versions["1.0"].block,
+        test_versions["1.1"].block,
+        value_renames={"shape": {"east_west": "north_south"}},
+    )
+    block = test_versions["1.0"].block.create("powered_rail", shape="east_west")
+    assert translator.translate_block(block).get_state("shape") == "north_south"
+
+
+def test_translator_cached(test_versions: MultiVersionRegistry) -> None:
+    translator = test_versions.translator("1.0", "1.1", **RULES)
+    assert test_versions.translator("1.0", "1.1", **RULES) is translator
+    assert test_versions.translator("1.0", "1.1") is not translator
+
+
+def test_translate_array(
+    test_versions: MultiVersionRegistry, translator: StateTranslator
+) -> None:
+    numpy = pytest.importorskip("numpy")
+    old, new = test_versions["1.0"].block, test_versions["1.1"].block
+    stone = old.state_id(old.create("stone"))
+    rail = old.state_id(old.create("detector_rail", shape="east_west"))
+    cobblestone = old.state_id(old.create("cobblestone"))
+    air = new.state_id(new.create("air"))
+
+    state_ids = numpy.array([[stone, rail], [rail, stone]])
+    translated = translator.translate_array(state_ids)
+    assert translated.shape == (2, 2)
+    assert translated[0, 0] == new.state_id(new.create("stone"))
+    assert translated[0, 1] == new.state_id(
+        new.create("sensor_rail", shape="east_west")
+    )
+
+    state_ids = numpy.array([stone, cobblestone, cobblestone])
+    with pytest.raises(ValueError, match="cobblestone"):
+        translator.translate_array(state_ids)
+    assert translator.summarize(state_ids) == {
+        "minecraft:cobblestone is not in target": 2
+    }
+    translated = translator.translate_array(state_ids, fallback=air)
+    assert list(translated[1:]) == [air, air]
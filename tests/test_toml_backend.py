@@ -0,0 +1,85 @@
+import os.path
+from collections.abc import Iterator
+
+import pytest
+
+from minecraft_object_utils import ItemFactory, ModInfo
+from minecraft_object_utils.toml_backend import (
+    _iter_object_tables,
+    available_toml_backends,
+    get_toml_loads,
+    iter_toml_objects,
+    load_toml,
+    register_toml_backend,
+)
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+VANILLA_JAVA = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+BLOCK_FILE = VANILLA_JAVA.get_toml_path("block")
+
+
+def test_backends_available() -> None:
+    backends = available_toml_backends()
+    assert "toml" in backends
+    assert get_toml_loads() is get_toml_loads(backends[0])
+
+
+@pytest.mark.parametrize("backend", available_toml_backends())
+def test_streamed_matches_full_parse(backend: str) -> None:
+    full = load_toml(BLOCK_FILE, "toml")
+    streamed = {}
+    for namespace, object_id, data in iter_toml_objects(BLOCK_FILE, backend):
+        streamed.setdefault(namespace, {})[object_id] = data
+    assert streamed == full
+    assert list(streamed["minecraft"]) == list(full["minecraft"])
+
+
+def test_unknown_backend() -> None:
+    with pytest.raises(ValueError):
+        get_toml_loads("not_a_parser")
+
+
+def test_register_backend() -> None:
+    calls = []
+
+    def loads(text: str) -> dict:
+        calls.append(text)
+        return get_toml_loads("toml")(text)
+
+    register_toml_backend("counting", lambda: loads)
+    factory = ItemFactory([])
+    factory.toml_backend = "counting"
+    factory.import_mod(VANILLA_JAVA)
+    assert len(calls) == len(factory.registry)
+
+
+def test_not_one_table_per_object(tmp_path: str) -> None:
+    file_path = os.path.join(tmp_path, "test-1.0-item.toml")
+    with open(file_path, "w") as file:
+        file.write("[minecraft]\nstone = {}\negg = { max_stack_size = 16 }\n")
+    assert list(iter_toml_objects(file_path)) == [
+        ("minecraft", "stone", {}),
+        ("minecraft", "egg", {"max_stack_size": 16}),
+    ]
+
+
+def test_reads_one_object_ahead() -> None:
+    lines = [
+        "# items\n",
+        "[test.egg]\n",
+        "max_stack_size = 16\n",
+        "[test.stone]\n",
+        "a = 1\n",
+    ]
+    read = []
+
+    def read_lines() -> "Iterator[str]":
+        for line in lines:
+            read.append(line)
+            yield line
+
+    tables = _iter_object_tables(read_lines())
+    assert next(tables) == "".join(lines[:3])
+    assert read == lines[:4]
+    assert list(tables) == ["[test.stone]\na = 1\n"]
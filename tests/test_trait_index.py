@@ -0,0 +1,154 @@
+import os.path
+
+from minecraft_object_utils import (
+    BlockFactory,
+    BlockId,
+    BlockProperty,
+    BlockTraits,
+    EntityFactory,
+    Field,
+    FieldRange,
+    HasProp,
+    ItemFactory,
+    ModInfo,
+    PropValue,
+    StateValue,
+)
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+VANILLA_JAVA = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+
+BLOCK_FACTORY = BlockFactory([VANILLA_JAVA])
+ENTITY_FACTORY = EntityFactory([VANILLA_JAVA])
+ITEM_FACTORY = ItemFactory([VANILLA_JAVA])
+
+
+def test_has_prop() -> None:
+    assert BLOCK_FACTORY.query(HasProp("facing")) == {
+        "minecraft:chest",
+        "minecraft:oak_button",
+    }
+    assert BLOCK_FACTORY.query(HasProp("missing")) == set()
+    BLOCK_FACTORY.index.has_prop("facing").clear()
+    assert BLOCK_FACTORY.index.has_prop("facing")
+
+
+def test_prop_value() -> None:
+    assert BLOCK_FACTORY.query(PropValue("shape", "ascending_east")) == {
+        "minecraft:powered_rail",
+        "minecraft:detector_rail",
+    }
+    assert BLOCK_FACTORY.query(PropValue("face", "CEILING")) == {"minecraft:oak_button"}
+
+
+def test_fields() -> None:
+    assert BLOCK_FACTORY.query(Field("inventory_slots")) == {"minecraft:chest"}
+    assert BLOCK_FACTORY.query(Field("piston_behavior", "DESTROY")) == {
+        "minecraft:skeleton_skull",
+        "minecraft:oak_button",
+        "minecraft:glow_lichen",
+    }
+    assert ENTITY_FACTORY.query(Field("category", "MONSTER")) == {"minecraft:blaze"}
+    assert ITEM_FACTORY.query(Field("enchantment_categories", "DIGGER")) == {
+        "minecraft:wooden_shovel"
+    }
+
+
+def test_field_range() -> None:
+    assert ITEM_FACTORY.query(FieldRange("max_damage", 1)) == {
+        "minecraft:wooden_shovel"
+    }
+    assert ENTITY_FACTORY.query(FieldRange("height", 0.3, 0.6)) == {
+        "minecraft:bee",
+        "minecraft:chest_boat",
+        "minecraft:cod",
+    }
+    assert ENTITY_FACTORY.query(FieldRange("height", maximum=0.5)) == {"minecraft:cod"}
+
+
+def test_compose() -> None:
+    rails = PropValue("shape", "ascending_east")
+    assert BLOCK_FACTORY.query(rails & HasProp("waterlogged")) == {
+        "minecraft:powered_rail"
+    }
+    assert BLOCK_FACTORY.query(rails & ~HasProp("waterlogged")) == {
+        "minecraft:detector_rail"
+    }
+    assert BLOCK_FACTORY.query(HasProp("rotation") | Field("inventory_slots")) == {
+        "minecraft:skeleton_skull",
+        "minecraft:chest",
+    }
+
+
+def test_index_updates_on_register() -> None:
+    factory = BlockFactory([VANILLA_JAVA])
+    assert len(factory.query(HasProp("facing"))) == 2
+    factory.register(
+        BlockTraits(
+            "test:furnace",
+            props=[BlockProperty("facing", "north", ["north", "south"])],
+            inventory_slots=3,
+        )
+    )
+    assert factory.query(HasProp("facing") & Field("inventory_slots", 3)) == {
+        "test:furnace"
+    }
+
+
+def matching_state_ids(predicate) -> "set[int]":
+    return {
+        state_id
+        for state_id, block_id, state in BLOCK_FACTORY.iter_states()
+        if predicate(block_id, state)
+    }
+
+
+def state_ids_of(bits: int) -> "set[int]":
+    return {i for i in range(bits.bit_length()) if bits >> i & 1}
+
+
+def test_state_bits() -> None:
+    facing_west = StateValue("facing", "WEST")
+    assert state_ids_of(BLOCK_FACTORY.state_bits(facing_west)) == matching_state_ids(
+        lambda block_id, state: state.get("facing") == "west"
+    )
+    assert BLOCK_FACTORY.query(facing_west) == {
+        "minecraft:chest",
+        "minecraft:oak_button",
+    }
+
+    query = (StateValue("waterlogged", "true") | BlockId("stone")) & ~HasProp("type")
+    assert state_ids_of(BLOCK_FACTORY.state_bits(query)) == matching_state_ids(
+        lambda block_id, state: (
+            state.get("waterlogged") == "true" or block_id == "minecraft:stone"
+        )
+        and "type" not in state
+    )
+    assert state_ids_of(
+        BLOCK_FACTORY.state_bits(Field("piston_behavior", "DESTROY"))
+    ) == matching_state_ids(
+        lambda block_id, state: BLOCK_FACTORY.registry[block_id].piston_behavior
+        == "DESTROY"
+    )
+
+
+def test_state_bits_cached() -> None:
+    query = StateValue("powered", "true") & BlockId("minecraft:powered_rail")
+    assert query == StateValue("powered", "true") & BlockId("powered_rail")
+    assert query != StateValue("powered", "false") & BlockId("powered_rail")
+    factory = BlockFactory([VANILLA_JAVA])
+    bits = factory.state_bits(query)
+    assert (
+        factory.state_bits(StateValue("powered", "true") & BlockId("powered_rail"))
+        is bits
+    )
+    factory.register(
+        BlockTraits(
+            "test:lever", props=[BlockProperty("powered", "false", ["true", "false"])]
+        )
+    )
+    assert (
+        factory.state_bits(StateValue("powered", "true")) >> (factory.state_count - 2)
+        == 1
+    )
@@ -0,0 +1,175 @@
+import os.path
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from minecraft_object_utils import (
+    Axis,
+    BlockFactory,
+    BlockId,
+    BlockTransform,
+    BlockVolume,
+    ModInfo,
+    MultiVersionRegistry,
+    StateValue,
+    VolumeFile,
+)
+
+TEST_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+TEST_NAMESPACE = "test"
+TEST_1_0 = ModInfo(TEST_NAMESPACE, "1.0", TEST_DIRECTORY)
+TEST_1_1 = ModInfo(TEST_NAMESPACE, "1.1", TEST_DIRECTORY)
+
+BLOCK_FACTORY = BlockFactory([TEST_1_0])
+
+
+@pytest.fixture
+def test_volume() -> BlockVolume:
+    rng = numpy.random.default_rng(5)
+    return BlockVolume(
+        BLOCK_FACTORY, rng.integers(0, BLOCK_FACTORY.state_count, size=(9, 5, 7))
+    )
+
+
+@pytest.fixture
+def test_file(tmp_path, test_volume: BlockVolume) -> str:
+    path = str(tmp_path / "test.mcvol")
+    with VolumeFile.create(path, BLOCK_FACTORY, test_volume.shape) as volume_file:
+        for region in volume_file.tiles((4, 4, 4)):
+            volume_file.write(region, test_volume.state_ids[region])
+    return path
+
+
+def test_create(tmp_path) -> None:
+    path = str(tmp_path / "empty.mcvol")
+    with VolumeFile.create(path, BLOCK_FACTORY, (3, 4, 5), fill="stone") as volume_file:
+        assert volume_file.shape == (3, 4, 5)
+        assert volume_file.read((2, 3, 4)) == BlockVolume.filled(
+            BLOCK_FACTORY, (1, 1, 1), "stone"
+        )
+    with pytest.raises(ValueError):
+        VolumeFile.create(path, BLOCK_FACTORY, (1, 1, 1), index_dtype="<i8")
+    with open(path, "wb") as file:
+        file.write(b"not a volume")
+    with pytest.raises(ValueError):
+        VolumeFile.open(path, BLOCK_FACTORY)
+
+
+def test_round_trip(test_file: str, test_volume: BlockVolume) -> None:
+    with VolumeFile.open(test_file, BLOCK_FACTORY) as volume_file:
+        assert isinstance(volume_file.indexes, numpy.memmap)
+        region = (slice(None), slice(None), slice(None))
+        assert volume_file.read(region) == test_volume
+        assert volume_file.read((slice(2, 6), 1, slice(None))) == BlockVolume(
+            BLOCK_FACTORY, test_volume.state_ids[2:6, 1:2, :]
+        )
+        with pytest.raises(PermissionError):
+            volume_file.write((0, 0, 0), numpy.zeros((1, 1, 1)))
+
+
+def test_closed(test_file: str) -> None:
+    volume_file = VolumeFile.open(test_file, BLOCK_FACTORY, writable=True)
+    mapping = volume_file.indexes._mmap
+    volume_file.close()
+    volume_file.close()
+    assert mapping.closed
+    region = (slice(None), slice(None), slice(None))
+    with pytest.raises(ValueError, match="closed"):
+        volume_file.read(region)
+    with pytest.raises(ValueError, match="closed"):
+        volume_file.write(region, numpy.zeros((1, 1, 1)))
+    with pytest.raises(ValueError, match="closed"):
+        volume_file.flush()
+
+
+def test_tiles(test_file: str) -> None:
+    with VolumeFile.open(test_file, BLOCK_FACTORY) as volume_file:
+        tiles = list(volume_file.tiles((4, 4, 4)))
+    assert len(tiles) == 3 * 2 * 2
+    assert tiles[-1] == (slice(8, 9), slice(4, 5), slice(4, 7))
+    assert sum(
+        (x.stop - x.start) * (y.stop - y.start) * (z.stop - z.start)
+        for x, y, z in tiles
+    ) == (9 * 5 * 7)
+
+
+def test_palette_limit(tmp_path) -> None:
+    factory = BlockFactory()
+    air = factory.state_id(factory.create("air"))
+    path = str(tmp_path / "small.mcvol")
+    with VolumeFile.create(path, factory, (300, 1, 1), index_dtype="<u1") as f:
+        state_ids = numpy.arange(air + 1, air + 256).reshape(-1, 1, 1)
+        f.write((slice(0, 255), 0, 0), state_ids)
+        assert len(f.palette) == 256
+        f.write((slice(255, 256), 0, 0), state_ids[:1])
+        with pytest.raises(ValueError):
+            f.write((slice(255, 256), 0, 0), numpy.array([[[air + 256]]]))
+
+
+@pytest.mark.parametrize(
+    "transforms",
+    [
+        [BlockTransform.rotate(Axis.Y, 90)],
+        [BlockTransform.rotate(Axis.X, 270), BlockTransform.reflect(Axis.Z)],
+        [BlockTransform.replace({"chest": "oak_button"})],
+    ],
+)
+def test_transform_by_tile(
+    tmp_path, test_file: str, test_volume: BlockVolume, transforms: list
+) -> None:
+    path = str(tmp_path / "moved.mcvol")
+    with VolumeFile.open(test_file, BLOCK_FACTORY) as volume_file:
+        moved = volume_file.transform(path, *transforms, tile_shape=(4, 3, 2))
+    with moved:
+        region = (slice(None), slice(None), slice(None))
+        assert moved.read(region) == test_volume.transform(*transforms)
+
+
+def test_transform_states(test_file: str, test_volume: BlockVolume) -> None:
+    versions = MultiVersionRegistry({"1.0": [TEST_1_0], "1.1": [TEST_1_1]})
+    translator = versions.translator(
+        "1.0", "1.1", block_renames={"detector_rail": "sensor_rail"}
+    )
+    air = translator.target.state_id(translator.target.create("air"))
+    remap = BlockTransform.remap(translator, fallback=air)
+    # The palette names states, so any factory with the same blocks can open the file.
+    with VolumeFile.open(
+        test_file, versions["1.0"].block, writable=True
+    ) as volume_file:
+        before = volume_file.indexes.copy()
+        volume_file.transform_states(remap)
+        assert numpy.array_equal(volume_file.indexes, before)
+    with VolumeFile.open(test_file, translator.target) as volume_file:
+        region = (slice(None), slice(None), slice(None))
+        volume = BlockVolume(versions["1.0"].block, test_volume.state_ids)
+        assert volume_file.read(region) == volume.transform(remap)
+
+
+def test_failed_transform_leaves_no_file(tmp_path, test_file: str, monkeypatch) -> None:
+    versions = MultiVersionRegistry({"1.0": [TEST_1_0], "1.1": [TEST_1_1]})
+    remap = BlockTransform.remap(versions.translator("1.0", "1.1"))
+    rotate = BlockTransform.rotate(Axis.Y, 90)
+    monkeypatch.setattr(rotate, "move_positions", lambda indexes: 1 / 0)
+    path = str(tmp_path / "moved.mcvol")
+    with VolumeFile.open(test_file, versions["1.0"].block) as volume_file:
+        with pytest.raises(ValueError):
+            volume_file.transform(path, remap)
+        assert not os.path.exists(path)
+        with pytest.raises(ZeroDivisionError):
+            volume_file.transform(path, rotate)
+        assert not os.path.exists(path)
+
+
+def test_query(test_file: str, test_volume: BlockVolume) -> None:
+    query = StateValue("powered", "true") & ~BlockId("detector_rail")
+    with VolumeFile.open(test_file, BLOCK_FACTORY) as volume_file:
+        assert numpy.array_equal(volume_file.mask(query), test_volume.mask(query))
+        assert numpy.array_equal(
+            volume_file.mask(query, (slice(1, 4), 2, slice(None))),
+            test_volume.mask(query)[1:4, 2:3, :],
+        )
+        positions = volume_file.positions(query, tile_shape=(4, 4, 4))
+    assert sorted(map(tuple, positions.tolist())) == list(
+        map(tuple, test_volume.positions(query).tolist())
+    )